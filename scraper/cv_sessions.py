@@ -0,0 +1,252 @@
+"""
+Registered CV sessions.
+A CV is prepared and encoded once, then scored against many jobs by its cv_id.
+
+With a single server worker sessions live in memory. With several workers
+(WEB_CONCURRENCY > 1) a cv_id may reach any of them, so sessions are kept
+as files in a directory every worker reads instead.
+"""
+
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from tech_keywords import CACHE_DIR
+
+# Session configuration
+CV_SESSION_TTL = int(os.environ.get("CV_SESSION_TTL", "3600"))  # seconds, refreshed on use
+CV_SESSION_MAX = int(os.environ.get("CV_SESSION_MAX", "1000"))
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# "memory" (one worker) or "file" (shared by the workers of a node)
+CV_SESSION_STORE = os.environ.get("CV_SESSION_STORE", "file" if WEB_CONCURRENCY > 1 else "memory")
+CV_SESSION_DIR = Path(os.environ.get("CV_SESSION_DIR", str(CACHE_DIR / "cv_sessions")))
+
+CV_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class CVSessionStore:
+    """
+    In-memory store of prepared CVs keyed by cv_id.
+
+    Sessions expire after `ttl` seconds without use. When the store is full
+    the least recently used session is dropped.
+    """
+
+    def __init__(self, ttl: int, max_sessions: int):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, prepared_cv: dict) -> str:
+        """
+        Store a prepared CV and return its new cv_id.
+
+        Args:
+            prepared_cv: Result of scoring.prepare_cv
+
+        Returns:
+            Identifier to pass as cv_id to the scoring endpoints
+        """
+        cv_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            self._sessions[cv_id] = (time.monotonic() + self.ttl, prepared_cv)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return cv_id
+
+    def get(self, cv_id: str) -> Optional[dict]:
+        """
+        Return the prepared CV for cv_id and extend its expiry.
+
+        Returns:
+            The prepared CV, or None if unknown or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(cv_id)
+            if entry is None:
+                return None
+
+            expires_at, prepared_cv = entry
+            if expires_at <= now:
+                del self._sessions[cv_id]
+                return None
+
+            self._sessions[cv_id] = (now + self.ttl, prepared_cv)
+            self._sessions.move_to_end(cv_id)
+            return prepared_cv
+
+    def remove(self, cv_id: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+        with self._lock:
+            return self._sessions.pop(cv_id, None) is not None
+
+    def stats(self) -> dict:
+        """Return the number of live sessions and store limits."""
+        with self._lock:
+            self._purge_expired()
+            return {
+                "store": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl,
+            }
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [cv_id for cv_id, (expires_at, _) in self._sessions.items() if expires_at <= now]
+        for cv_id in expired:
+            del self._sessions[cv_id]
+
+
+class CVSessionFileStore:
+    """
+    Store of prepared CVs shared by the server workers of a node.
+
+    Each session is a pickle file named after its cv_id; its modification
+    time is the last use, so expiry and least-recently-used eviction follow
+    the same rules as CVSessionStore in every worker. Session files are
+    written once, so each worker also keeps a few recently used sessions
+    unpickled and only checks that their file is still there.
+    """
+
+    def __init__(self, directory: Path, ttl: int, max_sessions: int, cache_size: int = 64):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, cv_id: str) -> Optional[Path]:
+        # cv_ids come from URLs and request bodies; only our own hex ids map to files
+        if not CV_ID_PATTERN.fullmatch(cv_id):
+            return None
+        return self.directory / f"{cv_id}.pkl"
+
+    def register(self, prepared_cv: dict) -> str:
+        """
+        Store a prepared CV and return its new cv_id.
+
+        Args:
+            prepared_cv: Result of scoring.prepare_cv
+
+        Returns:
+            Identifier to pass as cv_id to the scoring endpoints
+        """
+        cv_id = uuid.uuid4().hex
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as f:
+            pickle.dump(prepared_cv, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, self._path(cv_id))
+
+        with self._lock:
+            self._remember(cv_id, prepared_cv)
+        self._purge()
+        return cv_id
+
+    def get(self, cv_id: str) -> Optional[dict]:
+        """
+        Return the prepared CV for cv_id and extend its expiry.
+
+        Returns:
+            The prepared CV, or None if unknown or expired
+        """
+        path = self._path(cv_id)
+        if path is None:
+            return None
+
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl:
+                self._delete(cv_id)
+                return None
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(cv_id)
+            return None
+
+        with self._lock:
+            prepared_cv = self._cache.get(cv_id)
+            if prepared_cv is not None:
+                self._cache.move_to_end(cv_id)
+                return prepared_cv
+
+        try:
+            with open(path, "rb") as f:
+                prepared_cv = pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            self._remember(cv_id, prepared_cv)
+        return prepared_cv
+
+    def remove(self, cv_id: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+        return self._delete(cv_id)
+
+    def stats(self) -> dict:
+        """Return the number of live sessions and store limits."""
+        return {
+            "store": "file",
+            "sessions": len(self._purge()),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl,
+            "directory": str(self.directory),
+        }
+
+    def _remember(self, cv_id: str, prepared_cv: dict) -> None:
+        self._cache[cv_id] = prepared_cv
+        self._cache.move_to_end(cv_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _forget(self, cv_id: str) -> None:
+        with self._lock:
+            self._cache.pop(cv_id, None)
+
+    def _delete(self, cv_id: str) -> bool:
+        self._forget(cv_id)
+        path = self._path(cv_id)
+        if path is None:
+            return False
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _purge(self) -> list[str]:
+        """Delete expired sessions and the least recently used ones over the limit; return the rest."""
+        now = time.time()
+        sessions = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime >= self.ttl:
+                self._delete(path.stem)
+            else:
+                sessions.append((mtime, path.stem))
+
+        sessions.sort()
+        while len(sessions) > self.max_sessions:
+            _, cv_id = sessions.pop(0)
+            self._delete(cv_id)
+        return [cv_id for _, cv_id in sessions]
+
+
+if CV_SESSION_STORE == "file":
+    cv_sessions = CVSessionFileStore(CV_SESSION_DIR, CV_SESSION_TTL, CV_SESSION_MAX)
+else:
+    cv_sessions = CVSessionStore(CV_SESSION_TTL, CV_SESSION_MAX)
@@ -0,0 +1,266 @@
+"""
+Append-only on-disk store of job embeddings.
+
+Vectors live in a memory-mapped `.npy` matrix and an append-only offsets
+file maps each key to its row. Readers map the matrix read-only, so several
+worker processes on one node share the same pages through the page cache.
+Writers serialize through a file lock and always write vectors before the
+offset lines that make them visible.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from tech_keywords import CACHE_DIR
+
+# Store configuration
+EMBEDDING_STORE_ENABLED = os.environ.get("EMBEDDING_STORE_ENABLED", "1") == "1"
+EMBEDDING_STORE_DIR = Path(os.environ.get("EMBEDDING_STORE_DIR", str(CACHE_DIR / "embeddings")))
+
+VECTORS_FILE = "vectors.npy"
+OFFSETS_FILE = "offsets.txt"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+class EmbeddingStore:
+    """
+    Persistent key -> embedding store backed by a memory-mapped matrix.
+
+    Rows are never rewritten. When the matrix is full it is copied into a
+    file twice as large and atomically renamed over the old one; readers
+    notice the new inode and remap it. Discarding the store bumps the
+    generation in meta.json, and every process drops the rows it had read
+    once it sees the new generation.
+    """
+
+    def __init__(self, directory: Path, model_name: str, initial_capacity: int = 1024):
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._offsets_pos = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._vectors_inode: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._meta_inode: Optional[int] = None
+        self._foreign = False  # meta.json belongs to another model
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / VECTORS_FILE
+
+    @property
+    def _offsets_path(self) -> Path:
+        return self.directory / OFFSETS_FILE
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / META_FILE
+
+    def _file_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.directory / LOCK_FILE, "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, generation: int, dim: Optional[int]) -> None:
+        """Replace meta.json atomically through a uniquely named temporary file."""
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as f:
+            json.dump({"model_name": self.model_name, "dim": dim, "generation": generation}, f)
+        os.replace(f.name, self._meta_path)
+
+    def _clear_state(self) -> None:
+        self._rows = {}
+        self._offsets_pos = 0
+        self._vectors = None
+        self._vectors_inode = None
+
+    def _reset_files(self, dim: Optional[int] = None) -> None:
+        """Delete the stored embeddings and start a new generation. Call with the file lock held."""
+        meta = self._read_meta() or {}
+        for name in (VECTORS_FILE, OFFSETS_FILE):
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+        # Written last, so other processes never see the new generation next to the old rows
+        self._write_meta(meta.get("generation", 0) + 1, dim)
+        self._clear_state()
+
+    def _is_foreign(self, meta: dict, dim: Optional[int]) -> bool:
+        stored_dim = meta.get("dim")
+        return meta.get("model_name") != self.model_name or (
+            dim is not None and stored_dim is not None and stored_dim != dim
+        )
+
+    def _check_meta(self, dim: Optional[int] = None) -> None:
+        """Discard a store written by another model or with another dimension."""
+        meta = self._read_meta()
+        if meta is None or not self._is_foreign(meta, dim):
+            return
+        with self._file_lock():
+            # Another process may have discarded it while we waited for the lock
+            meta = self._read_meta()
+            if meta is not None and self._is_foreign(meta, dim):
+                print(f"Discarding embedding store built with {meta.get('model_name')} (dim {meta.get('dim')})")
+                self._reset_files(dim)
+
+    def _refresh(self) -> None:
+        """Pick up offset lines appended by other processes and remap if needed."""
+        try:
+            meta_inode = os.stat(self._meta_path).st_ino
+        except FileNotFoundError:
+            meta_inode = None
+        if meta_inode != self._meta_inode:
+            # meta.json is only replaced when the store is created or discarded
+            meta = self._read_meta() if meta_inode is not None else None
+            generation = meta.get("generation", 0) if meta is not None else None
+            self._foreign = meta is not None and self._is_foreign(meta, None)
+            if generation != self._generation or self._foreign:
+                # The files were discarded, possibly by another process: forget the rows read so far
+                self._clear_state()
+                self._generation = generation
+            self._meta_inode = meta_inode
+        if self._foreign:
+            # Left for the next append to discard; it checks the meta before taking the file lock
+            return
+
+        try:
+            with open(self._offsets_path, "rb") as f:
+                f.seek(self._offsets_pos)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Only consume complete lines; a concurrent writer may be mid-line
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            key, row = line.decode("utf-8").split("\t")
+            self._rows[key] = int(row)
+        self._offsets_pos += end
+
+        try:
+            inode = os.stat(self._vectors_path).st_ino
+        except FileNotFoundError:
+            return
+        if self._vectors is None or inode != self._vectors_inode:
+            self._vectors = np.load(self._vectors_path, mmap_mode="r")
+            self._vectors_inode = inode
+
+    def get_many(self, keys: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Look up embeddings by key.
+
+        Returns:
+            List aligned with keys: read-only views into the mapped file,
+            or None for keys not in the store
+        """
+        with self._lock:
+            self._refresh()
+            found = []
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None or self._vectors is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    found.append(self._vectors[row])
+            return found
+
+    def append(self, keys: list[str], vectors: np.ndarray) -> None:
+        """
+        Append embeddings for keys that are not stored yet.
+
+        Args:
+            keys: Keys, one per row of vectors
+            vectors: Array of shape (len(keys), dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not keys:
+            return
+
+        with self._lock:
+            self._check_meta(dim=vectors.shape[1])
+            with self._file_lock():
+                self._refresh()
+                if self._foreign:
+                    # Discarded and taken over by another model since the check above
+                    return
+
+                new = {}
+                for key, vector in zip(keys, vectors):
+                    if key not in self._rows and key not in new:
+                        new[key] = vector
+                if not new:
+                    return
+
+                meta = self._read_meta()
+                if meta is None or meta.get("dim") is None:
+                    generation = meta.get("generation", 0) if meta is not None else 0
+                    self._write_meta(generation, int(vectors.shape[1]))
+
+                start = len(self._rows)
+                needed = start + len(new)
+                matrix = self._writable_matrix(needed, vectors.shape[1])
+                matrix[start:needed] = np.stack(list(new.values()))
+                matrix.flush()
+                del matrix
+
+                # Rows become visible to readers only once their offsets are written
+                with open(self._offsets_path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{key}\t{start + i}\n" for i, key in enumerate(new)))
+
+                self._refresh()
+
+    def _writable_matrix(self, needed: int, dim: int) -> np.ndarray:
+        """Open the vectors file for writing, growing it if it is too small."""
+        if not self._vectors_path.exists():
+            capacity = max(self.initial_capacity, needed)
+            return np.lib.format.open_memmap(self._vectors_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+
+        matrix = np.load(self._vectors_path, mmap_mode="r+")
+        if matrix.shape[0] >= needed:
+            return matrix
+
+        capacity = matrix.shape[0]
+        while capacity < needed:
+            capacity *= 2
+
+        tmp_path = self._vectors_path.with_name(VECTORS_FILE + ".tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        grown[:len(self._rows)] = matrix[:len(self._rows)]
+        grown.flush()
+        del matrix
+        os.replace(tmp_path, self._vectors_path)
+        return grown
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            self._refresh()
+            return {
+                "directory": str(self.directory),
+                "rows": len(self._rows),
+                "capacity": int(self._vectors.shape[0]) if self._vectors is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,117 @@
+"""
+Bounded executors for blocking work called from the async API handlers.
+Model inference, job board scraping and index building each run on their
+own thread pool, so a bulk scrape cannot starve interactive scoring and
+the event loop stays free to answer /health.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Concurrency limits per workload
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "4"))
+# One per job board of a /scrape, plus room for one timed-out scrape per board still running
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", "10"))
+INDEX_WORKERS = int(os.environ.get("INDEX_WORKERS", "1"))
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a fixed number of workers, awaitable from asyncio.
+
+    The pool is created lazily so that a process forked after import
+    (e.g. a pre-forked server worker) starts its own threads.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._pending = 0
+        self.completed = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-worker",
+                )
+                self._pid = os.getpid()
+                self._active = 0
+                self._pending = 0
+            return self._pool
+
+    def _dequeue(self, claim: list) -> None:
+        # Called with the lock held, by whichever of start or cancellation comes first
+        if not claim[0]:
+            claim[0] = True
+            self._pending -= 1
+
+    def _track(self, fn: Callable[[], Any], claim: list) -> Any:
+        with self._lock:
+            self._dequeue(claim)
+            self._active += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking function on this executor and await its result.
+
+        Args:
+            fn: Function to call
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            Whatever fn returns (exceptions are re-raised in the caller)
+
+        Cancelling the caller (e.g. asyncio.wait_for timing out) drops a call
+        that has not started yet; one already running finishes in its thread.
+        """
+        pool = self._get_pool()
+        call = functools.partial(fn, *args, **kwargs)
+        claim = [False]
+        with self._lock:
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, self._track, call, claim)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._dequeue(claim)
+            raise
+
+    def stats(self) -> dict:
+        """Return worker limit and current load."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._pending,
+                "completed": self.completed,
+            }
+
+
+inference_executor = BoundedExecutor("inference", INFERENCE_WORKERS)
+scrape_executor = BoundedExecutor("scrape", SCRAPE_WORKERS)
+index_executor = BoundedExecutor("index", INDEX_WORKERS)
+
+
+def get_executor_status() -> dict:
+    """Return load statistics for every executor."""
+    return {
+        executor.name: executor.stats()
+        for executor in (inference_executor, scrape_executor, index_executor)
+    }
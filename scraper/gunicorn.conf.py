@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the multi-worker server mode.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the parent, which then loads the model and the
+keyword tables (prefork.preload_shared_state) before forking WEB_CONCURRENCY
+uvicorn workers that share those pages copy-on-write.
+
+State that clients change is shared through CACHE_DIR, so requests need no
+sticky routing:
+- registered CVs are session files (cv_sessions, CV_SESSION_STORE=file);
+- the TF-IDF corpus is saved after every change, under a file lock, and
+  the other workers reload it within TFIDF_RELOAD_INTERVAL seconds;
+- the job index is an append-only log every worker reads before a search.
+The embedding cache stays per worker, since it is only a cache.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # Runs in the parent after the app is imported and before workers fork
+    from prefork import preload_shared_state
+
+    preload_shared_state()
+
+
+def post_fork(server, worker):
+    from prefork import configure_worker
+
+    configure_worker(server.cfg.workers)
@@ -0,0 +1,318 @@
+"""
+Incremental document-frequency index for TF-IDF term specificity.
+Keeps per-term document counts so job descriptions can be added and removed
+(e.g. expired postings) without refitting on the whole corpus. IDF values
+follow scikit-learn's TfidfVectorizer (smooth_idf, max_df, max_features).
+The index is persisted as a versioned .npz snapshot of the per-document
+term counts.
+"""
+
+import fcntl
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+# Same tokenization as the TfidfVectorizer this index replaces (applied to lowercased text)
+TFIDF_TOKEN_PATTERN = re.compile(r'\b[a-zA-Z][a-zA-Z0-9+#._-]*[a-zA-Z0-9]\b|\b[a-zA-Z]\b')
+TFIDF_MAX_FEATURES = 10000
+TFIDF_MAX_DF = 0.95  # Exclude terms appearing in >95% of docs
+
+# Layout of the saved snapshot; files with another format are ignored
+SNAPSHOT_FORMAT = 1
+
+
+def count_terms(text: str) -> Counter:
+    """Term counts of one document, tokenized like the TF-IDF vectorizer."""
+    return Counter(TFIDF_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _pack_strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte array plus offsets."""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+class IdfIndex:
+    """
+    Document frequencies of the terms in a corpus of documents keyed by id.
+
+    Adding or removing documents only touches the terms of those documents,
+    so an update costs O(size of the batch). IDF scores are recomputed from
+    the counters on the first read after a change and cached until the next
+    one; the cached dict is never mutated, so callers can detect a new index
+    by identity.
+
+    Every change increments `version`. save() writes the documents' term
+    counts to `path` atomically; load() restores them without re-tokenizing.
+    Loaded documents stay in the snapshot arrays until they are removed.
+    Processes sharing `path` serialize their changes with file_lock() and
+    use is_stale() to notice snapshots saved by the others.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_features: Optional[int] = TFIDF_MAX_FEATURES,
+        max_df: float = TFIDF_MAX_DF,
+    ):
+        self.path = path
+        self.max_features = max_features
+        self.max_df = max_df
+        self.version = 0
+        self.saved_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # doc id -> term counts, or the row of a document in the loaded snapshot
+        self._documents: dict[str, Union[Counter, int]] = {}
+        self._snapshot: Optional[tuple[list[str], list[int], np.ndarray, np.ndarray]] = None
+        self._df: Counter = Counter()  # term -> number of documents containing it
+        self._tf: Counter = Counter()  # term -> occurrences in the corpus (for max_features)
+        self._idf: Optional[dict] = None
+        self._dirty = False
+        self._file_signature: Optional[tuple] = None  # of the snapshot file last loaded or saved
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _term_counts(self, entry: Union[Counter, int], snapshot) -> list[tuple[str, int]]:
+        """(term, count) pairs of a stored document."""
+        if not isinstance(entry, int):
+            return list(entry.items())
+        terms, offsets, term_ids, counts = snapshot
+        start, end = offsets[entry], offsets[entry + 1]
+        return [(terms[i], c) for i, c in zip(term_ids[start:end].tolist(), counts[start:end].tolist())]
+
+    def _remove(self, doc_id: str) -> bool:
+        entry = self._documents.pop(doc_id, None)
+        if entry is None:
+            return False
+        for term, count in self._term_counts(entry, self._snapshot):
+            df = self._df[term] - 1
+            tf = self._tf[term] - count
+            if df:
+                self._df[term] = df
+                self._tf[term] = tf
+            else:
+                del self._df[term]
+                del self._tf[term]
+        return True
+
+    def add_documents(self, texts: list[str], ids: Optional[list[Optional[str]]] = None) -> list[str]:
+        """
+        Add documents to the index. Adding an existing id replaces it.
+
+        Args:
+            texts: Document texts
+            ids: Document ids aligned with texts (random ids when omitted or None)
+
+        Returns:
+            Ids of the added documents
+        """
+        if ids is None:
+            ids = [None] * len(texts)
+        elif len(ids) != len(texts):
+            raise ValueError(f"Got {len(ids)} ids for {len(texts)} documents")
+        ids = [doc_id if doc_id is not None else uuid.uuid4().hex for doc_id in ids]
+
+        # Tokenize outside the lock; only counter updates are serialized
+        batch = [count_terms(text) for text in texts]
+        with self._lock:
+            for doc_id, counts in zip(ids, batch):
+                self._remove(doc_id)
+                self._documents[doc_id] = counts
+                self._df.update(counts.keys())
+                self._tf.update(counts)
+            if batch:
+                self._dirty = True
+                self.version += 1
+        return ids
+
+    def remove_documents(self, ids: list[str]) -> int:
+        """
+        Remove documents from the index.
+
+        Returns:
+            Number of documents actually removed
+        """
+        with self._lock:
+            removed = sum(self._remove(doc_id) for doc_id in ids)
+            if removed:
+                self._dirty = True
+                self.version += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        with self._lock:
+            if self._documents:
+                self.version += 1
+            self._documents = {}
+            self._snapshot = None
+            self._df = Counter()
+            self._tf = Counter()
+            self._idf = None
+            self._dirty = False
+
+    def idf_scores(self) -> Optional[dict]:
+        """
+        Get term -> IDF, or None when no term survives pruning.
+
+        idf = ln((1 + n) / (1 + df)) + 1, over terms in at most max_df of the
+        n documents, keeping the max_features most frequent ones.
+        """
+        with self._lock:
+            if self._dirty:
+                self._idf = self._compute_idf() or None
+                self._dirty = False
+            return self._idf
+
+    def _compute_idf(self) -> dict:
+        n_docs = len(self._documents)
+        max_doc_count = self.max_df * n_docs
+        terms = [term for term, df in self._df.items() if df <= max_doc_count]
+        if self.max_features is not None and len(terms) > self.max_features:
+            terms.sort()
+            terms.sort(key=self._tf.__getitem__, reverse=True)
+            terms = terms[:self.max_features]
+        return {term: math.log((n_docs + 1) / (self._df[term] + 1)) + 1 for term in sorted(terms)}
+
+    def save(self) -> None:
+        """Write the index to disk atomically."""
+        if self.path is None:
+            return
+
+        with self._lock:
+            terms = sorted(self._df)
+            ids = list(self._documents)
+            entries = list(self._documents.values())
+            snapshot = self._snapshot
+            version = self.version
+
+        # Stored documents are never mutated, so they can be read unlocked
+        term_index = {term: i for i, term in enumerate(terms)}
+        offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+        term_ids: list[int] = []
+        counts: list[int] = []
+        for row, entry in enumerate(entries):
+            for term, count in self._term_counts(entry, snapshot):
+                term_ids.append(term_index[term])
+                counts.append(count)
+            offsets[row + 1] = len(term_ids)
+
+        term_blob, term_offsets = _pack_strings(terms)
+        id_blob, id_offsets = _pack_strings(ids)
+        saved_at = time.time()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.path.parent, suffix=".tmp", delete=False) as f:
+            np.savez(
+                f,
+                format=np.array(SNAPSHOT_FORMAT),
+                version=np.array(version),
+                saved_at=np.array(saved_at),
+                terms=term_blob,
+                term_offsets=term_offsets,
+                ids=id_blob,
+                id_offsets=id_offsets,
+                doc_offsets=offsets,
+                term_ids=np.array(term_ids, dtype=np.int32),
+                counts=np.array(counts, dtype=np.int32),
+            )
+        os.replace(f.name, self.path)
+        self.saved_at = saved_at
+        self._file_signature = self._read_file_signature()
+
+    def load(self) -> bool:
+        """
+        Load the index from disk if present.
+
+        Returns:
+            True if an index was loaded
+        """
+        if self.path is None or not self.path.exists():
+            return False
+
+        # Taken before reading, so a snapshot replaced mid-read is loaded again later
+        signature = self._read_file_signature()
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data["format"]) != SNAPSHOT_FORMAT:
+                    print(f"Ignoring TF-IDF snapshot with format {data['format']}")
+                    return False
+                version = int(data["version"])
+                saved_at = float(data["saved_at"])
+                terms = _unpack_strings(data["terms"], data["term_offsets"])
+                ids = _unpack_strings(data["ids"], data["id_offsets"])
+                offsets = data["doc_offsets"].tolist()
+                term_ids = data["term_ids"]
+                counts = data["counts"]
+        except Exception as e:
+            print(f"Error loading TF-IDF snapshot: {e}")
+            return False
+
+        # Corpus counters in two vectorized passes over the snapshot
+        df = np.bincount(term_ids, minlength=len(terms)).tolist()
+        tf = np.bincount(term_ids, weights=counts, minlength=len(terms)).astype(np.int64).tolist()
+
+        with self._lock:
+            self._documents = dict(zip(ids, range(len(ids))))
+            self._snapshot = (terms, offsets, term_ids, counts)
+            self._df = Counter(dict(zip(terms, df)))
+            self._tf = Counter(dict(zip(terms, tf)))
+            self._idf = None
+            self._dirty = True
+            self.version = version
+            self.saved_at = saved_at
+            self._file_signature = signature
+        print(f"Loaded TF-IDF snapshot v{version} with {len(ids)} documents")
+        return True
+
+    def _read_file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def is_stale(self) -> bool:
+        """True if another process saved a snapshot since this index last loaded or saved one."""
+        signature = self._read_file_signature()
+        return signature is not None and signature != self._file_signature
+
+    def file_lock(self):
+        """Exclusive lock shared by every process using `path` (a no-op without a path)."""
+        if self.path is None:
+            return nullcontext()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path.with_name(self.path.name + ".lock"), "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def stats(self) -> dict:
+        """Return corpus and vocabulary sizes and the snapshot version."""
+        with self._lock:
+            return {
+                "documents": len(self._documents),
+                "terms": len(self._df),
+                "version": self.version,
+                "saved_at": self.saved_at,
+                "age_seconds": round(time.time() - self.saved_at, 1) if self.saved_at else None,
+                "path": str(self.path) if self.path else None,
+            }
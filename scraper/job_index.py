@@ -0,0 +1,508 @@
+"""
+Dense job-embedding index for top-k job retrieval.
+Small corpora are searched exactly with one NumPy matrix-vector product.
+Large corpora use an IVF (inverted file) structure: jobs are clustered
+around k-means centroids and only the closest clusters are scanned.
+
+On disk the index is laid out like the embedding store: vectors are
+appended to a memory-mapped matrix with spare capacity, and an append-only
+log records which row holds each job. Adding or removing jobs writes only
+the changed rows and log lines, and every process picks up the log lines
+written by the others before it reads the index.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from tech_keywords import CACHE_DIR
+
+# Index configuration
+JOB_INDEX_DIR = Path(os.environ.get("JOB_INDEX_DIR", str(CACHE_DIR / "job_index")))
+JOB_INDEX_IVF_THRESHOLD = int(os.environ.get("JOB_INDEX_IVF_THRESHOLD", "20000"))  # jobs before switching to IVF
+JOB_INDEX_NPROBE = int(os.environ.get("JOB_INDEX_NPROBE", "8"))  # clusters scanned per IVF query
+JOB_INDEX_COMPACT_MIN = int(os.environ.get("JOB_INDEX_COMPACT_MIN", "1024"))  # dead rows before compacting
+JOB_INDEX_IVF_REBUILD_RATIO = float(os.environ.get("JOB_INDEX_IVF_REBUILD_RATIO", "0.25"))  # changes per clustered job before re-clustering
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _grow(array: np.ndarray, needed: int, initial_capacity: int) -> np.ndarray:
+    """Return array, or a copy at least twice as large if it holds fewer than needed rows."""
+    if len(array) >= needed:
+        return array
+    capacity = max(len(array), initial_capacity)
+    while capacity < needed:
+        capacity *= 2
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobIndex:
+    """
+    Index of normalized job embeddings keyed by job id.
+
+    Rows are never rewritten: adding a job appends a row, and re-adding or
+    removing one marks its old row dead. Dead rows are dropped by rewriting
+    the index once they outnumber the live ones. Searches use the rows
+    present when they start, so a concurrent add or remove never changes a
+    vector under them.
+
+    With a directory the index is persisted there after every change and
+    shared by every process using that directory; an index built with a
+    different model is discarded.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        directory: Optional[Path] = None,
+        ivf_threshold: int = JOB_INDEX_IVF_THRESHOLD,
+        nprobe: int = JOB_INDEX_NPROBE,
+        initial_capacity: int = 1024,
+    ):
+        self.model_name = model_name
+        self.directory = Path(directory) if directory is not None else None
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._ids: list[Optional[str]] = []  # job id per row, None once the row is dead
+        self._rows: dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.ndarray] = None  # rows [:len(self._ids)] are in use
+        self._ivf: Optional[dict] = None
+        self._ivf_changes = 0  # adds and removes since the IVF was clustered
+        self._generation: Optional[int] = None
+        self._meta_inode: Optional[int] = None
+        self._vectors_inode: Optional[int] = None
+        self._log_pos = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    # --- Persistence -------------------------------------------------------
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / META_FILE
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.directory / f"vectors-{generation}.npy"
+
+    def _log_path(self, generation: int) -> Path:
+        return self.directory / f"log-{generation}.txt"
+
+    def _file_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.directory / LOCK_FILE, "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, generation: int, dim: int) -> None:
+        """Replace meta.json atomically through a uniquely named temporary file."""
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as f:
+            json.dump({"model_name": self.model_name, "dim": dim, "generation": generation}, f)
+        os.replace(f.name, self._meta_path)
+
+    def _refresh(self) -> None:
+        """Pick up log lines written by other processes and remap the vectors if needed."""
+        if self.directory is None:
+            return
+
+        try:
+            meta_inode = os.stat(self._meta_path).st_ino
+        except FileNotFoundError:
+            if self._generation is not None:
+                self._reset_state()
+            return
+
+        if meta_inode != self._meta_inode:
+            # meta.json is only replaced when the index is created, rewritten or discarded
+            meta = self._read_meta()
+            if meta is None or meta.get("model_name") != self.model_name:
+                self._reset_state()
+                self._meta_inode = meta_inode
+                return
+            if meta["generation"] != self._generation:
+                self._reset_state()
+                self._generation = meta["generation"]
+            self._meta_inode = meta_inode
+
+        try:
+            with open(self._log_path(self._generation), "rb") as f:
+                f.seek(self._log_pos)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Only consume complete lines; a concurrent writer may be mid-line
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._apply(*json.loads(line))
+        self._log_pos += end
+
+        vectors_path = self._vectors_path(self._generation)
+        try:
+            inode = os.stat(vectors_path).st_ino
+        except FileNotFoundError:
+            return
+        if self._vectors is None or inode != self._vectors_inode:
+            self._vectors = np.load(vectors_path, mmap_mode="r")
+            self._vectors_inode = inode
+
+    def _apply(self, op: str, job_id: str, row: Optional[int] = None) -> None:
+        """Apply one log entry: ("+", id, row) stores a job at a row, ("-", id) removes it."""
+        old = self._rows.pop(job_id, None)
+        if old is not None:
+            self._ids[old] = None
+            self._alive[old] = False
+        if op == "+":
+            self._rows[job_id] = row
+            self._ids.append(job_id)
+            self._alive = _grow(self._alive, row + 1, self.initial_capacity)
+            self._alive[row] = True
+        self._ivf_changes += 1
+
+    def _commit(self, entries: list[tuple]) -> None:
+        """Make log entries visible: append them to the log, or apply them directly in memory."""
+        if self.directory is None:
+            for entry in entries:
+                self._apply(*entry)
+            return
+
+        # Rows become visible to readers only once their log lines are written
+        with open(self._log_path(self._generation), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._refresh()
+
+    def _writable_matrix(self, needed: int, dim: int) -> np.ndarray:
+        """Return a matrix with room for `needed` rows, growing it if it is too small."""
+        if self.directory is None:
+            if self._vectors is None:
+                return np.zeros((max(self.initial_capacity, needed), dim), dtype=np.float32)
+            # Rows past len(self._ids) are not visible to searches, so they can be written in place
+            return _grow(self._vectors, needed, self.initial_capacity)
+
+        path = self._vectors_path(self._generation)
+        matrix = np.load(path, mmap_mode="r+")
+        if matrix.shape[0] >= needed:
+            return matrix
+
+        capacity = matrix.shape[0]
+        while capacity < needed:
+            capacity *= 2
+        grown = self._new_matrix(capacity, dim)
+        grown[:len(self._ids)] = matrix[:len(self._ids)]
+        grown.flush()
+        del matrix
+        os.replace(grown.filename, path)
+        return grown
+
+    def _new_matrix(self, capacity: int, dim: int) -> np.ndarray:
+        """Create a memory-mapped matrix under a unique temporary name in the index directory."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".npy.tmp")
+        os.close(fd)
+        return np.lib.format.open_memmap(tmp_name, mode="w+", dtype=np.float32, shape=(capacity, dim))
+
+    def _prepare_write(self, dim: Optional[int]) -> None:
+        """Bring the index up to date before a write; creates or discards the files as needed."""
+        self._refresh()
+        if self.directory is None or dim is None:
+            return
+
+        meta = self._read_meta()
+        if meta is not None and meta.get("model_name") == self.model_name:
+            return
+        old_generation = None
+        if meta is not None:
+            print(f"Discarding job index built with {meta.get('model_name')}")
+            old_generation = meta.get("generation")
+        self._rewrite(np.empty((0, dim), dtype=np.float32), [], old_generation)
+
+    def _rewrite(self, vectors: np.ndarray, ids: list[str], old_generation: Optional[int]) -> None:
+        """Write a new generation of the index holding exactly these rows, replacing old_generation."""
+        generation = (old_generation if old_generation is not None else -1) + 1
+        matrix = self._new_matrix(max(self.initial_capacity, len(ids)), vectors.shape[1])
+        matrix[:len(ids)] = vectors
+        matrix.flush()
+        os.replace(matrix.filename, self._vectors_path(generation))
+        del matrix
+        with open(self._log_path(generation), "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(["+", job_id, row]) + "\n" for row, job_id in enumerate(ids)))
+
+        self._write_meta(generation, int(vectors.shape[1]))
+        if old_generation is not None:
+            # Readers that still map the old files keep them open until they remap
+            for path in (self._vectors_path(old_generation), self._log_path(old_generation)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+        self._refresh()
+
+    def _maybe_compact(self) -> None:
+        """Drop dead rows once they outnumber the live ones."""
+        dead = len(self._ids) - len(self._rows)
+        if dead < max(JOB_INDEX_COMPACT_MIN, len(self._rows)):
+            return
+
+        ids = list(self._rows)
+        vectors = np.asarray(self._vectors[[self._rows[job_id] for job_id in ids]], dtype=np.float32)
+        if self.directory is not None:
+            self._rewrite(vectors, ids, self._generation)
+            return
+
+        self._reset_state()
+        self._vectors = _grow(vectors, len(ids), self.initial_capacity)
+        self._commit([("+", job_id, row) for row, job_id in enumerate(ids)])
+
+    def _write_lock(self):
+        """File lock for a persisted index; in-memory indexes only need the thread lock."""
+        return self._file_lock() if self.directory is not None else nullcontext()
+
+    # --- Public API --------------------------------------------------------
+
+    def add(self, ids: list[str], embeddings: np.ndarray) -> None:
+        """
+        Insert or replace job embeddings.
+
+        Args:
+            ids: Job ids, one per row of embeddings
+            embeddings: Array of shape (len(ids), dim)
+        """
+        if not ids:
+            return
+
+        embeddings = _normalize(embeddings)
+        # The last vector wins when an id is repeated within the batch
+        batch = dict(zip(ids, range(len(ids))))
+        dim = embeddings.shape[1]
+
+        with self._lock, self._write_lock():
+            self._prepare_write(dim)
+            if self._vectors is not None and self._vectors.shape[1] != dim:
+                raise ValueError(
+                    f"Embedding dimension {dim} does not match index dimension {self._vectors.shape[1]}"
+                )
+
+            start = len(self._ids)
+            needed = start + len(batch)
+            matrix = self._writable_matrix(needed, dim)
+            matrix[start:needed] = embeddings[list(batch.values())]
+            if self.directory is None:
+                self._vectors = matrix
+            else:
+                matrix.flush()
+                del matrix
+
+            self._commit([("+", job_id, start + i) for i, job_id in enumerate(batch)])
+            self._maybe_compact()
+
+    def remove(self, ids: list[str]) -> int:
+        """
+        Remove jobs from the index.
+
+        Returns:
+            Number of jobs actually removed
+        """
+        with self._lock, self._write_lock():
+            self._prepare_write(None)
+            drop = [job_id for job_id in dict.fromkeys(ids) if job_id in self._rows]
+            if not drop:
+                return 0
+
+            self._commit([("-", job_id) for job_id in drop])
+            self._maybe_compact()
+            return len(drop)
+
+    def search(self, query: np.ndarray, top_k: int = 20) -> list[tuple[str, float]]:
+        """
+        Find the jobs most similar to a query embedding.
+
+        Args:
+            query: Embedding of shape (dim,)
+            top_k: Number of results to return
+
+        Returns:
+            List of (job_id, cosine_similarity) pairs, best first
+        """
+        with self._lock:
+            self._refresh()
+            # Rows are tombstoned in place, so take a copy for use after the lock is released
+            ids = list(self._ids)
+            count = len(ids)
+            live = len(self._rows)
+            vectors = self._vectors[:count] if self._vectors is not None else None
+            alive = self._alive[:count].copy()
+            ivf = self._current_ivf(vectors, alive) if live > self.ivf_threshold else None
+
+        top_k = min(top_k, live)
+        if vectors is None or top_k <= 0:
+            return []
+
+        query = _normalize(query)
+
+        if ivf is None:
+            scores = np.where(alive, vectors @ query, -np.inf)
+            best = _top_k(scores, top_k)
+            return [(ids[row], float(scores[row])) for row in best if ids[row] is not None]
+
+        # Scan only the clusters whose centroids are closest to the query
+        probes = _top_k(ivf["centroids"] @ query, self.nprobe)
+        candidates = np.concatenate([ivf["lists"][probe] for probe in probes])
+        candidates = candidates[alive[candidates]]
+        scores = vectors[candidates] @ query
+        best = _top_k(scores, top_k)
+        return [(ids[candidates[i]], float(scores[i])) for i in best]
+
+    def _current_ivf(self, vectors: np.ndarray, alive: np.ndarray) -> dict:
+        """
+        Return the IVF for the rows in use, bringing it up to date first.
+
+        Rows added since the last update are assigned to their nearest
+        centroid, and removed rows stay in their lists until searches skip
+        them. The centroids are only re-clustered once the adds and removes
+        since the last clustering exceed JOB_INDEX_IVF_REBUILD_RATIO of the
+        jobs clustered then.
+        """
+        ivf = self._ivf
+        if ivf is None or self._ivf_changes > JOB_INDEX_IVF_REBUILD_RATIO * ivf["size"]:
+            rows = np.flatnonzero(alive)
+            self._ivf = dict(self._build_ivf(vectors, rows), rows=len(alive), size=len(rows))
+            self._ivf_changes = 0
+            return self._ivf
+        if ivf["rows"] == len(alive):
+            return ivf
+
+        new_rows = ivf["rows"] + np.flatnonzero(alive[ivf["rows"]:])
+        assignment = np.argmax(vectors[new_rows] @ ivf["centroids"].T, axis=1)
+        # Searches outside the lock may still hold the old lists, so extend copies
+        lists = list(ivf["lists"])
+        for c in np.unique(assignment):
+            lists[c] = np.concatenate([lists[c], new_rows[assignment == c]])
+        self._ivf = dict(ivf, lists=lists, rows=len(alive))
+        return self._ivf
+
+    @staticmethod
+    def _build_ivf(vectors: np.ndarray, rows: np.ndarray, iterations: int = 10, seed: int = 0) -> dict:
+        """Cluster the given rows with spherical k-means and build the inverted lists."""
+        n = len(rows)
+        n_lists = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+
+        # Train centroids on a sample, then assign every vector
+        sample = np.asarray(vectors[rows[rng.choice(n, size=min(n, n_lists * 64), replace=False)]])
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assignment = np.argmax(vectors[rows] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        lists = [rows[order[bounds[c]:bounds[c + 1]]] for c in range(n_lists)]
+        return {"centroids": centroids, "lists": lists}
+
+    def load(self) -> bool:
+        """
+        Load the index from its directory if present and built with the same model.
+
+        Returns:
+            True if an index was loaded
+        """
+        if self.directory is None:
+            return False
+
+        meta = self._read_meta()
+        if meta is None:
+            return False
+        if meta.get("model_name") != self.model_name:
+            print(f"Ignoring job index built with {meta.get('model_name')}")
+            return False
+
+        try:
+            with self._lock:
+                self._refresh()
+                jobs = len(self._rows)
+        except Exception as e:
+            print(f"Error loading job index: {e}")
+            with self._lock:
+                self._reset_state()
+            return False
+
+        print(f"Loaded job index with {jobs} jobs")
+        return True
+
+    def stats(self) -> dict:
+        """Return size and search mode."""
+        with self._lock:
+            self._refresh()
+            return {
+                "jobs": len(self._rows),
+                "rows": len(self._ids),
+                "capacity": int(self._vectors.shape[0]) if self._vectors is not None else 0,
+                "dimension": int(self._vectors.shape[1]) if self._vectors is not None else None,
+                "search": "ivf" if len(self._rows) > self.ivf_threshold else "exact",
+                "ivf_threshold": self.ivf_threshold,
+                "nprobe": self.nprobe,
+                "directory": str(self.directory) if self.directory else None,
+            }
+
+
+_job_index: Optional[JobIndex] = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index(model_name: str) -> JobIndex:
+    """
+    Get the shared job index (lazy loaded from JOB_INDEX_DIR).
+    Thread-safe singleton pattern.
+    """
+    global _job_index
+    if _job_index is None:
+        with _job_index_lock:
+            if _job_index is None:
+                index = JobIndex(model_name, JOB_INDEX_DIR)
+                index.load()
+                _job_index = index
+    return _job_index
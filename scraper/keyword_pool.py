@@ -0,0 +1,190 @@
+"""
+Process pool for batch keyword extraction.
+
+Keyword extraction is pure-Python token walking, so threads cannot run it
+in parallel under the GIL. Large batches are split into chunks and spread
+over worker processes instead. Each worker receives the keyword snapshot
+(vocabulary and IDF scores) once, when the pool starts, rather than with
+every chunk; a pool serves a single snapshot version and is replaced when
+a newer snapshot is published.
+
+Only the standard library is imported here: workers are started with the
+forkserver (or spawn) method, so they never inherit the server's threads,
+and import tech_keywords themselves in _init_worker.
+"""
+
+import math
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+# CPU quota of the container (cgroup v2, then v1)
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_DIR = Path("/sys/fs/cgroup/cpu")
+
+
+def _cgroup_cpu_quota(cpu_max: Path = CGROUP_CPU_MAX, v1_dir: Path = CGROUP_V1_CPU_DIR) -> Optional[float]:
+    """CPUs allowed by the cgroup quota (e.g. 0.5 for a 500m limit), or None when unlimited or unknown."""
+    try:
+        quota, period = cpu_max.read_text().split()[:2]
+    except (OSError, ValueError):
+        try:
+            quota = (v1_dir / "cpu.cfs_quota_us").read_text().strip()
+            period = (v1_dir / "cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus(cpu_max: Path = CGROUP_CPU_MAX, v1_dir: Path = CGROUP_V1_CPU_DIR) -> int:
+    """
+    Number of CPUs this process can actually use.
+
+    The cores it may be scheduled on, capped by the container's CPU quota
+    rounded up: a 500m limit gives 1 even on a node with many cores.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota(cpu_max, v1_dir)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+# Worker processes per server worker (default: the CPUs of the container split between server workers)
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+AVAILABLE_CPUS = available_cpus()
+KEYWORD_PROCESS_WORKERS = int(os.environ.get(
+    "KEYWORD_PROCESS_WORKERS", str(max(1, AVAILABLE_CPUS // max(1, WEB_CONCURRENCY)))
+))
+# Smaller batches are extracted in the calling thread (pickling would cost more than it saves)
+KEYWORD_PROCESS_MIN_BATCH = int(os.environ.get("KEYWORD_PROCESS_MIN_BATCH", "200"))
+KEYWORD_PROCESS_CHUNK_SIZE = int(os.environ.get("KEYWORD_PROCESS_CHUNK_SIZE", "50"))  # texts per task
+
+# Snapshot of the current worker process, set by _init_worker
+_worker_snapshot = None
+
+
+def _init_worker(payload: bytes) -> None:
+    """Load the pickled keyword snapshot in a new worker process."""
+    global _worker_snapshot
+
+    # The snapshot replaces the vocabulary and TF-IDF index the module would load from disk
+    os.environ["TECH_KEYWORDS_PRELOAD"] = "0"
+    os.environ["TFIDF_RELOAD_INTERVAL"] = "-1"
+    import tech_keywords
+
+    _worker_snapshot = pickle.loads(payload)
+    tech_keywords._snapshot = _worker_snapshot
+
+
+def _extract_chunk(texts: list[str], max_keywords: int) -> list[list[dict]]:
+    """Extract the keywords of a chunk of texts in a worker process."""
+    from tech_keywords import extract_technical_keywords
+
+    return [extract_technical_keywords(text, max_keywords, snapshot=_worker_snapshot) for text in texts]
+
+
+def _start_method() -> str:
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class KeywordProcessPool:
+    """
+    Lazily started process pool bound to one keyword snapshot version.
+
+    The pool is created on first use, per process (a pre-forked server
+    worker starts its own) and per snapshot version. A batch for a newer
+    snapshot starts a new pool; the old one is shut down without waiting,
+    so batches already submitted to it still complete.
+    """
+
+    def __init__(self, max_workers: int = KEYWORD_PROCESS_WORKERS, chunk_size: int = KEYWORD_PROCESS_CHUNK_SIZE):
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.started = 0
+        self.batches = 0
+        self.texts = 0
+
+    def _get_pool(self, snapshot) -> ProcessPoolExecutor:
+        if self._pool is not None and self._pid == os.getpid() and self._version == snapshot.version:
+            return self._pool
+
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(_start_method()),
+            initializer=_init_worker,
+            initargs=(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL),),
+        )
+        self._pid = os.getpid()
+        self._version = snapshot.version
+        self.started += 1
+        return self._pool
+
+    def _chunks(self, texts: list[str]) -> list[list[str]]:
+        # At least a few chunks per worker, so one slow chunk does not hold up the batch
+        size = min(self.chunk_size, max(1, -(-len(texts) // (self.max_workers * 4))))
+        return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+    def extract(self, texts: list[str], max_keywords: int, snapshot) -> list[list[dict]]:
+        """
+        Extract the keywords of many texts in the worker processes (blocking).
+
+        Args:
+            texts: Texts to extract keywords from
+            max_keywords: Maximum keywords per text
+            snapshot: Keyword snapshot the workers extract against
+
+        Returns:
+            One keyword list per text, in order
+        """
+        chunks = self._chunks(texts)
+        # Submit under the lock so a concurrent version change cannot shut the pool down mid-batch
+        with self._lock:
+            pool = self._get_pool(snapshot)
+            futures = [pool.submit(_extract_chunk, chunk, max_keywords) for chunk in chunks]
+            self.batches += 1
+            self.texts += len(texts)
+        return [keywords for future in futures for keywords in future.result()]
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._version = None
+
+    def stats(self) -> dict:
+        """Return the pool size, snapshot version and usage counters."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "min_batch": KEYWORD_PROCESS_MIN_BATCH,
+                "running": self._pool is not None and self._pid == os.getpid(),
+                "snapshot_version": self._version,
+                "pools_started": self.started,
+                "batches": self.batches,
+                "texts": self.texts,
+            }
+
+
+keyword_pool = KeywordProcessPool()
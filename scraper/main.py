@@ -1,26 +1,93 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import threading
+import zlib
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Literal, Optional, List
 from jobspy import scrape_jobs
 import pandas as pd
 
 from scoring import (
+    encode_texts,
+    encoder_fingerprint,
     prepare_cv_text,
     prepare_job_text,
     calculate_score,
     calculate_batch_scores,
     calculate_detailed_score,
+    calculate_detailed_scores_batch,
+    calculate_keyword_scores_batch,
     get_model_status,
+    get_warmup_status,
+    prepare_cv,
+    warm_up,
 )
+from cv_sessions import cv_sessions
+from job_index import get_job_index
+from prefork import get_memory_status
+from executors import (
+    inference_executor,
+    scrape_executor,
+    index_executor,
+    get_executor_status,
+)
+from keyword_pool import keyword_pool
 from tech_keywords import (
     build_tfidf_index,
-    load_tech_terms,
-    get_idf_score,
-    _idf_scores,
+    extract_technical_keywords_batch,
+    get_keyword_snapshot,
+    get_tfidf_stats,
+    get_vocabulary_status,
+    remove_tfidf_documents,
+    start_tfidf_upload,
+    start_vocabulary_refresh,
 )
 
-app = FastAPI(title="JobSpy Scraper API", version="1.0.0")
+# Job boards scraped when a request names none
+SCRAPE_SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter", "google"]
+# Per-site scraping: time allowed per job board once its scrape starts, and for the whole /scrape request
+SCRAPE_SITE_TIMEOUT = float(os.environ.get("SCRAPE_SITE_TIMEOUT", "60"))
+SCRAPE_DEADLINE = float(os.environ.get("SCRAPE_DEADLINE", "90"))
+# Timed-out scrapes of one board still running before further scrapes of it are skipped
+SCRAPE_MAX_ABANDONED = int(os.environ.get("SCRAPE_MAX_ABANDONED", "1"))
+
+# Opt-in start-up phase: load and warm the model before reporting ready
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "0") == "1"
+
+# Streaming scoring: jobs per micro-batch and micro-batches in flight per stream
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "8"))
+STREAM_CONCURRENCY = int(os.environ.get("STREAM_CONCURRENCY", "2"))
+
+# Streamed TF-IDF corpus uploads: documents per chunk, longest accepted line, inflate step
+TFIDF_UPLOAD_CHUNK_SIZE = int(os.environ.get("TFIDF_UPLOAD_CHUNK_SIZE", "500"))
+TFIDF_UPLOAD_MAX_LINE_BYTES = int(os.environ.get("TFIDF_UPLOAD_MAX_LINE_BYTES", str(1024 * 1024)))
+TFIDF_UPLOAD_INFLATE_BYTES = 64 * 1024
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+GZIP_MEDIA_TYPES = {"application/gzip", "application/x-gzip"}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = None
+    if WARMUP_ON_STARTUP:
+        # Run in the background so /health answers while the model loads
+        warmup_task = asyncio.create_task(inference_executor.run(warm_up))
+    # Per worker: a thread started in the pre-fork parent would not survive the fork
+    start_vocabulary_refresh()
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    keyword_pool.shutdown()
+
+
+app = FastAPI(title="JobSpy Scraper API", version="1.0.0", lifespan=lifespan)
 
 # CORS for Next.js
 app.add_middleware(
@@ -60,11 +127,21 @@ class Job(BaseModel):
     site: str
 
 
+class SiteScrapeResult(BaseModel):
+    site: str
+    status: Literal["ok", "timeout", "queued_timeout", "skipped", "error"]
+    total: int = 0
+    latency_seconds: float
+    queued_seconds: float = 0.0
+    error: Optional[str] = None
+
+
 class ScrapeResponse(BaseModel):
     success: bool
     jobs: List[Job]
     total: int
     message: Optional[str] = None
+    sites: List[SiteScrapeResult] = []
 
 
 # Scoring models
@@ -90,6 +167,18 @@ class CVData(BaseModel):
     skills: List[CVSkill] = []
 
 
+class CVReference(BaseModel):
+    """Either a full CV payload or the id of a CV registered with POST /cv."""
+    cv_data: Optional[CVData] = None
+    cv_id: Optional[str] = Field(None, description="Id returned by POST /cv")
+
+    @model_validator(mode="after")
+    def check_cv_source(self):
+        if (self.cv_data is None) == (self.cv_id is None):
+            raise ValueError("Provide exactly one of cv_data or cv_id")
+        return self
+
+
 class JobForScoring(BaseModel):
     id: Optional[str] = None
     title: str
@@ -97,18 +186,23 @@ class JobForScoring(BaseModel):
     description: Optional[str] = None
 
 
-class ScoreRequest(BaseModel):
-    cv_data: CVData
+class ScoreRequest(CVReference):
     job: JobForScoring
 
 
+class CVRegisterResponse(BaseModel):
+    cv_id: str
+    ttl_seconds: int
+    empty: bool
+    message: Optional[str] = None
+
+
 class ScoreResponse(BaseModel):
     score: float
     message: Optional[str] = None
 
 
-class BatchScoreRequest(BaseModel):
-    cv_data: CVData
+class BatchScoreRequest(CVReference):
     jobs: List[JobForScoring]
 
 
@@ -142,125 +236,557 @@ class DetailedScoreResponse(BaseModel):
     matchedSkills: List[str]
     totalKeywords: int
     technicalKeywords: Optional[int] = None
+    indexVersion: Optional[str] = None
+    message: Optional[str] = None
+
+
+class IndexedJob(JobForScoring):
+    id: str
+
+
+class IndexJobsRequest(BaseModel):
+    jobs: List[IndexedJob]
+
+
+class RemoveIndexedJobsRequest(BaseModel):
+    ids: List[str]
+
+
+class MatchRequest(CVReference):
+    top_k: int = Field(default=20, ge=1, le=1000, description="Number of jobs to return")
+
+
+class MatchResponse(BaseModel):
+    results: List[BatchScoreResult]
+    total_indexed: int
+    search: str
     message: Optional[str] = None
 
 
+class DetailedBatchScoreResult(DetailedScoreResponse):
+    id: str
+
+
+class DetailedBatchScoreResponse(BaseModel):
+    results: List[DetailedBatchScoreResult]
+    message: Optional[str] = None
+
+
+class KeywordScoreResult(BaseModel):
+    id: str
+    keywordScore: float
+    matchedKeywords: int
+    totalKeywords: int
+    indexVersion: Optional[str] = None
+
+
+class KeywordScoreBatchResponse(BaseModel):
+    results: List[KeywordScoreResult]
+
+
+class KeywordBatchRequest(BaseModel):
+    texts: List[str] = Field(..., description="Texts to extract keywords from")
+    max_keywords: int = Field(default=20, ge=1, le=200, description="Maximum keywords per text")
+
+
+class ExtractedKeyword(BaseModel):
+    keyword: str
+    canonical: str
+    is_technical: bool
+    weight: float
+
+
+class KeywordBatchResponse(BaseModel):
+    results: List[List[ExtractedKeyword]]
+    indexVersion: str
+
+
+class StreamScoreRequest(BatchScoreRequest):
+    format: Literal["ndjson", "sse"] = Field(default="ndjson", description="Stream encoding")
+    batch_size: Optional[int] = Field(default=None, ge=1, le=256, description="Jobs per micro-batch")
+
+
+def cv_to_dict(cv_data: CVData) -> dict:
+    """Convert the CV payload to the dict shape used by the scoring functions."""
+    return {
+        "profile": cv_data.profile.model_dump() if cv_data.profile else None,
+        "experiences": [e.model_dump() for e in cv_data.experiences],
+        "skills": [s.model_dump() for s in cv_data.skills]
+    }
+
+
+async def get_registered_cv(cv_id: str) -> dict:
+    """Return the prepared CV for cv_id or raise 404."""
+    # The multi-worker session store reads and touches files, so keep it off the event loop
+    prepared_cv = await inference_executor.run(cv_sessions.get, cv_id)
+    if prepared_cv is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Unknown or expired cv_id. Register the CV again with POST /cv."
+        )
+    return prepared_cv
+
+
+async def resolve_prepared_cv(request: CVReference) -> tuple:
+    """Return (cv_dict, prepared_cv) for a request; prepared_cv is None without cv_id."""
+    if request.cv_id is not None:
+        prepared_cv = await get_registered_cv(request.cv_id)
+        return prepared_cv["cv_data"], prepared_cv
+    return cv_to_dict(request.cv_data), None
+
+
+def to_detailed_fields(result: dict) -> dict:
+    """Map a detailed scoring result to DetailedScoreResponse fields."""
+    return dict(
+        globalScore=result["globalScore"],
+        semanticScore=result.get("semanticScore"),
+        keywordScore=result.get("keywordScore"),
+        experienceMatches=[
+            ExperienceMatch(**exp) for exp in result["experienceMatches"]
+        ],
+        matchedKeywords=result["matchedKeywords"],
+        matchedTechnical=result.get("matchedTechnical"),
+        missingKeywords=result["missingKeywords"],
+        missingTechnical=result.get("missingTechnical"),
+        matchedSkills=result["matchedSkills"],
+        totalKeywords=result["totalKeywords"],
+        technicalKeywords=result.get("technicalKeywords"),
+        indexVersion=result.get("indexVersion")
+    )
+
+
+async def resolve_cv_text(request: CVReference) -> tuple:
+    """Return (cv_text, cv_embedding) for a request, using the registered CV if any."""
+    if request.cv_id is not None:
+        prepared_cv = await get_registered_cv(request.cv_id)
+        return prepared_cv["cv_text"], prepared_cv["cv_embedding"]
+    return prepare_cv_text(cv_to_dict(request.cv_data)), None
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "jobspy-scraper"}
 
 
-@app.post("/scrape", response_model=ScrapeResponse)
-async def scrape_jobs_endpoint(request: ScrapeRequest):
+@app.get("/ready")
+async def readiness_check():
     """
-    Scrape jobs from multiple job boards using JobSpy.
+    Readiness endpoint.
 
-    Supported sites: indeed, linkedin, zip_recruiter, glassdoor, google
+    With WARMUP_ON_STARTUP=1, returns 503 until the model is loaded and
+    warmed up, so traffic is only routed to warm pods. Otherwise the
+    service is ready immediately and loads the model on first use.
     """
-    try:
-        # Default to all supported sites if none specified
-        sites = request.site_name or ["indeed", "linkedin", "glassdoor", "zip_recruiter", "google"]
-
-        # Call JobSpy
-        jobs_df = scrape_jobs(
-            site_name=sites,
-            search_term=request.search_term,
-            location=request.location,
-            results_wanted=request.results_wanted,
-            hours_old=request.hours_old,
-            country_indeed=request.country_indeed,
-            is_remote=request.remote_only,
+    warmup = get_warmup_status()
+    if not WARMUP_ON_STARTUP:
+        return {"ready": True, "warmup": warmup}
+
+    ready = warmup["state"] == "done"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "warmup": warmup}
+    )
+
+
+def run_scrape(request: ScrapeRequest, sites: List[str]) -> List[Job]:
+    """Call JobSpy and convert the resulting DataFrame to Job objects (blocking)."""
+    jobs_df = scrape_jobs(
+        site_name=sites,
+        search_term=request.search_term,
+        location=request.location,
+        results_wanted=request.results_wanted,
+        hours_old=request.hours_old,
+        country_indeed=request.country_indeed,
+        is_remote=request.remote_only,
+    )
+
+    if jobs_df is None or jobs_df.empty:
+        return []
+
+    # Convert DataFrame to list of Job objects
+    jobs = []
+    for _, row in jobs_df.iterrows():
+        job = Job(
+            title=str(row.get("title", "")) or "Unknown",
+            company=str(row.get("company", "")) or "Unknown",
+            location=str(row.get("location", "")) if pd.notna(row.get("location")) else None,
+            job_url=str(row.get("job_url", "")) if pd.notna(row.get("job_url")) else None,
+            description=str(row.get("description", ""))[:2000] if pd.notna(row.get("description")) else None,
+            salary_min=float(row.get("min_amount")) if pd.notna(row.get("min_amount")) else None,
+            salary_max=float(row.get("max_amount")) if pd.notna(row.get("max_amount")) else None,
+            salary_currency=str(row.get("currency")) if pd.notna(row.get("currency")) else None,
+            date_posted=str(row.get("date_posted")) if pd.notna(row.get("date_posted")) else None,
+            job_type=str(row.get("job_type")) if pd.notna(row.get("job_type")) else None,
+            is_remote=bool(row.get("is_remote", False)),
+            site=str(row.get("site", "unknown")),
         )
+        jobs.append(job)
+
+    return jobs
+
+
+# Timed-out scrapes per site whose thread is still running
+_abandoned_scrapes: dict[str, int] = {}
+_abandoned_lock = threading.Lock()
 
-        if jobs_df is None or jobs_df.empty:
-            return ScrapeResponse(
-                success=True,
-                jobs=[],
-                total=0,
-                message="No jobs found matching your criteria"
-            )
 
-        # Convert DataFrame to list of Job objects
-        jobs = []
-        for _, row in jobs_df.iterrows():
-            job = Job(
-                title=str(row.get("title", "")) or "Unknown",
-                company=str(row.get("company", "")) or "Unknown",
-                location=str(row.get("location", "")) if pd.notna(row.get("location")) else None,
-                job_url=str(row.get("job_url", "")) if pd.notna(row.get("job_url")) else None,
-                description=str(row.get("description", ""))[:2000] if pd.notna(row.get("description")) else None,
-                salary_min=float(row.get("min_amount")) if pd.notna(row.get("min_amount")) else None,
-                salary_max=float(row.get("max_amount")) if pd.notna(row.get("max_amount")) else None,
-                salary_currency=str(row.get("currency")) if pd.notna(row.get("currency")) else None,
-                date_posted=str(row.get("date_posted")) if pd.notna(row.get("date_posted")) else None,
-                job_type=str(row.get("job_type")) if pd.notna(row.get("job_type")) else None,
-                is_remote=bool(row.get("is_remote", False)),
-                site=str(row.get("site", "unknown")),
+class SiteScrape:
+    """
+    One job board scrape on the scrape executor.
+
+    Tells the event loop when a scrape worker picks it up, so time spent
+    queued is not charged to the site's timeout. JobSpy has no request
+    timeout, so a scrape that times out keeps running in its thread; it is
+    counted as abandoned until it returns.
+    """
+
+    def __init__(self, site: str, loop: asyncio.AbstractEventLoop, abandoned: dict[str, int]):
+        self.site = site
+        self.started = asyncio.Event()
+        self._loop = loop
+        self._abandoned = abandoned
+        self._running = False
+        self._given_up = False
+
+    def run(self, request: ScrapeRequest) -> List[Job]:
+        """Scrape the site (blocking); does nothing if the caller gave up while it was queued."""
+        with _abandoned_lock:
+            if self._given_up:
+                return []
+            self._running = True
+        self._loop.call_soon_threadsafe(self.started.set)
+        try:
+            return run_scrape(request, [self.site])
+        finally:
+            with _abandoned_lock:
+                self._running = False
+                if self._given_up:
+                    self._abandoned[self.site] -= 1
+
+    def give_up(self) -> None:
+        """Stop waiting for the scrape; a running one is counted as abandoned until it returns."""
+        with _abandoned_lock:
+            if self._given_up:
+                return
+            self._given_up = True
+            if self._running:
+                self._abandoned[self.site] = self._abandoned.get(self.site, 0) + 1
+
+
+async def scrape_site(request: ScrapeRequest, site: str, deadline: float) -> tuple:
+    """
+    Scrape one job board on the scrape executor, within its timeout.
+
+    Waiting for a free scrape worker only counts against the request
+    deadline (an event loop time); SCRAPE_SITE_TIMEOUT starts when the
+    scrape does, and is cut short by the deadline. A site is skipped while
+    SCRAPE_MAX_ABANDONED of its timed-out scrapes are still running, so a
+    hanging board cannot take over the scrape workers.
+
+    Returns:
+        (jobs, SiteScrapeResult); jobs is empty unless the status is "ok"
+    """
+    loop = asyncio.get_running_loop()
+    requested = loop.time()
+    queued = 0.0
+    jobs: List[Job] = []
+    error = None
+
+    with _abandoned_lock:
+        abandoned = _abandoned_scrapes.get(site, 0)
+    if abandoned >= SCRAPE_MAX_ABANDONED:
+        status = "skipped"
+        error = f"{abandoned} earlier scrape(s) of {site} timed out and are still running"
+    else:
+        scrape = SiteScrape(site, loop, _abandoned_scrapes)
+        task = asyncio.ensure_future(scrape_executor.run(scrape.run, request))
+        started = asyncio.ensure_future(scrape.started.wait())
+        try:
+            await asyncio.wait(
+                {task, started}, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
             )
-            jobs.append(job)
+            queued = loop.time() - requested
+            if not task.done() and not started.done():
+                status = "queued_timeout"
+                error = f"No scrape worker free within {round(queued, 1)}s"
+                scrape.give_up()
+                task.cancel()
+            else:
+                timeout = max(0.0, min(SCRAPE_SITE_TIMEOUT, deadline - loop.time()))
+                jobs = await asyncio.wait_for(task, timeout)
+                status = "ok"
+        except asyncio.TimeoutError:
+            status = "timeout"
+            error = f"No response within {round(timeout, 1)}s of starting"
+            scrape.give_up()
+        except Exception as e:
+            status = "error"
+            error = str(e)
+        finally:
+            started.cancel()
+
+    latency = round(loop.time() - requested, 3)
+    if error is not None:
+        print(f"Scraping {site} failed ({status}) after {latency}s: {error}")
+    return jobs, SiteScrapeResult(
+        site=site, status=status, total=len(jobs), latency_seconds=latency, queued_seconds=round(queued, 3), error=error
+    )
 
-        return ScrapeResponse(
-            success=True,
-            jobs=jobs,
-            total=len(jobs),
-            message=f"Successfully scraped {len(jobs)} jobs"
-        )
 
-    except Exception as e:
+@app.post("/scrape", response_model=ScrapeResponse)
+async def scrape_jobs_endpoint(request: ScrapeRequest):
+    """
+    Scrape jobs from multiple job boards using JobSpy.
+
+    Supported sites: indeed, linkedin, zip_recruiter, glassdoor, google
+
+    Each site is scraped separately and concurrently, with its own timeout
+    and within an overall SCRAPE_DEADLINE, so a slow or failing board only
+    loses its own jobs. The response holds the jobs of every site that
+    finished in time, in the order the sites were requested, and the
+    status and latency of each site; it is an error only if all failed.
+    """
+    # Default to all supported sites if none specified
+    sites = list(dict.fromkeys(request.site_name or SCRAPE_SITES))
+    deadline = asyncio.get_running_loop().time() + SCRAPE_DEADLINE
+
+    scraped = await asyncio.gather(*(scrape_site(request, site, deadline) for site in sites))
+    jobs = [job for site_jobs, _ in scraped for job in site_jobs]
+    site_results = [result for _, result in scraped]
+    failed = [result for result in site_results if result.status != "ok"]
+
+    if len(failed) == len(site_results):
         raise HTTPException(
-            status_code=500,
-            detail=f"Scraping failed: {str(e)}"
+            status_code=502,
+            detail="Scraping failed: " + "; ".join(f"{r.site}: {r.error}" for r in failed)
         )
 
+    if jobs:
+        message = f"Successfully scraped {len(jobs)} jobs"
+    else:
+        message = "No jobs found matching your criteria"
+    if failed:
+        message += " (skipped " + ", ".join(f"{r.site}: {r.status}" for r in failed) + ")"
+
+    return ScrapeResponse(
+        success=True,
+        jobs=jobs,
+        total=len(jobs),
+        message=message,
+        sites=site_results,
+    )
+
 
 @app.get("/model-status")
 async def model_status():
     """Check if the ML model is loaded."""
     status = get_model_status()
+    status["cv_sessions"] = await inference_executor.run(cv_sessions.stats)
+    status["executors"] = get_executor_status()
+    status["memory"] = get_memory_status()
     return status
 
 
 class TfidfBuildRequest(BaseModel):
     job_descriptions: List[str] = Field(..., description="List of job descriptions to build TF-IDF index from")
+    ids: Optional[List[str]] = Field(None, description="Document ids aligned with job_descriptions, for later removal")
+    mode: Literal["replace", "append"] = Field("replace", description="Replace the corpus or add to it")
+
+    @model_validator(mode="after")
+    def check_ids(self):
+        if self.ids is not None and len(self.ids) != len(self.job_descriptions):
+            raise ValueError("ids must have one entry per job description")
+        return self
+
+
+class TfidfRemoveRequest(BaseModel):
+    ids: List[str] = Field(..., description="Ids of the documents to remove (e.g. expired postings)")
+
+
+def top_idf_terms(idf_scores, limit: int) -> list:
+    """Highest-IDF (most specific) terms of an index."""
+    if not idf_scores:
+        return []
+    return sorted(idf_scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def tfidf_build_response(snapshot, mode: str, added: int, total_documents: int) -> dict:
+    """Response of /build-tfidf for both the JSON and the streamed upload."""
+    idf_scores = snapshot.idf_scores
+    action = "added to" if mode == "append" else "built from"
+    return {
+        "success": True,
+        "message": f"TF-IDF index {action} {added} job descriptions",
+        "mode": mode,
+        "total_documents": total_documents,
+        "total_terms": len(idf_scores) if idf_scores else 0,
+        "index_version": snapshot.version,
+        # Top technical terms (highest IDF)
+        "top_technical_terms": [t[0] for t in top_idf_terms(idf_scores, 20)],
+    }
+
+
+def _inflate(decompressor, data: bytes):
+    """Decompress in steps of at most TFIDF_UPLOAD_INFLATE_BYTES."""
+    while data:
+        yield decompressor.decompress(data, TFIDF_UPLOAD_INFLATE_BYTES)
+        data = decompressor.unconsumed_tail
+
+
+async def iter_upload_lines(request: Request, gzipped: bool):
+    """
+    Yield (line, bytes received so far) from a streamed request body.
+
+    gzip bodies are decompressed incrementally, and at most one line is
+    buffered, so memory does not grow with the size of the upload.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    buffer = b""
+    received = 0
+
+    async for chunk in request.stream():
+        received += len(chunk)
+        pieces = _inflate(decompressor, chunk) if decompressor is not None else [chunk]
+        for piece in pieces:
+            lines = (buffer + piece).split(b"\n")
+            buffer = lines.pop()
+            if len(buffer) > TFIDF_UPLOAD_MAX_LINE_BYTES:
+                raise HTTPException(status_code=413, detail="Upload line exceeds TFIDF_UPLOAD_MAX_LINE_BYTES")
+            for line in lines:
+                yield line, received
+
+    if decompressor is not None:
+        buffer += decompressor.flush()
+        if not decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip upload")
+    if buffer:
+        yield buffer, received
+
+
+def parse_upload_line(line: bytes, line_number: int) -> tuple:
+    """
+    Parse one NDJSON line of a corpus upload.
+
+    A line is either a JSON string (the description) or an object with
+    'description' (or 'text') and an optional 'id'.
+
+    Returns:
+        (description, id); (None, None) for blank lines
+    """
+    line = line.strip()
+    if not line:
+        return None, None
+    try:
+        item = json.loads(line)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: invalid JSON")
+
+    if isinstance(item, str):
+        return item, None
+    if isinstance(item, dict):
+        text = item.get("description", item.get("text"))
+        doc_id = item.get("id")
+        if (text is None or isinstance(text, str)) and (doc_id is None or isinstance(doc_id, str)):
+            return text, doc_id
+    raise HTTPException(
+        status_code=400,
+        detail=f"Line {line_number}: expected a string or an object with 'description' and optional 'id'",
+    )
+
+
+async def upload_tfidf_corpus(request: Request, mode: str, gzipped: bool) -> dict:
+    """
+    Build the TF-IDF index from a streamed NDJSON (optionally gzip) corpus.
+
+    Documents are handed to the index executor TFIDF_UPLOAD_CHUNK_SIZE at a
+    time, and the body is not read further until a chunk is processed.
+    """
+    upload = start_tfidf_upload(append=mode == "append")
+    texts = []
+    ids = []
+    received = 0
+    try:
+        line_number = 0
+        async for line, received in iter_upload_lines(request, gzipped):
+            line_number += 1
+            text, doc_id = parse_upload_line(line, line_number)
+            # Skip empty descriptions
+            if text and text.strip():
+                texts.append(text)
+                ids.append(doc_id)
+            if len(texts) >= TFIDF_UPLOAD_CHUNK_SIZE:
+                await index_executor.run(upload.add_chunk, texts, ids, received)
+                texts, ids = [], []
+
+        if texts:
+            await index_executor.run(upload.add_chunk, texts, ids, received)
+        if not upload.progress["documents"]:
+            raise HTTPException(status_code=400, detail="All job descriptions are empty")
+
+        total_documents = await index_executor.run(upload.finish)
+    except HTTPException as e:
+        upload.fail(str(e.detail))
+        raise
+    except Exception as e:
+        upload.fail(str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to build TF-IDF index: {str(e)}")
+
+    snapshot = await inference_executor.run(get_keyword_snapshot)
+    return tfidf_build_response(snapshot, mode, upload.progress["documents"], total_documents)
 
 
 @app.post("/build-tfidf")
-async def build_tfidf_endpoint(request: TfidfBuildRequest):
+async def build_tfidf_endpoint(http_request: Request, mode: Optional[Literal["replace", "append"]] = None):
     """
     Build TF-IDF index from job descriptions.
 
     This allows the scoring system to identify technical terms based on
     their frequency across your job corpus. Terms that appear in few jobs
     are considered more technical/specific.
+
+    In "append" mode the descriptions are added to the current corpus;
+    only the new descriptions are processed.
+
+    The body is either a TfidfBuildRequest JSON object, or, for large
+    corpora, a streamed NDJSON upload (Content-Type application/x-ndjson,
+    optionally gzip-compressed via Content-Encoding: gzip or Content-Type
+    application/gzip) with one description per line, as a JSON string or
+    {"id": ..., "description": ...}. The mode of a streamed upload is given
+    as a query parameter; progress is shown by /tfidf-status.
     """
+    content_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    gzipped = content_type in GZIP_MEDIA_TYPES or http_request.headers.get("content-encoding", "").lower() == "gzip"
+    if content_type in NDJSON_MEDIA_TYPES or gzipped:
+        return await upload_tfidf_corpus(http_request, mode or "replace", gzipped)
+
+    try:
+        request = TfidfBuildRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    if mode is not None:
+        request.mode = mode
+
     try:
         if not request.job_descriptions:
             raise HTTPException(status_code=400, detail="No job descriptions provided")
 
-        # Filter out empty descriptions
-        descriptions = [d for d in request.job_descriptions if d and d.strip()]
+        # Filter out empty descriptions (and their ids)
+        ids = request.ids if request.ids is not None else [None] * len(request.job_descriptions)
+        pairs = [(d, doc_id) for d, doc_id in zip(request.job_descriptions, ids) if d and d.strip()]
 
-        if not descriptions:
+        if not pairs:
             raise HTTPException(status_code=400, detail="All job descriptions are empty")
 
-        build_tfidf_index(descriptions)
+        descriptions = [d for d, _ in pairs]
+        doc_ids = [doc_id for _, doc_id in pairs] if request.ids is not None else None
+        append = request.mode == "append"
 
-        # Get some stats
-        num_terms = len(_idf_scores) if _idf_scores else 0
+        total_documents = await index_executor.run(build_tfidf_index, descriptions, doc_ids, append)
 
-        # Get top technical terms (highest IDF)
-        top_technical = []
-        if _idf_scores:
-            sorted_terms = sorted(_idf_scores.items(), key=lambda x: x[1], reverse=True)
-            top_technical = [t[0] for t in sorted_terms[:20]]
-
-        return {
-            "success": True,
-            "message": f"TF-IDF index built from {len(descriptions)} job descriptions",
-            "total_terms": num_terms,
-            "top_technical_terms": top_technical
-        }
+        # Get some stats from the snapshot published by the build
+        snapshot = await inference_executor.run(get_keyword_snapshot)
+        return tfidf_build_response(snapshot, request.mode, len(descriptions), total_documents)
 
     except HTTPException:
         raise
@@ -268,28 +794,88 @@ async def build_tfidf_endpoint(request: TfidfBuildRequest):
         raise HTTPException(status_code=500, detail=f"Failed to build TF-IDF index: {str(e)}")
 
 
+@app.post("/remove-tfidf")
+async def remove_tfidf_endpoint(request: TfidfRemoveRequest):
+    """Remove documents from the TF-IDF index by id."""
+    removed = await index_executor.run(remove_tfidf_documents, request.ids)
+    total_documents = get_tfidf_stats()["documents"]
+    return {
+        "success": True,
+        "removed": removed,
+        "total_documents": total_documents,
+    }
+
+
 @app.get("/tfidf-status")
 async def tfidf_status():
     """Check TF-IDF index status and get sample technical terms."""
-    tech_terms = load_tech_terms()
+    # May build the first snapshot or reload one saved by another worker, so keep it
+    # off the event loop (but not behind corpus changes on the single index worker)
+    snapshot = await inference_executor.run(get_keyword_snapshot)
 
-    tfidf_built = _idf_scores is not None and len(_idf_scores) > 0
-    num_idf_terms = len(_idf_scores) if _idf_scores else 0
+    idf_scores = snapshot.idf_scores
+    tfidf_built = idf_scores is not None and len(idf_scores) > 0
+    num_idf_terms = len(idf_scores) if idf_scores else 0
 
     # Sample high-IDF terms if available
-    high_idf_terms = []
-    if _idf_scores:
-        sorted_terms = sorted(_idf_scores.items(), key=lambda x: x[1], reverse=True)
-        high_idf_terms = [{"term": t[0], "idf": round(t[1], 2)} for t in sorted_terms[:15]]
+    high_idf_terms = [{"term": t[0], "idf": round(t[1], 2)} for t in top_idf_terms(idf_scores, 15)]
+    tfidf_stats = get_tfidf_stats()
 
     return {
-        "stackoverflow_tags_loaded": len(tech_terms),
+        "index_version": snapshot.version,
+        "stackoverflow_tags_loaded": len(snapshot.tech_terms),
+        "vocabulary": get_vocabulary_status(),
         "tfidf_index_built": tfidf_built,
         "tfidf_terms_count": num_idf_terms,
-        "high_idf_terms": high_idf_terms
+        "tfidf_documents": tfidf_stats["documents"],
+        "tfidf_upload": tfidf_stats["upload"],
+        "tfidf_snapshot": {
+            "version": tfidf_stats["version"],
+            "saved_at": tfidf_stats["saved_at"],
+            "age_seconds": tfidf_stats["age_seconds"],
+            "path": tfidf_stats["path"],
+        },
+        "high_idf_terms": high_idf_terms,
+        "keyword_pool": keyword_pool.stats(),
     }
 
 
+@app.post("/cv", response_model=CVRegisterResponse)
+async def register_cv(cv_data: CVData):
+    """
+    Register a CV for repeated scoring.
+
+    The CV text, embeddings and keyword profile are computed once and kept
+    for CV_SESSION_TTL seconds after last use. Pass the returned cv_id
+    instead of cv_data to /score, /score-batch and /score-detailed.
+    """
+    try:
+        prepared_cv = await inference_executor.run(prepare_cv, cv_to_dict(cv_data))
+        cv_id = await inference_executor.run(cv_sessions.register, prepared_cv)
+        empty = not prepared_cv["cv_text"]
+
+        return CVRegisterResponse(
+            cv_id=cv_id,
+            ttl_seconds=cv_sessions.ttl,
+            empty=empty,
+            message="CV is empty. Please add profile, experiences, or skills." if empty else None
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"CV registration failed: {str(e)}"
+        )
+
+
+@app.delete("/cv/{cv_id}")
+async def delete_cv(cv_id: str):
+    """Forget a registered CV."""
+    if not await inference_executor.run(cv_sessions.remove, cv_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired cv_id")
+    return {"success": True}
+
+
 @app.post("/score", response_model=ScoreResponse)
 async def score_job(request: ScoreRequest):
     """
@@ -298,14 +884,7 @@ async def score_job(request: ScoreRequest):
     Returns a score from 0 to 100 indicating how well the CV matches the job.
     """
     try:
-        # Convert Pydantic models to dicts for scoring functions
-        cv_dict = {
-            "profile": request.cv_data.profile.model_dump() if request.cv_data.profile else None,
-            "experiences": [e.model_dump() for e in request.cv_data.experiences],
-            "skills": [s.model_dump() for s in request.cv_data.skills]
-        }
-
-        cv_text = prepare_cv_text(cv_dict)
+        cv_text, cv_embedding = await resolve_cv_text(request)
 
         if not cv_text:
             return ScoreResponse(
@@ -316,10 +895,12 @@ async def score_job(request: ScoreRequest):
         job_dict = request.job.model_dump()
         job_text = prepare_job_text(job_dict)
 
-        score = calculate_score(cv_text, job_text)
+        score = await inference_executor.run(calculate_score, cv_text, job_text, cv_embedding=cv_embedding)
 
         return ScoreResponse(score=score)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -335,14 +916,7 @@ async def score_jobs_batch(request: BatchScoreRequest):
     More efficient than calling /score multiple times.
     """
     try:
-        # Convert CV data
-        cv_dict = {
-            "profile": request.cv_data.profile.model_dump() if request.cv_data.profile else None,
-            "experiences": [e.model_dump() for e in request.cv_data.experiences],
-            "skills": [s.model_dump() for s in request.cv_data.skills]
-        }
-
-        cv_text = prepare_cv_text(cv_dict)
+        cv_text, cv_embedding = await resolve_cv_text(request)
 
         if not cv_text:
             # Return 0 for all jobs if CV is empty
@@ -365,7 +939,9 @@ async def score_jobs_batch(request: BatchScoreRequest):
             })
 
         # Calculate batch scores
-        score_results = calculate_batch_scores(cv_text, jobs_for_scoring)
+        score_results = await inference_executor.run(
+            calculate_batch_scores, cv_text, jobs_for_scoring, cv_embedding=cv_embedding
+        )
 
         results = [
             BatchScoreResult(id=r["id"], score=r["score"])
@@ -374,6 +950,8 @@ async def score_jobs_batch(request: BatchScoreRequest):
 
         return BatchScoreResponse(results=results)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -392,34 +970,18 @@ async def score_job_detailed(request: ScoreRequest):
     - Which keywords are missing
     """
     try:
-        # Convert Pydantic models to dicts
-        cv_dict = {
-            "profile": request.cv_data.profile.model_dump() if request.cv_data.profile else None,
-            "experiences": [e.model_dump() for e in request.cv_data.experiences],
-            "skills": [s.model_dump() for s in request.cv_data.skills]
-        }
-
+        cv_dict, prepared_cv = await resolve_prepared_cv(request)
         job_dict = request.job.model_dump()
 
         # Calculate detailed score
-        result = calculate_detailed_score(cv_dict, job_dict, threshold=50.0)
-
-        return DetailedScoreResponse(
-            globalScore=result["globalScore"],
-            semanticScore=result.get("semanticScore"),
-            keywordScore=result.get("keywordScore"),
-            experienceMatches=[
-                ExperienceMatch(**exp) for exp in result["experienceMatches"]
-            ],
-            matchedKeywords=result["matchedKeywords"],
-            matchedTechnical=result.get("matchedTechnical"),
-            missingKeywords=result["missingKeywords"],
-            missingTechnical=result.get("missingTechnical"),
-            matchedSkills=result["matchedSkills"],
-            totalKeywords=result["totalKeywords"],
-            technicalKeywords=result.get("technicalKeywords")
+        result = await inference_executor.run(
+            calculate_detailed_score, cv_dict, job_dict, threshold=50.0, prepared_cv=prepared_cv
         )
 
+        return DetailedScoreResponse(**to_detailed_fields(result))
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -427,6 +989,320 @@ async def score_job_detailed(request: ScoreRequest):
         )
 
 
+@app.post("/score-detailed-batch", response_model=DetailedBatchScoreResponse)
+async def score_jobs_detailed_batch(request: BatchScoreRequest):
+    """
+    Calculate detailed compatibility scores for one CV against many jobs.
+
+    Returns the same breakdown as /score-detailed for each job, but encodes
+    the CV, its experiences and every job only once. Use this instead of
+    calling /score-detailed in a loop.
+    """
+    try:
+        cv_dict, prepared_cv = await resolve_prepared_cv(request)
+        job_dicts = [job.model_dump() for job in request.jobs]
+
+        results = await inference_executor.run(
+            calculate_detailed_scores_batch, cv_dict, job_dicts, threshold=50.0, prepared_cv=prepared_cv
+        )
+
+        return DetailedBatchScoreResponse(results=[
+            DetailedBatchScoreResult(id=job.id or str(i), **to_detailed_fields(result))
+            for i, (job, result) in enumerate(zip(request.jobs, results))
+        ])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch detailed scoring failed: {str(e)}"
+        )
+
+
+def format_stream_event(event: dict, stream_format: str) -> str:
+    """Encode one stream event as an NDJSON line or an SSE message."""
+    data = json.dumps(event)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def stream_detailed_scores(
+    cv_dict: dict,
+    prepared_cv: dict,
+    jobs: List[JobForScoring],
+    batch_size: int,
+    stream_format: str,
+):
+    """
+    Score jobs in micro-batches and yield each result as its batch finishes.
+
+    Up to STREAM_CONCURRENCY batches run on the inference executor at once,
+    so results come back in completion order, not request order. A failed
+    batch yields an error event for each of its jobs and the stream goes on.
+    Every batch uses the same keyword snapshot.
+    """
+    batches = [
+        list(range(start, min(start + batch_size, len(jobs))))
+        for start in range(0, len(jobs), batch_size)
+    ]
+    pending_batches = iter(batches)
+    snapshot = await inference_executor.run(get_keyword_snapshot)
+    running = {}
+    completed = 0
+    failed = 0
+
+    def submit_next() -> None:
+        indices = next(pending_batches, None)
+        if indices is None:
+            return
+        job_dicts = [jobs[i].model_dump() for i in indices]
+        task = asyncio.ensure_future(inference_executor.run(
+            calculate_detailed_scores_batch, cv_dict, job_dicts,
+            threshold=50.0, prepared_cv=prepared_cv, snapshot=snapshot,
+        ))
+        running[task] = indices
+
+    try:
+        for _ in range(max(1, STREAM_CONCURRENCY)):
+            submit_next()
+
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                indices = running.pop(task)
+                submit_next()
+
+                try:
+                    results = task.result()
+                except Exception as e:
+                    for i in indices:
+                        failed += 1
+                        yield format_stream_event({
+                            "type": "score",
+                            "index": i,
+                            "id": jobs[i].id or str(i),
+                            "status": "error",
+                            "error": f"Detailed scoring failed: {str(e)}",
+                        }, stream_format)
+                    continue
+
+                for i, result in zip(indices, results):
+                    completed += 1
+                    detailed = DetailedBatchScoreResult(id=jobs[i].id or str(i), **to_detailed_fields(result))
+                    yield format_stream_event({
+                        "type": "score",
+                        "index": i,
+                        "status": "completed",
+                        **detailed.model_dump(),
+                    }, stream_format)
+
+        yield format_stream_event({
+            "type": "done",
+            "total": len(jobs),
+            "completed": completed,
+            "failed": failed,
+            "indexVersion": snapshot.version,
+        }, stream_format)
+    finally:
+        # Client went away: drop batches that have not started yet
+        for task in running:
+            task.cancel()
+
+
+@app.post("/score-detailed-stream")
+async def score_jobs_detailed_stream(request: StreamScoreRequest):
+    """
+    Stream detailed compatibility scores for one CV against many jobs.
+
+    Jobs are scored in micro-batches on the inference executor. Each result
+    is emitted as soon as its batch finishes, as NDJSON lines or as SSE
+    'score' events, followed by a final 'done' event. Each result has the
+    same fields as /score-detailed-batch plus 'index' (the position of the
+    job in the request) and 'status'.
+    """
+    try:
+        cv_dict, prepared_cv = await resolve_prepared_cv(request)
+        if prepared_cv is None:
+            # Encode the CV once for every micro-batch of this stream
+            prepared_cv = await inference_executor.run(prepare_cv, cv_dict)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Streaming scoring failed: {str(e)}"
+        )
+
+    media_type = "text/event-stream" if request.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_detailed_scores(
+            cv_dict, prepared_cv, request.jobs, request.batch_size or STREAM_BATCH_SIZE, request.format
+        ),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/score-keywords-batch", response_model=KeywordScoreBatchResponse)
+async def score_jobs_keywords_batch(request: BatchScoreRequest):
+    """
+    Calculate the weighted keyword score of one CV against many jobs.
+
+    Skips the semantic model entirely: job keywords are scored with sparse
+    matrix products, so a whole backlog of scraped jobs fits in one call.
+    Scores equal the keywordScore of /score-detailed.
+    """
+    try:
+        cv_dict, prepared_cv = await resolve_prepared_cv(request)
+        keyword_index = prepared_cv["keyword_index"] if prepared_cv is not None else None
+        job_dicts = [job.model_dump() for job in request.jobs]
+
+        results = await inference_executor.run(
+            calculate_keyword_scores_batch, cv_dict, job_dicts, keyword_index
+        )
+
+        return KeywordScoreBatchResponse(results=[
+            KeywordScoreResult(id=job.id or str(i), **result)
+            for i, (job, result) in enumerate(zip(request.jobs, results))
+        ])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Keyword scoring failed: {str(e)}"
+        )
+
+
+@app.post("/extract-keywords-batch", response_model=KeywordBatchResponse)
+async def extract_keywords_batch(request: KeywordBatchRequest):
+    """
+    Extract the technical keywords of many texts.
+
+    Every text is extracted against the same keyword snapshot, whose
+    version is returned as indexVersion. Large batches are spread over the
+    keyword worker processes; results are in request order.
+    """
+    try:
+        snapshot = await inference_executor.run(get_keyword_snapshot)
+        results = await inference_executor.run(
+            extract_technical_keywords_batch, request.texts, request.max_keywords, snapshot
+        )
+        return KeywordBatchResponse(results=results, indexVersion=snapshot.version)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Keyword extraction failed: {str(e)}"
+        )
+
+
+def encode_jobs(jobs: List[IndexedJob]):
+    """Encode jobs for the job index (blocking)."""
+    return encode_texts([prepare_job_text(job.model_dump()) for job in jobs], persist=True)
+
+
+def add_indexed_jobs(ids: List[str], embeddings) -> int:
+    """Add encoded jobs to the job index, which persists them (blocking)."""
+    index = get_job_index(encoder_fingerprint())
+    index.add(ids, embeddings)
+    return len(index)
+
+
+def remove_indexed_jobs(ids: List[str]) -> tuple:
+    """Remove jobs from the job index, which persists the removal (blocking)."""
+    index = get_job_index(encoder_fingerprint())
+    return index.remove(ids), len(index)
+
+
+def job_index_stats() -> dict:
+    """Return the job index stats, after reading changes made by other workers (blocking)."""
+    return get_job_index(encoder_fingerprint()).stats()
+
+
+def match_jobs(cv_text: str, cv_embedding, top_k: int) -> tuple:
+    """Return the top-k indexed jobs for a CV and the index stats (blocking)."""
+    if cv_embedding is None:
+        cv_embedding = encode_texts([cv_text])[0]
+    index = get_job_index(encoder_fingerprint())
+    return index.search(cv_embedding, top_k), index.stats()
+
+
+@app.post("/jobs/index")
+async def index_jobs_endpoint(request: IndexJobsRequest):
+    """
+    Add jobs to the persistent job-embedding index used by /match.
+
+    Jobs are keyed by id; indexing an existing id replaces its embedding.
+    """
+    try:
+        embeddings = await inference_executor.run(encode_jobs, request.jobs)
+        # Index writes all go through the single index worker, so they apply in request order
+        total = await index_executor.run(add_indexed_jobs, [job.id for job in request.jobs], embeddings)
+        return {"success": True, "indexed": len(request.jobs), "total": total}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job indexing failed: {str(e)}")
+
+
+@app.post("/jobs/index/remove")
+async def remove_indexed_jobs_endpoint(request: RemoveIndexedJobsRequest):
+    """Remove jobs (e.g. expired postings) from the job index."""
+    try:
+        removed, total = await index_executor.run(remove_indexed_jobs, request.ids)
+        return {"success": True, "removed": removed, "total": total}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job removal failed: {str(e)}")
+
+
+@app.get("/job-index-status")
+async def job_index_status():
+    """Check the size and search mode of the job index."""
+    return await index_executor.run(job_index_stats)
+
+
+@app.post("/match", response_model=MatchResponse)
+async def match_endpoint(request: MatchRequest):
+    """
+    Return the top-k indexed jobs for a CV.
+
+    Only the CV is encoded; jobs are looked up in the job index built with
+    /jobs/index. Exact search is used for small indexes and IVF search for
+    large ones. Scores use the same 0-100 scale as /score.
+    """
+    try:
+        cv_text, cv_embedding = await resolve_cv_text(request)
+
+        if not cv_text:
+            stats = await index_executor.run(job_index_stats)
+            return MatchResponse(
+                results=[],
+                total_indexed=stats["jobs"],
+                search="none",
+                message="CV is empty. Please add profile, experiences, or skills."
+            )
+
+        matches, stats = await inference_executor.run(match_jobs, cv_text, cv_embedding, request.top_k)
+
+        return MatchResponse(
+            results=[
+                BatchScoreResult(id=job_id, score=round(max(0.0, min(100.0, similarity * 100)), 1))
+                for job_id, similarity in matches
+            ],
+            total_indexed=stats["jobs"],
+            search=stats["search"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job matching failed: {str(e)}")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,118 @@
+"""
+Pre-fork loading for the multi-worker server mode (see gunicorn.conf.py).
+
+The parent process loads the model weights and the read-only keyword tables
+before forking, so every worker shares those pages copy-on-write instead of
+holding its own copy. Memory usage per worker is read from /proc.
+"""
+
+import gc
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import scoring
+import tech_keywords
+from keyword_pool import available_cpus
+
+SMAPS_ROLLUP = Path("/proc/self/smaps_rollup")
+
+_preload_status = {"preloaded": False, "parent_pid": None, "duration_seconds": None, "error": None}
+
+
+def preload_shared_state() -> dict:
+    """
+    Load shared read-only state in the parent process (blocking).
+
+    Only the torch backend is loaded before fork: ONNX Runtime sessions
+    start thread pools that do not survive fork, so ONNX workers load their
+    own session. No inference runs here, for the same reason; each worker
+    still runs its own warm-up.
+
+    Returns:
+        Preload status dict
+    """
+    start = time.perf_counter()
+    try:
+        if scoring.INFERENCE_BACKEND == "torch":
+            scoring.get_model()
+        else:
+            print(f"Skipping pre-fork model load for the '{scoring.INFERENCE_BACKEND}' backend")
+
+        tech_keywords.load_tech_terms()
+        # IDF scores of the loaded TF-IDF snapshot and the classification table
+        tech_keywords.get_term_table()
+
+        duration = round(time.perf_counter() - start, 3)
+        _preload_status.update(preloaded=True, duration_seconds=duration, error=None)
+        print(f"Pre-fork preload finished in {duration}s")
+    except Exception as e:
+        _preload_status.update(error=str(e))
+        print(f"Pre-fork preload failed, workers will load on demand: {e}")
+
+    _preload_status["parent_pid"] = os.getpid()
+
+    # Move everything loaded so far out of the collector's reach, so garbage
+    # collection in the workers does not write to (and un-share) those pages
+    gc.freeze()
+    return dict(_preload_status)
+
+
+def configure_worker(workers: int) -> None:
+    """
+    Adjust a freshly forked worker.
+
+    Splits the CPUs the container may use (its cgroup quota, not the host
+    core count) between workers so torch does not start one intra-op
+    thread per core in every worker.
+    """
+    if scoring._model is None or scoring._active_backend != "torch":
+        return
+
+    import torch
+
+    threads = max(1, available_cpus() // max(1, workers))
+    torch.set_num_threads(threads)
+
+
+def read_memory_usage(path: Path = SMAPS_ROLLUP) -> Optional[dict]:
+    """
+    Read the memory usage of the current process.
+
+    Args:
+        path: smaps_rollup file to read
+
+    Returns:
+        dict with rss_mb, pss_mb, shared_mb and private_mb, or None when
+        /proc is not available
+    """
+    try:
+        text = path.read_text()
+    except OSError:
+        return None
+
+    kb = {}
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 2 and fields[1].isdigit():
+            kb[fields[0].rstrip(":")] = int(fields[1])
+
+    def mb(*names: str) -> float:
+        return round(sum(kb.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+    }
+
+
+def get_memory_status() -> dict:
+    """Return this worker's memory usage and whether state was preloaded."""
+    return {
+        "pid": os.getpid(),
+        "preload": dict(_preload_status),
+        "usage": read_memory_usage(),
+    }
@@ -4,52 +4,657 @@ Uses the paraphrase-multilingual-MiniLM-L12-v2 model for multilingual support.
 Enhanced with technical keyword detection for better scoring accuracy.
 """
 
-from typing import Optional
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Optional
 from sentence_transformers import SentenceTransformer
-from sentence_transformers.util import cos_sim
+import fcntl
+import hashlib
+import os
 import threading
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
 
 # Import technical keyword detection
 from tech_keywords import (
-    is_technical_term,
-    get_technical_weight,
+    KeywordSnapshot,
+    classify_terms,
     extract_technical_keywords,
     classify_keywords,
+    get_keyword_snapshot,
     SOFT_SKILLS_STOPWORDS,
     load_tech_terms,
+    CACHE_DIR,
 )
+from embedding_store import EmbeddingStore, EMBEDDING_STORE_ENABLED, EMBEDDING_STORE_DIR
+from text_packing import TEXT_PACKING_ENABLED, ENCODE_BUCKET_SIZE, budget_prefix, pack_text, length_buckets
 
 # Model configuration
 MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
 
+# Inference backend: "torch", "onnx" (ONNX Runtime fp32) or "onnx-int8"
+# (ONNX Runtime with dynamic int8 quantization). ONNX exports are built once
+# and cached under MODEL_CACHE_DIR.
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+ONNX_QUANTIZATION_CONFIG = os.environ.get("ONNX_QUANTIZATION_CONFIG", "avx2")  # arm64, avx2, avx512, avx512_vnni
+MODEL_CACHE_DIR = Path(os.environ.get("MODEL_CACHE_DIR", str(CACHE_DIR / "models")))
+SUPPORTED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Embedding cache limits (entries and total vector bytes)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Micro-batching of concurrent encode calls (window 0 disables batching)
+ENCODE_BATCH_WINDOW_MS = float(os.environ.get("ENCODE_BATCH_WINDOW_MS", "5"))
+ENCODE_MAX_BATCH_SIZE = int(os.environ.get("ENCODE_MAX_BATCH_SIZE", "64"))
+
+# Batch shapes encoded during start-up warm-up
+WARMUP_BATCH_SIZES = [
+    int(size) for size in os.environ.get("WARMUP_BATCH_SIZES", f"1,{ENCODE_MAX_BATCH_SIZE}").split(",") if size.strip()
+]
+
 # Lazy loading with thread safety
 _model: Optional[SentenceTransformer] = None
 _model_lock = threading.Lock()
+_active_backend: Optional[str] = None
+_backend_error: Optional[str] = None
+
+
+def _load_onnx_model(quantized: bool) -> SentenceTransformer:
+    """
+    Load the model with ONNX Runtime, exporting and quantizing it on first use.
+
+    The exported files are written to MODEL_CACHE_DIR and reused by later
+    starts. A file lock keeps concurrent workers from exporting at once.
+    """
+    export_dir = MODEL_CACHE_DIR / MODEL_NAME
+    fp32_file = "onnx/model.onnx"
+    int8_file = f"onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+
+    export_dir.mkdir(parents=True, exist_ok=True)
+    with open(export_dir / ".export.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        if not (export_dir / fp32_file).exists():
+            print(f"Exporting {MODEL_NAME} to ONNX in {export_dir}")
+            exported = SentenceTransformer(MODEL_NAME, backend="onnx")
+            exported.save_pretrained(str(export_dir))
+
+        if quantized and not (export_dir / int8_file).exists():
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            print(f"Quantizing ONNX model to int8 ({ONNX_QUANTIZATION_CONFIG})")
+            fp32_model = SentenceTransformer(
+                str(export_dir), backend="onnx", model_kwargs={"file_name": fp32_file}
+            )
+            export_dynamic_quantized_onnx_model(fp32_model, ONNX_QUANTIZATION_CONFIG, str(export_dir))
+
+    return SentenceTransformer(
+        str(export_dir),
+        backend="onnx",
+        model_kwargs={"file_name": int8_file if quantized else fp32_file},
+    )
+
+
+def _load_model(backend: str) -> SentenceTransformer:
+    """Load the model for the requested backend."""
+    if backend == "onnx":
+        return _load_onnx_model(quantized=False)
+    if backend == "onnx-int8":
+        return _load_onnx_model(quantized=True)
+    if backend != "torch":
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {SUPPORTED_BACKENDS}")
+    return SentenceTransformer(MODEL_NAME)
 
 
 def get_model() -> SentenceTransformer:
     """
     Get the sentence transformer model (lazy loaded).
     Thread-safe singleton pattern.
+
+    Uses INFERENCE_BACKEND, falling back to plain torch if the ONNX backend
+    cannot be loaded (e.g. optimum/onnxruntime missing).
     """
-    global _model
+    global _model, _active_backend, _backend_error
     if _model is None:
         with _model_lock:
             if _model is None:
-                _model = SentenceTransformer(MODEL_NAME)
+                backend = INFERENCE_BACKEND
+                try:
+                    model = _load_model(backend)
+                except Exception as e:
+                    if backend == "torch":
+                        raise
+                    print(f"Failed to load '{backend}' backend, falling back to torch: {e}")
+                    _backend_error = str(e)
+                    backend = "torch"
+                    model = _load_model(backend)
+                _active_backend = backend
+                _model = model
     return _model
 
 
+def encoder_fingerprint() -> str:
+    """
+    Identify the encoder that produces embeddings (loads the model).
+
+    Backends and packing settings give slightly different vectors for the
+    same text, so cache keys, the embedding store and the job index are
+    keyed by model, active backend (with the int8 quantization config) and
+    packing rather than by model name alone. The backend is only known once
+    the model is loaded, since a failed ONNX load falls back to torch.
+    """
+    get_model()
+    backend = _active_backend or INFERENCE_BACKEND
+    if backend == "onnx-int8":
+        backend = f"{backend}-{ONNX_QUANTIZATION_CONFIG}"
+    packing = "packed" if TEXT_PACKING_ENABLED else "truncated"
+    return f"{MODEL_NAME}/{backend}/{packing}"
+
+
+class EmbeddingCache:
+    """
+    In-process LRU cache of text embeddings.
+
+    Entries are keyed by a hash of the encoder fingerprint and the text, so the same
+    CV or job text is only encoded once no matter which request sends it.
+    Eviction removes the least recently used entries until both the entry
+    and byte limits are respected.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, encoder: str) -> str:
+        """Content hash identifying a text embedded by a given encoder (see encoder_fingerprint)."""
+        return hashlib.sha256(f"{encoder}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Look up several keys at once, refreshing their LRU position.
+
+        Returns:
+            List aligned with keys, None for each miss
+        """
+        found = []
+        with self._lock:
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                found.append(embedding)
+        return found
+
+    def put(self, key: str, embedding: np.ndarray) -> np.ndarray:
+        """
+        Store an embedding and evict old entries if limits are exceeded.
+
+        Returns:
+            The read-only array actually stored in the cache
+        """
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+
+        if self.max_entries <= 0 or embedding.nbytes > self.max_bytes:
+            return embedding
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+
+            self._entries[key] = embedding
+            self._bytes += embedding.nbytes
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+        return embedding
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_MAX_BYTES)
+
+
+class _EncodeRequest:
+    """Texts submitted by one caller, and the slot its vectors are returned in."""
+
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class EncodeScheduler:
+    """
+    Central scheduler that merges concurrent encode calls into one batch.
+
+    A worker thread waits up to `window_ms` after the first pending request
+    (or until `max_batch_size` texts are queued), encodes every queued text
+    in a single call and hands each caller back its own rows. Callers block
+    until their vectors are ready, so the API is the same as a direct encode.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[list[str]], np.ndarray],
+        window_ms: float,
+        max_batch_size: int,
+    ):
+        self.encode_fn = encode_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._cond = threading.Condition()
+        self._queue: deque[_EncodeRequest] = deque()
+        self._queued_texts = 0
+        self._worker: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self.batches = 0
+        self.texts_encoded = 0
+        self.max_batch_seen = 0
+        self.last_batch_size = 0
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Encode texts, possibly together with texts from other callers.
+
+        Returns:
+            Array with one embedding per input text
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if self.window <= 0:
+            vectors = self.encode_fn(texts)
+            self._record_batch(len(texts))
+            return vectors
+
+        request = _EncodeRequest(texts)
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append(request)
+            self._queued_texts += len(texts)
+            self._cond.notify()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self) -> dict:
+        """Return queue depth and batch size statistics."""
+        with self._cond:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queued_requests": len(self._queue),
+                "queued_texts": self._queued_texts,
+                "batches": self.batches,
+                "texts_encoded": self.texts_encoded,
+                "avg_batch_size": round(self.texts_encoded / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size_seen": self.max_batch_seen,
+                "last_batch_size": self.last_batch_size,
+            }
+
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork, so a forked worker process starts its own
+        if self._pid != os.getpid():
+            self._reset()
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="encode-scheduler", daemon=True)
+            self._worker.start()
+
+    def _record_batch(self, size: int) -> None:
+        with self._cond:
+            self.batches += 1
+            self.texts_encoded += size
+            self.max_batch_seen = max(self.max_batch_seen, size)
+            self.last_batch_size = size
+
+    def _next_batch(self) -> list[_EncodeRequest]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # Give concurrent callers a short window to join this batch
+            deadline = time.monotonic() + self.window
+            while self._queued_texts < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            size = 0
+            while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch_size):
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._queued_texts -= size
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+
+            # Identical texts from different callers are encoded once
+            positions: dict[str, int] = {}
+            for request in batch:
+                for text in request.texts:
+                    positions.setdefault(text, len(positions))
+
+            try:
+                vectors = self.encode_fn(list(positions))
+                for request in batch:
+                    request.result = vectors[[positions[text] for text in request.texts]]
+            except BaseException as e:
+                for request in batch:
+                    request.error = e
+
+            self._record_batch(len(positions))
+            for request in batch:
+                request.done.set()
+
+
+_token_stats = {
+    "texts": 0,
+    "texts_over_budget": 0,
+    "texts_packed": 0,
+    "boilerplate_segments_dropped": 0,
+    "tokens_input": 0,
+    "tokens_processed": 0,
+    "tokens_discarded": 0,
+}
+_token_stats_lock = threading.Lock()
+
+
+def _count_tokens(tokenizer, texts: list[str]) -> list[int]:
+    encoded = tokenizer(texts, add_special_tokens=False, verbose=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def _budget_lengths(tokenizer, texts: list[str], budget: int) -> list[int]:
+    """
+    Token counts of texts, exact for texts within the budget.
+
+    Only a prefix of long texts is tokenized (see budget_prefix). When it
+    holds more than `budget` tokens the text is over budget and the count
+    is a lower bound; otherwise the whole text is counted.
+    """
+    prefixes = [budget_prefix(text, budget) for text in texts]
+    lengths = _count_tokens(tokenizer, prefixes)
+
+    # A prefix within the budget says nothing about the rest of the text
+    undecided = [
+        i for i, (text, prefix) in enumerate(zip(texts, prefixes))
+        if prefix is not text and lengths[i] <= budget
+    ]
+    if undecided:
+        for i, length in zip(undecided, _count_tokens(tokenizer, [texts[i] for i in undecided])):
+            lengths[i] = length
+    return lengths
+
+
+def _model_encode(texts: list[str]) -> np.ndarray:
+    """
+    Encode texts with the model, packed to its token budget.
+
+    Texts longer than the model's window are packed with pack_text, and
+    the batch is split into buckets of similar token length so little
+    compute goes to padding. Each text is tokenized at most once before
+    encoding: only a prefix of long texts is counted, and packing reports
+    the token count of the full text (the sum of its segments) and of the
+    packed one. Models without a tokenizer are called directly.
+    """
+    model = get_model()
+    tokenizer = getattr(model, "tokenizer", None)
+    max_seq_length = getattr(model, "max_seq_length", None)
+    if tokenizer is None or not max_seq_length:
+        return model.encode(texts, convert_to_numpy=True)
+
+    budget = max_seq_length - tokenizer.num_special_tokens_to_add()
+    lengths = _budget_lengths(tokenizer, texts, budget)
+
+    texts = list(texts)
+    over_budget = [i for i, length in enumerate(lengths) if length > budget]
+    input_lengths = list(lengths)
+    stats = dict.fromkeys(_token_stats, 0)
+    stats["texts"] = len(texts)
+    stats["texts_over_budget"] = len(over_budget)
+
+    if TEXT_PACKING_ENABLED:
+        for i in over_budget:
+            segment_counts = []
+
+            def count_segments(segments: list[str]) -> list[int]:
+                counts = _count_tokens(tokenizer, segments)
+                segment_counts.extend(counts)
+                return counts
+
+            texts[i], lengths[i], dropped = pack_text(texts[i], budget, count_segments)
+            input_lengths[i] = sum(segment_counts)
+            stats["texts_packed"] += 1
+            stats["boilerplate_segments_dropped"] += dropped
+    elif over_budget:
+        # Only the token stats need the full count of texts the model truncates
+        for i, length in zip(over_budget, _count_tokens(tokenizer, [texts[i] for i in over_budget])):
+            input_lengths[i] = length
+
+    for length, input_length in zip(lengths, input_lengths):
+        processed = min(length, budget)
+        stats["tokens_input"] += input_length
+        stats["tokens_processed"] += processed
+        stats["tokens_discarded"] += input_length - processed
+
+    with _token_stats_lock:
+        for name, value in stats.items():
+            _token_stats[name] += value
+
+    vectors = None
+    for bucket in length_buckets(lengths, ENCODE_BUCKET_SIZE):
+        encoded = model.encode([texts[i] for i in bucket], batch_size=len(bucket), convert_to_numpy=True)
+        if vectors is None:
+            vectors = np.empty((len(texts), encoded.shape[1]), dtype=encoded.dtype)
+        vectors[bucket] = encoded
+    return vectors
+
+
+def get_token_stats() -> dict:
+    """Return how many tokens were sent to the model and how many were discarded."""
+    with _token_stats_lock:
+        stats = dict(_token_stats)
+    stats["packing_enabled"] = TEXT_PACKING_ENABLED
+    stats["bucket_size"] = ENCODE_BUCKET_SIZE
+    return stats
+
+
+_encode_scheduler = EncodeScheduler(_model_encode, ENCODE_BATCH_WINDOW_MS, ENCODE_MAX_BATCH_SIZE)
+
+
+_embedding_store: Optional[EmbeddingStore] = None
+_embedding_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """
+    Get the on-disk embedding store, or None when disabled (lazy loaded).
+    Thread-safe singleton pattern.
+
+    The store is tagged with the encoder fingerprint, so vectors written by
+    another backend or packing setting are discarded rather than mixed in.
+    """
+    global _embedding_store
+    if _embedding_store is None and EMBEDDING_STORE_ENABLED:
+        with _embedding_store_lock:
+            if _embedding_store is None:
+                _embedding_store = EmbeddingStore(EMBEDDING_STORE_DIR, encoder_fingerprint())
+    return _embedding_store
+
+
+def encode_texts(texts: list[str], persist: bool = False) -> np.ndarray:
+    """
+    Encode texts, only sending cache misses to the model.
+
+    Args:
+        texts: Texts to embed
+        persist: Also look up and save embeddings in the on-disk store
+            (used for job texts, which are scored again across restarts)
+
+    Returns:
+        Array of shape (len(texts), dim) with one embedding per text
+    """
+    encoder = encoder_fingerprint()
+    keys = [EmbeddingCache.make_key(text, encoder) for text in texts]
+    embeddings = _embedding_cache.get_many(keys)
+
+    # Group misses by key so duplicate texts are encoded once
+    missing: dict[str, list[int]] = {}
+    for i, (key, embedding) in enumerate(zip(keys, embeddings)):
+        if embedding is None:
+            missing.setdefault(key, []).append(i)
+
+    store = get_embedding_store() if persist else None
+
+    # Read vectors already on disk straight from the mapped store
+    if missing and store is not None:
+        try:
+            stored_vectors = store.get_many(list(missing))
+        except Exception as e:
+            print(f"Error reading embedding store: {e}")
+            stored_vectors = [None] * len(missing)
+
+        for key, vector in zip(list(missing), stored_vectors):
+            if vector is not None:
+                for i in missing.pop(key):
+                    embeddings[i] = vector
+
+    if missing:
+        miss_texts = [texts[positions[0]] for positions in missing.values()]
+        vectors = _encode_scheduler.encode(miss_texts)
+
+        for (key, positions), vector in zip(missing.items(), vectors):
+            stored = _embedding_cache.put(key, vector)
+            for i in positions:
+                embeddings[i] = stored
+
+        if store is not None:
+            try:
+                store.append(list(missing), vectors)
+            except Exception as e:
+                print(f"Error writing embedding store: {e}")
+
+    return np.vstack(embeddings)
+
+
+_warmup_status = {"state": "not_started", "duration_seconds": None, "error": None}
+
+
+def warm_up(batch_sizes: Optional[list[int]] = None) -> dict:
+    """
+    Load the model and tech terms and run warm-up encodes (blocking).
+
+    Warm-up encodes bypass the embedding cache so each configured batch
+    shape really goes through the model once.
+
+    Args:
+        batch_sizes: Batch shapes to encode, defaults to WARMUP_BATCH_SIZES
+
+    Returns:
+        Warm-up status dict with 'state', 'duration_seconds' and 'error'
+    """
+    batch_sizes = batch_sizes or WARMUP_BATCH_SIZES
+    _warmup_status.update(state="running", duration_seconds=None, error=None)
+    start = time.perf_counter()
+
+    try:
+        model = get_model()
+        sample = "Senior Python developer with Django, PostgreSQL and Kubernetes experience."
+        for size in batch_sizes:
+            model.encode([sample] * size, convert_to_numpy=True)
+        load_tech_terms()
+
+        duration = round(time.perf_counter() - start, 3)
+        _warmup_status.update(state="done", duration_seconds=duration)
+        print(f"Warm-up finished in {duration}s (batch sizes {batch_sizes})")
+    except Exception as e:
+        _warmup_status.update(state="failed", error=str(e))
+        print(f"Warm-up failed: {e}")
+
+    return dict(_warmup_status)
+
+
+def get_warmup_status() -> dict:
+    """Return the state and duration of the start-up warm-up."""
+    return dict(_warmup_status)
+
+
 def get_model_status() -> dict:
     """
     Return the current model status.
 
     Returns:
-        dict with 'loaded' (bool) and 'model_name' (str)
+        dict with 'loaded' (bool), 'model_name' (str), the encoder
+        fingerprint, the requested and active inference backend, 'embedding_cache', 'encode_scheduler' and
+        'token_budget' stats
     """
     return {
         "loaded": _model is not None,
-        "model_name": MODEL_NAME
+        "model_name": MODEL_NAME,
+        "encoder": encoder_fingerprint() if _model is not None else None,
+        "requested_backend": INFERENCE_BACKEND,
+        "backend": _active_backend,
+        "backend_error": _backend_error,
+        "warmup": get_warmup_status(),
+        "embedding_cache": _embedding_cache.stats(),
+        "encode_scheduler": _encode_scheduler.stats(),
+        "embedding_store": _embedding_store.stats() if _embedding_store is not None else None,
+        "token_budget": get_token_stats(),
     }
 
 
@@ -119,13 +724,58 @@ def prepare_job_text(job: dict) -> str:
     return " ".join(parts)
 
 
-def calculate_score(cv_text: str, job_text: str) -> float:
+def similarity_matrix(queries: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Score every query embedding against every row of a matrix in one operation.
+
+    Cosine similarity is computed as one matrix product divided by the
+    outer product of the norms, then mapped to 0-100 and rounded to one decimal.
+
+    Args:
+        queries: Embeddings of shape (q, dim)
+        matrix: Embeddings of shape (n, dim)
+
+    Returns:
+        Float array of shape (q, n) with scores between 0 and 100
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+
+    norms = np.outer(np.linalg.norm(queries, axis=1), np.linalg.norm(matrix, axis=1))
+    similarities = (queries @ matrix.T).astype(np.float64) / np.maximum(norms, 1e-12)
+
+    # Cosine similarity ranges from -1 to 1, but for text it's usually 0 to 1
+    # We map 0-1 to 0-100
+    return np.round(np.clip(similarities * 100, 0, 100), 1)
+
+
+def similarity_scores(query: np.ndarray, matrix: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Score one embedding against every row of a matrix in a single operation.
+
+    Args:
+        query: Embedding of shape (dim,)
+        matrix: Embeddings of shape (n, dim)
+        mask: Optional boolean array of shape (n,); rows where it is False score 0
+
+    Returns:
+        Float array of shape (n,) with scores between 0 and 100
+    """
+    scores = similarity_matrix(np.asarray(query)[np.newaxis, :], matrix)[0]
+
+    if mask is not None:
+        scores = np.where(mask, scores, 0.0)
+    return scores
+
+
+def calculate_score(cv_text: str, job_text: str, cv_embedding: Optional[np.ndarray] = None) -> float:
     """
     Calculate compatibility score between CV and job.
 
     Args:
         cv_text: Prepared CV text
         job_text: Prepared job text
+        cv_embedding: Precomputed CV embedding (skips encoding the CV)
 
     Returns:
         Score between 0 and 100
@@ -136,29 +786,25 @@ def calculate_score(cv_text: str, job_text: str) -> float:
     if not job_text or not job_text.strip():
         return 0.0
 
-    model = get_model()
-
     # Encode both texts
-    embeddings = model.encode([cv_text, job_text], convert_to_tensor=True)
-
-    # Calculate cosine similarity
-    similarity = cos_sim(embeddings[0], embeddings[1]).item()
-
-    # Convert to 0-100 scale
-    # Cosine similarity ranges from -1 to 1, but for text it's usually 0 to 1
-    # We map 0-1 to 0-100
-    score = max(0, min(100, similarity * 100))
+    if cv_embedding is None:
+        embeddings = encode_texts([cv_text, job_text])
+        cv_embedding, job_embedding = embeddings[0], embeddings[1]
+    else:
+        job_embedding = encode_texts([job_text])[0]
 
-    return round(score, 1)
+    # Calculate cosine similarity on a 0-100 scale
+    return float(similarity_scores(cv_embedding, job_embedding[np.newaxis, :])[0])
 
 
-def calculate_batch_scores(cv_text: str, jobs: list[dict]) -> list[dict]:
+def calculate_batch_scores(cv_text: str, jobs: list[dict], cv_embedding: Optional[np.ndarray] = None) -> list[dict]:
     """
     Calculate scores for multiple jobs at once (more efficient).
 
     Args:
         cv_text: Prepared CV text
         jobs: List of jobs with 'id' and 'text' fields
+        cv_embedding: Precomputed CV embedding (skips encoding the CV)
 
     Returns:
         List of dicts with 'id' and 'score' fields
@@ -169,33 +815,22 @@ def calculate_batch_scores(cv_text: str, jobs: list[dict]) -> list[dict]:
     if not jobs:
         return []
 
-    model = get_model()
-
     # Prepare all texts
     job_texts = [job.get("text", "") for job in jobs]
-    all_texts = [cv_text] + job_texts
 
-    # Encode all at once
-    embeddings = model.encode(all_texts, convert_to_tensor=True)
-
-    cv_embedding = embeddings[0]
-    job_embeddings = embeddings[1:]
-
-    # Calculate similarities
-    results = []
-    for i, job in enumerate(jobs):
-        if job_texts[i]:
-            similarity = cos_sim(cv_embedding, job_embeddings[i]).item()
-            score = max(0, min(100, similarity * 100))
-        else:
-            score = 0.0
+    # Encode all at once; job embeddings are kept in the on-disk store
+    if cv_embedding is None:
+        cv_embedding = encode_texts([cv_text])[0]
+    job_embeddings = encode_texts(job_texts, persist=True)
 
-        results.append({
-            "id": job["id"],
-            "score": round(score, 1)
-        })
+    # Calculate all similarities at once, empty job texts score 0
+    mask = np.array([bool(text) for text in job_texts])
+    scores = similarity_scores(cv_embedding, job_embeddings, mask)
 
-    return results
+    return [
+        {"id": job["id"], "score": score}
+        for job, score in zip(jobs, scores.tolist())
+    ]
 
 
 import re
@@ -236,13 +871,18 @@ def extract_keywords(text: str, max_keywords: int = 20, technical_only: bool = F
     return keywords[:max_keywords]
 
 
-def extract_keywords_weighted(text: str, max_keywords: int = 20) -> list[dict]:
+def extract_keywords_weighted(
+    text: str,
+    max_keywords: int = 20,
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> list[dict]:
     """
     Extract keywords with their technical weight.
 
     Args:
         text: Text to extract keywords from
         max_keywords: Maximum number of keywords to return
+        snapshot: Keyword snapshot to use (default: the current one)
 
     Returns:
         List of dicts with 'keyword', 'is_technical', 'weight'
@@ -250,27 +890,19 @@ def extract_keywords_weighted(text: str, max_keywords: int = 20) -> list[dict]:
     if not text:
         return []
 
-    return extract_technical_keywords(text, max_keywords=max_keywords)
+    return extract_technical_keywords(text, max_keywords=max_keywords, snapshot=snapshot)
 
 
-def calculate_experience_scores(experiences: list[dict], job_text: str, threshold: float = 50.0) -> list[dict]:
+def prepare_experience_texts(experiences: list[dict]) -> tuple[list[int], list[str]]:
     """
-    Calculate how well each experience matches the job.
+    Prepare experience texts for embedding, skipping empty experiences.
 
     Args:
         experiences: List of experience dicts with title, company, description
-        job_text: Prepared job text
-        threshold: Minimum score to be considered relevant
 
     Returns:
-        List of experiences with their scores, sorted by score descending
+        Tuple of (indices of non-empty experiences, their texts)
     """
-    if not experiences or not job_text:
-        return []
-
-    model = get_model()
-
-    # Prepare experience texts
     exp_texts = []
     for exp in experiences:
         parts = []
@@ -282,27 +914,51 @@ def calculate_experience_scores(experiences: list[dict], job_text: str, threshol
             parts.append(exp["description"])
         exp_texts.append(" ".join(parts) if parts else "")
 
-    # Filter out empty experiences
     valid_indices = [i for i, t in enumerate(exp_texts) if t.strip()]
-    if not valid_indices:
+    return valid_indices, [exp_texts[i] for i in valid_indices]
+
+
+def calculate_experience_scores(
+    experiences: list[dict],
+    job_text: str,
+    threshold: float = 50.0,
+    experience_embeddings: Optional[np.ndarray] = None,
+) -> list[dict]:
+    """
+    Calculate how well each experience matches the job.
+
+    Args:
+        experiences: List of experience dicts with title, company, description
+        job_text: Prepared job text
+        threshold: Minimum score to be considered relevant
+        experience_embeddings: Precomputed embeddings of the non-empty
+            experiences, in order (skips encoding the experiences)
+
+    Returns:
+        List of experiences with their scores, sorted by score descending
+    """
+    if not experiences or not job_text:
         return []
 
-    valid_texts = [exp_texts[i] for i in valid_indices]
+    # Filter out empty experiences
+    valid_indices, valid_texts = prepare_experience_texts(experiences)
+    if not valid_indices:
+        return []
 
     # Encode all at once
-    all_texts = [job_text] + valid_texts
-    embeddings = model.encode(all_texts, convert_to_tensor=True)
+    if experience_embeddings is None:
+        embeddings = encode_texts([job_text] + valid_texts)
+        job_embedding = embeddings[0]
+        exp_embeddings = embeddings[1:]
+    else:
+        job_embedding = encode_texts([job_text])[0]
+        exp_embeddings = experience_embeddings
 
-    job_embedding = embeddings[0]
-    exp_embeddings = embeddings[1:]
+    # Calculate all scores at once
+    scores = similarity_scores(job_embedding, exp_embeddings).tolist()
 
-    # Calculate scores
     results = []
-    for i, idx in enumerate(valid_indices):
-        similarity = cos_sim(job_embedding, exp_embeddings[i]).item()
-        score = max(0, min(100, similarity * 100))
-        score = round(score, 1)
-
+    for idx, score in zip(valid_indices, scores):
         exp = experiences[idx]
         results.append({
             "title": exp.get("title", "Unknown"),
@@ -316,13 +972,165 @@ def calculate_experience_scores(experiences: list[dict], job_text: str, threshol
     return results
 
 
-def find_matching_keywords(cv_data: dict, job_keywords: list[str]) -> tuple[list[str], list[str]]:
+class CVKeywordIndex:
+    """
+    Keyword lookup structures for one CV, built once and reused for every job.
+
+    Answers the same questions as a direct scan of the CV:
+    - a job keyword is matched if it, or one of its words, occurs in the CV
+      text, or if a CV word longer than two characters occurs inside it;
+    - a skill matches a job keyword if either contains the other, or if one
+      of the skill's words occurs inside the keyword.
+
+    Instead of looping over every CV word and skill for every keyword, the
+    keyword's substrings are looked up in hash maps of CV words and skill
+    substrings. Results per keyword are memoized, since the same keywords
+    come back across jobs.
+    """
+
+    MEMO_SIZE = 10000
+    MAX_INDEXED_SKILL_LENGTH = 64  # longer skill names are scanned directly
+
+    def __init__(self, cv_data: dict):
+        # Build CV text for searching - include all relevant fields
+        cv_parts = []
+
+        profile = cv_data.get("profile")
+        if profile:
+            if profile.get("title"):
+                cv_parts.append(profile["title"])
+            if profile.get("summary"):
+                cv_parts.append(profile["summary"])
+
+        for exp in cv_data.get("experiences", []):
+            if exp.get("title"):
+                cv_parts.append(exp["title"])
+            if exp.get("company"):
+                cv_parts.append(exp["company"])
+            if exp.get("description"):
+                cv_parts.append(exp["description"])
+
+        for skill in cv_data.get("skills", []):
+            if skill.get("name"):
+                cv_parts.append(skill["name"])
+            if skill.get("category"):
+                cv_parts.append(skill["category"])
+
+        self.text_lower = " ".join(cv_parts).lower()
+
+        # Individual words for partial matching; only words longer than two
+        # characters are matched inside keywords
+        self.words = set()
+        for part in cv_parts:
+            self.words.update(part.lower().split())
+        self._long_words = {word for word in self.words if len(word) > 2}
+        self._long_word_lengths = sorted({len(word) for word in self._long_words})
+
+        # Skill names and words (needles found inside keywords), and every
+        # substring of each skill name (keywords found inside skills)
+        self.skills = [s.get("name") for s in cv_data.get("skills", []) if s.get("name")]
+        self._skill_needles: dict[str, set[int]] = {}
+        self._skill_substrings: dict[str, set[int]] = {}
+        self._long_skills: list[tuple[int, str]] = []
+        for i, skill in enumerate(self.skills):
+            skill_lower = skill.lower()
+            for needle in [skill_lower, *skill_lower.split()]:
+                self._skill_needles.setdefault(needle, set()).add(i)
+            if len(skill_lower) > self.MAX_INDEXED_SKILL_LENGTH:
+                self._long_skills.append((i, skill_lower))
+                continue
+            for start in range(len(skill_lower)):
+                for end in range(start + 1, len(skill_lower) + 1):
+                    self._skill_substrings.setdefault(skill_lower[start:end], set()).add(i)
+        self._needle_lengths = sorted({len(needle) for needle in self._skill_needles})
+
+        self._in_text: dict[str, bool] = {}
+        self._keyword_memo: dict[str, bool] = {}
+        self._skill_memo: dict[str, frozenset] = {}
+
+    @classmethod
+    def _remember(cls, memo: dict, key: str, value):
+        if len(memo) >= cls.MEMO_SIZE:
+            memo.clear()
+        memo[key] = value
+        return value
+
+    @staticmethod
+    def _substrings(text: str, lengths: list[int]):
+        for length in lengths:
+            if length > len(text):
+                break
+            for start in range(len(text) - length + 1):
+                yield text[start:start + length]
+
+    def _occurs_in_text(self, text: str) -> bool:
+        found = self._in_text.get(text)
+        if found is None:
+            found = self._remember(self._in_text, text, text in self.text_lower)
+        return found
+
+    def matches(self, keyword: str) -> bool:
+        """Return True if the job keyword is present in the CV."""
+        keyword_lower = keyword.lower()
+        found = self._keyword_memo.get(keyword_lower)
+        if found is None:
+            found = (
+                self._occurs_in_text(keyword_lower)
+                or any(self._occurs_in_text(word) for word in keyword_lower.split())
+                or any(
+                    substring in self._long_words
+                    for substring in self._substrings(keyword_lower, self._long_word_lengths)
+                )
+            )
+            self._remember(self._keyword_memo, keyword_lower, found)
+        return found
+
+    def _skills_for(self, keyword: str) -> frozenset:
+        keyword_lower = keyword.lower()
+        found = self._skill_memo.get(keyword_lower)
+        if found is None:
+            indices = set(self._skill_substrings.get(keyword_lower, ()))
+            for substring in self._substrings(keyword_lower, self._needle_lengths):
+                indices.update(self._skill_needles.get(substring, ()))
+            indices.update(i for i, skill_lower in self._long_skills if keyword_lower in skill_lower)
+            found = self._remember(self._skill_memo, keyword_lower, frozenset(indices))
+        return found
+
+    def matched_skills(self, job_keywords: list[str]) -> list[str]:
+        """
+        Return the CV skills that match any job keyword.
+
+        Returns:
+            Skill names in CV order, without duplicates
+        """
+        indices = set()
+        for keyword in job_keywords:
+            indices.update(self._skills_for(keyword))
+
+        matched = []
+        for i in sorted(indices):
+            if self.skills[i] not in matched:
+                matched.append(self.skills[i])
+        return matched
+
+
+def find_matching_keywords(
+    cv_data: dict,
+    job_keywords: list[str],
+    keyword_index: Optional[CVKeywordIndex] = None,
+) -> tuple[list[str], list[str]]:
     """
     Find which job keywords are present in the CV and which are missing.
 
+    A keyword is matched on:
+    1. Exact substring match in full text
+    2. Any word from multi-word keyword present in CV
+    3. Partial match (keyword contained in a CV word or vice versa)
+
     Args:
         cv_data: CV data dict with profile, experiences, skills
         job_keywords: List of keywords extracted from the job
+        keyword_index: Prebuilt CVKeywordIndex for cv_data
 
     Returns:
         Tuple of (matched_keywords, missing_keywords)
@@ -330,58 +1138,14 @@ def find_matching_keywords(cv_data: dict, job_keywords: list[str]) -> tuple[list
     if not job_keywords:
         return [], []
 
-    # Build CV text for searching - include all relevant fields
-    cv_parts = []
-
-    profile = cv_data.get("profile")
-    if profile:
-        if profile.get("title"):
-            cv_parts.append(profile["title"])
-        if profile.get("summary"):
-            cv_parts.append(profile["summary"])
-
-    for exp in cv_data.get("experiences", []):
-        if exp.get("title"):
-            cv_parts.append(exp["title"])
-        if exp.get("company"):
-            cv_parts.append(exp["company"])
-        if exp.get("description"):
-            cv_parts.append(exp["description"])
-
-    for skill in cv_data.get("skills", []):
-        if skill.get("name"):
-            cv_parts.append(skill["name"])
-        if skill.get("category"):
-            cv_parts.append(skill["category"])
-
-    cv_text_lower = " ".join(cv_parts).lower()
-
-    # Also build a set of individual words for partial matching
-    cv_words = set()
-    for part in cv_parts:
-        cv_words.update(part.lower().split())
+    if keyword_index is None:
+        keyword_index = CVKeywordIndex(cv_data)
 
     matched = []
     missing = []
 
     for keyword in job_keywords:
-        keyword_lower = keyword.lower()
-        keyword_words = keyword_lower.split()
-
-        # Check for:
-        # 1. Exact substring match in full text
-        # 2. Any word from multi-word keyword present in CV
-        # 3. Partial match (keyword contained in a CV word or vice versa)
-        is_matched = False
-
-        if keyword_lower in cv_text_lower:
-            is_matched = True
-        elif any(kw in cv_text_lower for kw in keyword_words):
-            is_matched = True
-        elif any(keyword_lower in word or word in keyword_lower for word in cv_words if len(word) > 2):
-            is_matched = True
-
-        if is_matched:
+        if keyword_index.matches(keyword):
             matched.append(keyword)
         else:
             missing.append(keyword)
@@ -389,7 +1153,26 @@ def find_matching_keywords(cv_data: dict, job_keywords: list[str]) -> tuple[list
     return matched, missing
 
 
-def calculate_weighted_keyword_score(matched_keywords: list[str], missing_keywords: list[str]) -> float:
+# Keyword weights are summed as integers in these units, so the score does
+# not depend on the order the weights are added in
+KEYWORD_WEIGHT_SCALE = 1000
+
+
+def _weight_units(weight: float) -> int:
+    return int(round(weight * KEYWORD_WEIGHT_SCALE))
+
+
+def _keyword_score(matched_units: int, total_units: int) -> float:
+    if total_units == 0:
+        return 50.0
+    return round((matched_units / total_units) * 100, 1)
+
+
+def calculate_weighted_keyword_score(
+    matched_keywords: list[str],
+    missing_keywords: list[str],
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> float:
     """
     Calculate a weighted score based on technical keyword matches.
     Technical keywords have higher weight than generic terms.
@@ -397,6 +1180,7 @@ def calculate_weighted_keyword_score(matched_keywords: list[str], missing_keywor
     Args:
         matched_keywords: Keywords found in CV
         missing_keywords: Keywords not found in CV
+        snapshot: Keyword snapshot to weigh with (default: the current one)
 
     Returns:
         Score between 0 and 100
@@ -404,103 +1188,277 @@ def calculate_weighted_keyword_score(matched_keywords: list[str], missing_keywor
     if not matched_keywords and not missing_keywords:
         return 50.0  # No keywords to compare
 
-    total_weight = 0.0
-    matched_weight = 0.0
+    units = [_weight_units(weight) for _, weight in classify_terms(matched_keywords + missing_keywords, snapshot)]
+    return _keyword_score(sum(units[:len(matched_keywords)]), sum(units))
 
-    for kw in matched_keywords:
-        weight = get_technical_weight(kw)
-        matched_weight += weight
-        total_weight += weight
 
-    for kw in missing_keywords:
-        weight = get_technical_weight(kw)
-        total_weight += weight
+def _job_keyword_text(job: dict) -> str:
+    """Text that job keywords are extracted from."""
+    job_description = job.get("description", "")
+    job_title = job.get("title", "")
+    return f"{job_title} {job_description}"
 
-    if total_weight == 0:
-        return 50.0
 
-    return round((matched_weight / total_weight) * 100, 1)
+def calculate_keyword_scores_batch(
+    cv_data: dict,
+    jobs: list[dict],
+    keyword_index: Optional[CVKeywordIndex] = None,
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> list[dict]:
+    """
+    Calculate the weighted keyword score of one CV against many jobs at once.
+
+    Job keywords are mapped to a sparse job x term matrix (CSR). Each
+    distinct term is weighted and matched against the CV once, and the
+    matched and total weights of every job come out of two sparse
+    matrix-vector products. Scores equal calculate_weighted_keyword_score
+    on each job's matched and missing keywords.
 
+    Args:
+        cv_data: CV data dict with profile, experiences, skills
+        jobs: List of job dicts with title and description
+        keyword_index: Prebuilt CVKeywordIndex for cv_data
+        snapshot: Keyword snapshot used for every job (default: the current one)
 
-def calculate_detailed_score(cv_data: dict, job: dict, threshold: float = 50.0) -> dict:
+    Returns:
+        List aligned with jobs of dicts with 'keywordScore',
+        'matchedKeywords' (count), 'totalKeywords' and 'indexVersion'
     """
-    Calculate detailed compatibility score with explanations.
-    Uses weighted technical keyword matching for more accurate scores.
+    if not jobs:
+        return []
+
+    if keyword_index is None:
+        keyword_index = CVKeywordIndex(cv_data)
+    if snapshot is None:
+        snapshot = get_keyword_snapshot()
+
+    # One row per job, one column per distinct (lowercased) keyword
+    terms: dict[str, int] = {}
+    rows = []
+    cols = []
+    keyword_counts = []
+    for row, job in enumerate(jobs):
+        keywords = extract_keywords_weighted(_job_keyword_text(job), max_keywords=30, snapshot=snapshot)
+        keyword_counts.append(len(keywords))
+        for kw in keywords:
+            rows.append(row)
+            cols.append(terms.setdefault(kw["keyword"].lower(), len(terms)))
+
+    vocabulary = list(terms)
+    units = np.array([_weight_units(weight) for _, weight in classify_terms(vocabulary, snapshot)], dtype=np.int64)
+    in_cv = np.array([keyword_index.matches(term) for term in vocabulary], dtype=np.int64)
+
+    matrix = csr_matrix(
+        (np.ones(len(cols), dtype=np.int64), (rows, cols)),
+        shape=(len(jobs), len(vocabulary)),
+    )
+    total_units = matrix @ units
+    matched_units = matrix @ (units * in_cv)
+    matched_counts = matrix @ in_cv
+
+    results = []
+    for i, total_keywords in enumerate(keyword_counts):
+        score = _keyword_score(int(matched_units[i]), int(total_units[i])) if total_keywords else 50.0
+        results.append({
+            "keywordScore": score,
+            "matchedKeywords": int(matched_counts[i]),
+            "totalKeywords": total_keywords,
+            "indexVersion": snapshot.version,
+        })
+    return results
+
+
+def prepare_cv(cv_data: dict) -> dict:
+    """
+    Prepare everything about a CV that does not depend on the job.
+
+    The result can be reused to score the same CV against many jobs
+    without rebuilding its text, embeddings or keyword profile.
 
     Args:
         cv_data: CV data dict with profile, experiences, skills
-        job: Job dict with title, company, description
-        threshold: Minimum score for experience to be relevant
 
     Returns:
-        Detailed score result with global score, experience matches, and keywords
+        Dict with 'cv_data', 'cv_text', 'cv_embedding', 'experience_embeddings'
+        and 'keyword_index'. Embeddings are None when there is nothing to encode.
     """
     cv_text = prepare_cv_text(cv_data)
-    job_text = prepare_job_text(job)
+    _, experience_texts = prepare_experience_texts(cv_data.get("experiences", []))
 
-    # Calculate semantic similarity score
-    semantic_score = calculate_score(cv_text, job_text)
+    # Encode the CV and its experiences in a single call
+    texts = ([cv_text] if cv_text.strip() else []) + experience_texts
+    embeddings = encode_texts(texts) if texts else None
 
-    # Calculate experience scores
-    experiences = cv_data.get("experiences", [])
-    experience_matches = calculate_experience_scores(experiences, job_text, threshold)
+    cv_embedding = None
+    experience_embeddings = None
+    if embeddings is not None:
+        if cv_text.strip():
+            cv_embedding = embeddings[0]
+            embeddings = embeddings[1:]
+        if experience_texts:
+            experience_embeddings = embeddings
 
-    # Extract job keywords (technical keywords prioritized)
-    job_description = job.get("description", "")
-    job_title = job.get("title", "")
-    job_full_text = f"{job_title} {job_description}"
+    return {
+        "cv_data": cv_data,
+        "cv_text": cv_text,
+        "cv_embedding": cv_embedding,
+        "experience_embeddings": experience_embeddings,
+        "keyword_index": CVKeywordIndex(cv_data),
+    }
+
+
+def _analyze_job_keywords(
+    cv_data: dict,
+    job: dict,
+    keyword_index: CVKeywordIndex,
+    snapshot: KeywordSnapshot,
+) -> dict:
+    """
+    Extract a job's keywords and compare them with the CV.
 
-    # Get weighted keywords
-    job_keywords_weighted = extract_keywords_weighted(job_full_text, max_keywords=30)
+    Returns:
+        Dict with the keyword fields of the detailed score result
+    """
+    # Extract job keywords (technical keywords prioritized)
+    job_keywords_weighted = extract_keywords_weighted(_job_keyword_text(job), max_keywords=30, snapshot=snapshot)
     job_keywords = [kw["keyword"] for kw in job_keywords_weighted]
 
     # Separate technical and non-technical keywords for reporting
     technical_keywords = [kw["keyword"] for kw in job_keywords_weighted if kw["is_technical"]]
-    non_technical_keywords = [kw["keyword"] for kw in job_keywords_weighted if not kw["is_technical"]]
 
     # Find matched and missing keywords
-    matched_keywords, missing_keywords = find_matching_keywords(cv_data, job_keywords)
+    matched_keywords, missing_keywords = find_matching_keywords(cv_data, job_keywords, keyword_index)
 
     # Separate matched technical vs non-technical
-    matched_technical = [kw for kw in matched_keywords if is_technical_term(kw)]
-    matched_non_technical = [kw for kw in matched_keywords if not is_technical_term(kw)]
-    missing_technical = [kw for kw in missing_keywords if is_technical_term(kw)]
+    matched_classes = classify_terms(matched_keywords, snapshot)
+    missing_classes = classify_terms(missing_keywords, snapshot)
+    matched_technical = [kw for kw, (is_tech, _) in zip(matched_keywords, matched_classes) if is_tech]
+    missing_technical = [kw for kw, (is_tech, _) in zip(missing_keywords, missing_classes) if is_tech]
 
     # Calculate weighted keyword score (technical keywords count more)
-    keyword_score = calculate_weighted_keyword_score(matched_keywords, missing_keywords)
+    keyword_score = calculate_weighted_keyword_score(matched_keywords, missing_keywords, snapshot)
 
     # Get user's skills that match any job keyword
-    user_skills = [s.get("name") for s in cv_data.get("skills", []) if s.get("name")]
-    matched_skills = []
-    for skill in user_skills:
-        skill_lower = skill.lower()
-        skill_words = skill_lower.split()
-        for kw in job_keywords:
-            kw_lower = kw.lower()
-            # Match if skill contains keyword, keyword contains skill, or any word matches
-            if (skill_lower in kw_lower or
-                kw_lower in skill_lower or
-                any(sw in kw_lower for sw in skill_words) or
-                any(kw_lower in sw for sw in skill_words)):
-                if skill not in matched_skills:
-                    matched_skills.append(skill)
-                break
-
-    # Calculate final weighted score:
-    # - 40% semantic similarity (general context match)
-    # - 60% weighted keyword match (technical skills matter more)
-    global_score = round(semantic_score * 0.4 + keyword_score * 0.6, 1)
+    matched_skills = keyword_index.matched_skills(job_keywords)
 
     return {
-        "globalScore": global_score,
-        "semanticScore": semantic_score,
         "keywordScore": keyword_score,
-        "experienceMatches": experience_matches,
         "matchedKeywords": matched_keywords,
         "matchedTechnical": matched_technical,
         "missingKeywords": missing_keywords,
         "missingTechnical": missing_technical,
         "matchedSkills": matched_skills,
         "totalKeywords": len(job_keywords),
-        "technicalKeywords": len(technical_keywords)
+        "technicalKeywords": len(technical_keywords),
+        "indexVersion": snapshot.version,
     }
+
+
+def calculate_detailed_scores_batch(
+    cv_data: dict,
+    jobs: list[dict],
+    threshold: float = 50.0,
+    prepared_cv: Optional[dict] = None,
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> list[dict]:
+    """
+    Calculate detailed compatibility scores of one CV against many jobs.
+
+    The CV, its experiences and all job texts are each encoded exactly once,
+    and the experiences x jobs similarities are computed in one operation.
+
+    Args:
+        cv_data: CV data dict with profile, experiences, skills
+        jobs: List of job dicts with title, company, description
+        threshold: Minimum score for experience to be relevant
+        prepared_cv: Result of prepare_cv for this CV (skips CV preparation)
+        snapshot: Keyword snapshot used for every job (default: the current one)
+
+    Returns:
+        List of detailed score results, one per job, in input order
+    """
+    if not jobs:
+        return []
+
+    if prepared_cv is None:
+        prepared_cv = prepare_cv(cv_data)
+    if snapshot is None:
+        snapshot = get_keyword_snapshot()
+
+    cv_data = prepared_cv["cv_data"]
+    cv_embedding = prepared_cv["cv_embedding"]
+    experience_embeddings = prepared_cv["experience_embeddings"]
+    keyword_index = prepared_cv["keyword_index"]
+
+    # Encode all jobs at once
+    job_texts = [prepare_job_text(job) for job in jobs]
+    job_embeddings = encode_texts(job_texts, persist=True)
+
+    # Semantic similarity of the CV to every job
+    if cv_embedding is not None:
+        mask = np.array([bool(text.strip()) for text in job_texts])
+        semantic_scores = similarity_scores(cv_embedding, job_embeddings, mask).tolist()
+    else:
+        semantic_scores = [0.0] * len(jobs)
+
+    # Experiences x jobs similarity matrix
+    experiences = cv_data.get("experiences", [])
+    valid_indices, _ = prepare_experience_texts(experiences)
+    experience_scores = None
+    if experience_embeddings is not None:
+        experience_scores = similarity_matrix(experience_embeddings, job_embeddings).T.tolist()
+
+    results = []
+    for job, job_text, semantic_score, exp_scores in zip(
+        jobs, job_texts, semantic_scores, experience_scores or [None] * len(jobs)
+    ):
+        experience_matches = []
+        if exp_scores is not None and job_text:
+            for idx, score in zip(valid_indices, exp_scores):
+                exp = experiences[idx]
+                experience_matches.append({
+                    "title": exp.get("title", "Unknown"),
+                    "company": exp.get("company", ""),
+                    "score": score,
+                    "relevant": score >= threshold
+                })
+            # Sort by score descending
+            experience_matches.sort(key=lambda x: x["score"], reverse=True)
+
+        keywords = _analyze_job_keywords(cv_data, job, keyword_index, snapshot)
+
+        # Calculate final weighted score:
+        # - 40% semantic similarity (general context match)
+        # - 60% weighted keyword match (technical skills matter more)
+        global_score = round(semantic_score * 0.4 + keywords["keywordScore"] * 0.6, 1)
+
+        results.append({
+            "globalScore": global_score,
+            "semanticScore": semantic_score,
+            "experienceMatches": experience_matches,
+            **keywords,
+        })
+
+    return results
+
+
+def calculate_detailed_score(
+    cv_data: dict,
+    job: dict,
+    threshold: float = 50.0,
+    prepared_cv: Optional[dict] = None,
+) -> dict:
+    """
+    Calculate detailed compatibility score with explanations.
+    Uses weighted technical keyword matching for more accurate scores.
+
+    Args:
+        cv_data: CV data dict with profile, experiences, skills
+        job: Job dict with title, company, description
+        threshold: Minimum score for experience to be relevant
+        prepared_cv: Result of prepare_cv for this CV (skips CV preparation)
+
+    Returns:
+        Detailed score result with global score, experience matches, and keywords
+    """
+    return calculate_detailed_scores_batch(cv_data, [job], threshold, prepared_cv)[0]
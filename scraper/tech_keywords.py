@@ -3,27 +3,72 @@ Technical keyword detection using Stack Overflow tags and TF-IDF scoring.
 Combines curated tech terms with corpus-based frequency analysis.
 """
 
+import hashlib
+import heapq
 import json
 import os
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import formatdate
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
 import requests
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from idf_index import IdfIndex
+from keyword_pool import KEYWORD_PROCESS_MIN_BATCH, keyword_pool
+from vocabulary import PackedMap, PackedStrings
 
 # Cache configuration
 CACHE_DIR = Path("/tmp/cvspawner_cache")
 SO_TAGS_CACHE = CACHE_DIR / "stackoverflow_tags.json"
-CACHE_TTL = 86400 * 7  # 7 days
+CACHE_TTL = 86400 * 7  # 7 days (also the vocabulary refresh interval)
+TFIDF_INDEX_PATH = Path(os.environ.get("TFIDF_INDEX_PATH", str(CACHE_DIR / "tfidf_index.npz")))
+# Seconds between checks for a TF-IDF snapshot saved by another server worker (negative disables)
+TFIDF_RELOAD_INTERVAL = float(os.environ.get("TFIDF_RELOAD_INTERVAL", "2"))
+
+# Versioned vocabulary shipped with the service, loaded at startup without network access
+VOCABULARY_PATH = Path(os.environ.get("VOCABULARY_PATH", str(Path(__file__).parent / "data" / "tech_vocabulary.json")))
+
+# Optional background refresh from the Stack Exchange API (off for air-gapped clusters)
+VOCABULARY_REFRESH = os.environ.get("VOCABULARY_REFRESH", "0") == "1"
+VOCABULARY_REFRESH_PAGES = int(os.environ.get("VOCABULARY_REFRESH_PAGES", "0"))  # 100 tags per page, 0 = all
+VOCABULARY_REFRESH_WORKERS = int(os.environ.get("VOCABULARY_REFRESH_WORKERS", "4"))  # pages fetched at once
+STACKEXCHANGE_TAGS_URL = "https://api.stackexchange.com/2.3/tags"
+STACKEXCHANGE_SYNONYMS_URL = "https://api.stackexchange.com/2.3/tags/synonyms"
+# App key: the full tag set takes ~700 requests, over the keyless daily quota of 300
+STACKEXCHANGE_KEY = os.environ.get("STACKEXCHANGE_KEY")
+
+# Memoized classifications of raw input terms
+TERM_MEMO_SIZE = int(os.environ.get("TERM_MEMO_SIZE", "50000"))
 
 # Thread safety
 _lock = threading.Lock()
-_tech_terms: Optional[set] = None
-_tfidf_vectorizer: Optional[TfidfVectorizer] = None
-_idf_scores: Optional[dict] = None
+_tech_terms: Optional["TechVocabulary"] = None
+_vocabulary_info: dict = {"version": None, "source": None, "path": None, "loaded_at": None}
+_refresh_status: dict = {
+    "enabled": VOCABULARY_REFRESH,
+    "state": "idle",
+    "last_attempt": None,
+    "pages_fetched": 0,
+    "pages_not_modified": 0,
+    "pages_failed": 0,
+    "changed": False,
+    "error": None,
+}
+_refresh_thread: Optional[threading.Thread] = None
+_idf_index = IdfIndex(TFIDF_INDEX_PATH)
+_build_lock = threading.Lock()  # Serializes changes to the TF-IDF corpus
+_tfidf_checked_at = 0.0  # monotonic time of the last check for a newer snapshot
+_open_appends = 0  # streamed append uploads whose chunks are not saved yet
 
 # Soft skills and generic HR terms to always exclude
 SOFT_SKILLS_STOPWORDS = {
@@ -143,143 +188,594 @@ def ensure_cache_dir():
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def fetch_stackoverflow_tags(max_pages: int = 10) -> set:
-    """
-    Fetch popular tags from Stack Overflow API.
+def _page_items(pages: dict) -> list:
+    return [item for page in pages.values() for item in page.get("items", page.get("tags", []))]
 
-    Args:
-        max_pages: Maximum number of pages to fetch (100 tags per page)
+
+def _read_vocabulary(path: Path) -> Optional[dict]:
+    """
+    Read a vocabulary file: the bundled snapshot or a refreshed tag cache.
 
     Returns:
-        Set of tag names
-    """
-    tags = set()
-    base_url = "https://api.stackexchange.com/2.3/tags"
-
-    for page in range(1, max_pages + 1):
-        try:
-            response = requests.get(
-                base_url,
-                params={
-                    "site": "stackoverflow",
-                    "pagesize": 100,
-                    "page": page,
-                    "order": "desc",
-                    "sort": "popular"
-                },
-                timeout=10
-            )
+        Dict with 'version', 'source', 'created_at' (epoch seconds), 'tags',
+        'synonyms' and the 'pages' / 'synonym_pages' of a refreshed cache
+        (items and validators), or None if unreadable
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Error reading vocabulary {path}: {e}")
+        return None
+
+    pages = data.get("pages") or {}
+    synonym_pages = data.get("synonym_pages") or {}
+    tags = data.get("tags")
+    if tags is None:
+        tags = _page_items(pages)
+    synonyms = data.get("synonyms")
+    if synonyms is None:
+        synonyms = dict(_page_items(synonym_pages))
+
+    created_at = data.get("fetched_at", data.get("timestamp"))
+    if created_at is None and data.get("generated_at"):
+        created_at = datetime.fromisoformat(data["generated_at"].replace("Z", "+00:00")).timestamp()
 
-            if response.status_code == 200:
-                data = response.json()
-                for item in data.get("items", []):
-                    tag_name = item.get("name", "").lower()
-                    if tag_name:
-                        tags.add(tag_name)
+    return {
+        "version": data.get("version") or "unversioned",
+        "source": data.get("source") or "stackoverflow",
+        "created_at": created_at or 0.0,
+        "tags": tags,
+        "synonyms": synonyms,
+        "pages": pages,
+        "synonym_pages": synonym_pages,
+    }
 
-                # Check if there are more pages
-                if not data.get("has_more", False):
-                    break
-            else:
-                break
 
-        except Exception as e:
-            print(f"Error fetching SO tags page {page}: {e}")
-            break
+def _build_vocabulary(vocabulary: dict) -> "TechVocabulary":
+    """Packed tech vocabulary of a vocabulary file, with ALWAYS_TECH added."""
+    tags = {tag.lower() for tag in vocabulary["tags"]} | ALWAYS_TECH
+    synonyms = {source.lower(): target.lower() for source, target in vocabulary["synonyms"].items()}
+    return TechVocabulary(tags, synonyms)
 
-        # Rate limiting
-        time.sleep(0.1)
 
-    return tags
+def _set_vocabulary(tech_terms: "TechVocabulary", vocabulary: dict, path: Path) -> None:
+    # Called with _lock held
+    global _tech_terms
+
+    _tech_terms = tech_terms
+    _vocabulary_info.update(
+        version=vocabulary["version"],
+        source=vocabulary["source"],
+        path=str(path),
+        loaded_at=time.time(),
+    )
+    print(
+        f"Loaded {len(tech_terms)} tech terms and {len(tech_terms.synonyms)} synonyms "
+        f"({vocabulary['source']} {vocabulary['version']}, {tech_terms.nbytes / 1024:.0f} KiB)"
+    )
 
 
-def load_tech_terms() -> set:
+def load_tech_terms() -> "TechVocabulary":
     """
-    Load technical terms from cache or fetch from Stack Overflow.
+    Load the technical terms (blocking, but local: no network access).
+
+    Uses the bundled vocabulary snapshot, or the tag cache written by a
+    vocabulary refresh if that is newer. The first load publishes a keyword
+    snapshot with the terms.
 
     Returns:
-        Set of technical term strings
+        The tech vocabulary
     """
-    global _tech_terms
-
     if _tech_terms is not None:
         return _tech_terms
 
     with _lock:
-        if _tech_terms is not None:
-            return _tech_terms
+        if _tech_terms is None:
+            candidates = [(path, _read_vocabulary(path)) for path in (VOCABULARY_PATH, SO_TAGS_CACHE)]
+            # An empty tag cache is what a failed fetch used to leave behind
+            candidates = [(path, vocabulary) for path, vocabulary in candidates if vocabulary and vocabulary["tags"]]
+            if candidates:
+                path, vocabulary = max(candidates, key=lambda candidate: candidate[1]["created_at"])
+            else:
+                print(f"No vocabulary found at {VOCABULARY_PATH}, using built-in tech terms only")
+                path = Path(__file__)
+                vocabulary = {"version": "builtin", "source": "ALWAYS_TECH", "tags": [], "synonyms": {}}
+            _set_vocabulary(_build_vocabulary(vocabulary), vocabulary, path)
+    publish_keyword_snapshot()
+    return _tech_terms
+
+
+def _tags_session(workers: int) -> requests.Session:
+    """HTTP session with a connection pool sized for concurrent page fetches."""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retries))
+    return session
+
+
+def _tag_names(items: list[dict]) -> list[str]:
+    return [item["name"].lower() for item in items if item.get("name")]
+
+
+def _synonym_pairs(items: list[dict]) -> list[list[str]]:
+    return [
+        [item["from_tag"].lower(), item["to_tag"].lower()]
+        for item in items if item.get("from_tag") and item.get("to_tag")
+    ]
+
+
+def _fetch_tags_page(
+    session: requests.Session,
+    page: int,
+    cached: Optional[dict],
+    synonyms: bool = False,
+) -> dict:
+    """
+    Fetch one page of popular tags or tag synonyms, conditionally if it was
+    fetched before.
+
+    Returns:
+        Dict with 'status' ('fetched', 'not_modified', 'empty' or 'failed'),
+        'items' (tag names, or [from, to] synonym pairs), 'etag',
+        'last_modified', 'has_more' and 'backoff' (seconds the API asks
+        to wait before the next request)
+    """
+    cached = cached or {}
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    params = {
+        "site": "stackoverflow",
+        "pagesize": 100,
+        "page": page,
+        "order": "desc",
+        "sort": "applied" if synonyms else "popular"
+    }
+    if STACKEXCHANGE_KEY:
+        params["key"] = STACKEXCHANGE_KEY
+
+    try:
+        response = session.get(
+            STACKEXCHANGE_SYNONYMS_URL if synonyms else STACKEXCHANGE_TAGS_URL,
+            params=params,
+            headers=headers,
+            timeout=10
+        )
+    except requests.RequestException as e:
+        print(f"Error fetching SO tags page {page}: {e}")
+        return {**cached, "status": "failed"}
+
+    if response.status_code == 304:
+        return {**cached, "status": "not_modified"}
+    if response.status_code != 200:
+        print(f"Error fetching SO tags page {page}: HTTP {response.status_code}")
+        return {**cached, "status": "failed"}
+
+    data = response.json()
+    items = (_synonym_pairs if synonyms else _tag_names)(data.get("items", []))
+    return {
+        "status": "fetched" if items else "empty",
+        "items": items,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified") or formatdate(usegmt=True),
+        "has_more": data.get("has_more", False),
+        "backoff": data.get("backoff", 0),
+    }
+
+
+def fetch_stackoverflow_tags(
+    max_pages: Optional[int] = None,
+    cached_pages: Optional[dict] = None,
+    workers: Optional[int] = None,
+    synonyms: bool = False,
+) -> dict:
+    """
+    Fetch popular tags, or tag synonyms, from the Stack Overflow API.
+
+    Pages are fetched concurrently over one pooled session, `workers` at a
+    time, until the API reports no more pages (or max_pages). Pages fetched
+    before are requested conditionally (If-None-Match / If-Modified-Since)
+    and keep their cached items when the API answers 304 Not Modified.
+
+    Args:
+        max_pages: Maximum number of pages to fetch (default
+            VOCABULARY_REFRESH_PAGES, 0 for all)
+        cached_pages: Pages of a previous refresh, by page number (as str)
+        workers: Pages fetched at once (default VOCABULARY_REFRESH_WORKERS)
+        synonyms: Fetch the tag synonyms instead of the tags
+
+    Returns:
+        Dict of page number (as str) -> page dict (see _fetch_tags_page)
+    """
+    max_pages = VOCABULARY_REFRESH_PAGES if max_pages is None else max_pages
+    workers = max(1, workers or VOCABULARY_REFRESH_WORKERS)
+    cached_pages = cached_pages or {}
+    pages = {}
+    session = _tags_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="so-tags") as pool:
+            first = 1
+            while not max_pages or first <= max_pages:
+                last = first + workers - 1
+                if max_pages:
+                    last = min(last, max_pages)
+                numbers = range(first, last + 1)
+                results = list(pool.map(
+                    lambda page: _fetch_tags_page(session, page, cached_pages.get(str(page)), synonyms),
+                    numbers,
+                ))
+                pages.update((str(page), result) for page, result in zip(numbers, results))
+
+                statuses = [result["status"] for result in results]
+                if "empty" in statuses or all(status == "failed" for status in statuses):
+                    break
+                if any(not result.get("has_more", True) for result in results if result["status"] != "failed"):
+                    break
+                backoff = max(result.get("backoff") or 0 for result in results)
+                if backoff:
+                    time.sleep(backoff)
+                first = last + 1
+    finally:
+        session.close()
+    return pages
+
+
+def _kept_pages(pages: dict) -> dict:
+    """Pages to cache: up to the end of the listing, with their items and validators."""
+    kept = {}
+    for number in sorted(pages, key=int):
+        page = pages[number]
+        if page["status"] == "empty":
+            break
+        if page.get("items"):
+            kept[number] = {key: page.get(key) for key in ("etag", "last_modified", "has_more", "items")}
+        if page.get("has_more") is False:
+            break
+    return kept
+
+
+def refresh_vocabulary() -> dict:
+    """
+    Refresh the vocabulary from the Stack Overflow API (blocking).
+
+    Fetches the tags and the tag synonyms, writes them with their page
+    validators to SO_TAGS_CACHE and publishes a new keyword snapshot if the
+    vocabulary changed. Failed pages keep their cached items; if no tag
+    page could be fetched the vocabulary is unchanged.
+
+    Returns:
+        Refresh status dict
+    """
+    _refresh_status.update(state="running", last_attempt=time.time(), error=None)
+    try:
+        cached = _read_vocabulary(SO_TAGS_CACHE) or {"pages": {}, "synonym_pages": {}}
+        pages = fetch_stackoverflow_tags(cached_pages=cached["pages"])
+        synonym_pages = fetch_stackoverflow_tags(cached_pages=cached["synonym_pages"], synonyms=True)
+
+        statuses = [page["status"] for page in [*pages.values(), *synonym_pages.values()]]
+        _refresh_status.update(
+            pages_fetched=statuses.count("fetched"),
+            pages_not_modified=statuses.count("not_modified"),
+            pages_failed=statuses.count("failed"),
+        )
+        if all(page["status"] == "failed" for page in pages.values()):
+            raise RuntimeError("No tag page could be fetched")
+
+        fetched_at = time.time()
+        version = "stackoverflow-" + datetime.fromtimestamp(fetched_at, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        vocabulary = {
+            "version": version,
+            "source": "stackexchange-api",
+            "fetched_at": fetched_at,
+            "pages": _kept_pages(pages),
+            "synonym_pages": _kept_pages(synonym_pages),
+        }
 
         ensure_cache_dir()
+        tmp_path = SO_TAGS_CACHE.with_name(SO_TAGS_CACHE.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(vocabulary, f)
+        os.replace(tmp_path, SO_TAGS_CACHE)
+
+        vocabulary = _read_vocabulary(SO_TAGS_CACHE)
+        tech_terms = _build_vocabulary(vocabulary)
+        with _lock:
+            changed = _tech_terms is None or tech_terms.version != _tech_terms.version
+            if changed:
+                _set_vocabulary(tech_terms, vocabulary, SO_TAGS_CACHE)
+        if changed:
+            publish_keyword_snapshot()
+        _refresh_status.update(state="done", changed=changed)
+    except Exception as e:
+        print(f"Vocabulary refresh failed: {e}")
+        _refresh_status.update(state="failed", error=str(e))
+    return dict(_refresh_status)
 
-        # Check cache
-        if SO_TAGS_CACHE.exists():
-            try:
-                cache_stat = SO_TAGS_CACHE.stat()
-                cache_age = time.time() - cache_stat.st_mtime
-
-                if cache_age < CACHE_TTL:
-                    with open(SO_TAGS_CACHE, 'r') as f:
-                        cached = json.load(f)
-                        _tech_terms = set(cached.get("tags", []))
-                        _tech_terms.update(ALWAYS_TECH)
-                        print(f"Loaded {len(_tech_terms)} tech terms from cache")
-                        return _tech_terms
-            except Exception as e:
-                print(f"Error reading cache: {e}")
-
-        # Fetch from Stack Overflow
-        print("Fetching Stack Overflow tags...")
-        so_tags = fetch_stackoverflow_tags(max_pages=10)
-
-        # Combine with always-tech terms
-        _tech_terms = so_tags.union(ALWAYS_TECH)
-
-        # Save to cache
-        try:
-            with open(SO_TAGS_CACHE, 'w') as f:
-                json.dump({"tags": list(so_tags), "timestamp": time.time()}, f)
-            print(f"Cached {len(so_tags)} SO tags, total {len(_tech_terms)} tech terms")
-        except Exception as e:
-            print(f"Error saving cache: {e}")
 
-        return _tech_terms
+def _refresh_loop() -> None:
+    while True:
+        cached = _read_vocabulary(SO_TAGS_CACHE)
+        age = time.time() - cached["created_at"] if cached else CACHE_TTL
+        if age >= CACHE_TTL:
+            refresh_vocabulary()
+            age = 0
+        time.sleep(CACHE_TTL - age)
 
 
-def build_tfidf_index(job_descriptions: list[str]) -> None:
+def start_vocabulary_refresh() -> bool:
     """
-    Build TF-IDF index from job descriptions corpus.
+    Start the background vocabulary refresh if VOCABULARY_REFRESH is set.
+
+    Refreshes when the tag cache is older than CACHE_TTL, then every
+    CACHE_TTL. Classification never waits for it: it uses the bundled
+    vocabulary until a refresh publishes a newer one.
+
+    Returns:
+        True if the refresh thread is running
+    """
+    global _refresh_thread
+
+    if not VOCABULARY_REFRESH:
+        return False
+    if _refresh_thread is None or not _refresh_thread.is_alive():
+        _refresh_thread = threading.Thread(target=_refresh_loop, name="vocabulary-refresh", daemon=True)
+        _refresh_thread.start()
+    return True
+
+
+def get_vocabulary_status() -> dict:
+    """Return the version, size and memory use of the loaded vocabulary and the refresh state."""
+    tech_terms = _tech_terms
+    return {
+        **_vocabulary_info,
+        "terms": len(tech_terms) if tech_terms is not None else 0,
+        "synonyms": len(tech_terms.synonyms) if tech_terms is not None else 0,
+        "memory_bytes": tech_terms.nbytes if tech_terms is not None else 0,
+        "refresh": dict(_refresh_status),
+    }
+
+
+def build_tfidf_index(job_descriptions: list[str], ids: Optional[list[str]] = None, append: bool = False) -> int:
+    """
+    Add job descriptions to the TF-IDF document-frequency index.
     Higher IDF = more specific/technical term.
 
+    Only the new descriptions are tokenized. IDF scores are recomputed once
+    for the batch and published in a new keyword snapshot.
+
     Args:
         job_descriptions: List of job description texts
+        ids: Optional document ids aligned with job_descriptions, used to
+            remove them later (adding an existing id replaces it)
+        append: Add to the current corpus instead of replacing it
+
+    Returns:
+        Number of documents in the index
     """
-    global _tfidf_vectorizer, _idf_scores
+    if not append and not job_descriptions:
+        return len(_idf_index)
 
-    if not job_descriptions:
-        return
+    with _build_lock, _idf_index.file_lock():
+        _sync_tfidf_index()
+        if not append:
+            _idf_index.clear()
+        _idf_index.add_documents(job_descriptions, ids)
+        print(f"Added {len(job_descriptions)} documents to TF-IDF index ({len(_idf_index)} total)")
+        publish_keyword_snapshot()
+        _save_tfidf_index()
+        return len(_idf_index)
 
-    with _lock:
-        # Create vectorizer with specific settings for tech terms
-        _tfidf_vectorizer = TfidfVectorizer(
-            lowercase=True,
-            token_pattern=r'\b[a-zA-Z][a-zA-Z0-9+#._-]*[a-zA-Z0-9]\b|\b[a-zA-Z]\b',
-            max_features=10000,
-            min_df=1,  # Include terms appearing in at least 1 doc
-            max_df=0.95,  # Exclude terms appearing in >95% of docs
-        )
 
-        _tfidf_vectorizer.fit(job_descriptions)
+def remove_tfidf_documents(ids: list[str]) -> int:
+    """
+    Remove documents (e.g. expired postings) from the TF-IDF index.
+
+    Args:
+        ids: Ids given to build_tfidf_index
+
+    Returns:
+        Number of documents actually removed
+    """
+    with _build_lock, _idf_index.file_lock():
+        _sync_tfidf_index()
+        removed = _idf_index.remove_documents(ids)
+        if removed:
+            print(f"Removed {removed} documents from TF-IDF index ({len(_idf_index)} left)")
+            publish_keyword_snapshot()
+            _save_tfidf_index()
+    return removed
+
 
-        # Extract IDF scores
-        feature_names = _tfidf_vectorizer.get_feature_names_out()
-        idf_values = _tfidf_vectorizer.idf_
+class TfidfUpload:
+    """
+    Chunked build of the TF-IDF index from a streamed corpus.
+
+    Each chunk is tokenized and counted as it arrives, so only one chunk of
+    raw text is held at a time. In replace mode the chunks go into a fresh
+    index that replaces the current one in finish(); until then scoring
+    keeps using the old corpus. In append mode they go straight into the
+    current index. Either way the keyword snapshot is published once, at
+    the end.
+
+    While an append upload is open this worker stops reloading snapshots
+    saved by other workers, which would drop its unsaved chunks; a corpus
+    change saved by another worker in the meantime is overwritten by
+    finish().
+    """
 
-        _idf_scores = {
-            feature_names[i]: idf_values[i]
-            for i in range(len(feature_names))
+    def __init__(self, append: bool = False):
+        self.append = append
+        self.open = False
+        self.index: Optional[IdfIndex] = None
+        if not append:
+            self.index = IdfIndex(_idf_index.path, _idf_index.max_features, _idf_index.max_df)
+        self.progress = {
+            "state": "running",
+            "mode": "append" if append else "replace",
+            "documents": 0,
+            "chunks": 0,
+            "bytes": 0,
+            "started_at": time.time(),
+            "finished_at": None,
+            "total_documents": None,
+            "error": None,
         }
 
-        print(f"Built TF-IDF index with {len(_idf_scores)} terms")
+    def add_chunk(self, texts: list[str], ids: Optional[list[str]] = None, received_bytes: int = 0) -> None:
+        """
+        Add one chunk of documents.
+
+        Args:
+            texts: Document texts
+            ids: Optional document ids aligned with texts
+            received_bytes: Upload bytes consumed so far (for progress)
+        """
+        global _open_appends
+
+        if texts and self.append:
+            with _build_lock:
+                if not self.open:
+                    with _idf_index.file_lock():
+                        _sync_tfidf_index()
+                    _open_appends += 1
+                    self.open = True
+                _idf_index.add_documents(texts, ids)
+        elif texts:
+            self.index.add_documents(texts, ids)
+        self.progress["documents"] += len(texts)
+        self.progress["chunks"] += 1
+        self.progress["bytes"] = received_bytes
+
+    def finish(self) -> int:
+        """
+        Publish the uploaded corpus and save it.
+
+        Returns:
+            Number of documents in the index
+        """
+        global _idf_index
+
+        with _build_lock, _idf_index.file_lock():
+            if not self.append:
+                # Keep index versions increasing across the swap, also past snapshots of other workers
+                _sync_tfidf_index()
+                self.index.version = _idf_index.version + 1
+                _idf_index = self.index
+            elif _idf_index.is_stale():
+                print("TF-IDF snapshot changed by another worker during the upload, overwriting it")
+            self._close()
+            publish_keyword_snapshot()
+            _save_tfidf_index()
+            total = len(_idf_index)
+        self.progress.update(state="done", finished_at=time.time(), total_documents=total)
+        print(f"Uploaded {self.progress['documents']} documents to TF-IDF index ({total} total)")
+        return total
+
+    def fail(self, error: str) -> None:
+        """Abort the upload; chunks already appended to the current index stay."""
+        with _build_lock:
+            self._close()
+        self.progress.update(state="failed", finished_at=time.time(), error=error)
+
+    def _close(self) -> None:
+        # Called with _build_lock held
+        global _open_appends
+
+        if self.open:
+            _open_appends -= 1
+            self.open = False
+
+
+_last_upload: Optional[TfidfUpload] = None
+
+
+def start_tfidf_upload(append: bool = False) -> TfidfUpload:
+    """Start a chunked TF-IDF build; its progress is shown by get_tfidf_stats."""
+    global _last_upload
+    _last_upload = TfidfUpload(append)
+    return _last_upload
+
+
+def _save_tfidf_index() -> None:
+    # A failed save only costs a rebuild after the next restart
+    try:
+        _idf_index.save()
+    except Exception as e:
+        print(f"Error saving TF-IDF snapshot: {e}")
+
+
+def _sync_tfidf_index() -> bool:
+    """
+    Reload the TF-IDF index if another worker saved a newer snapshot.
+    Called with _build_lock held.
+
+    Returns:
+        True if a snapshot was loaded (and a new keyword snapshot published)
+    """
+    if _open_appends or not _idf_index.is_stale():
+        return False
+    loaded = _idf_index.load()
+    if loaded:
+        publish_keyword_snapshot()
+    return loaded
+
+
+def _reload_saved_tfidf_index() -> Optional["KeywordSnapshot"]:
+    """
+    Check, at most every TFIDF_RELOAD_INTERVAL seconds, for a TF-IDF
+    snapshot saved by another worker and publish it. Never waits for a
+    corpus change in progress in this worker.
+
+    Returns:
+        The new keyword snapshot, or None if nothing was reloaded
+    """
+    global _tfidf_checked_at
+
+    if not _build_lock.acquire(blocking=False):
+        return None
+    try:
+        _tfidf_checked_at = time.monotonic()
+        return _snapshot if _sync_tfidf_index() else None
+    finally:
+        _build_lock.release()
+
+
+def load_tfidf_index() -> bool:
+    """
+    Load the TF-IDF index saved by a previous run (TFIDF_INDEX_PATH).
+
+    Returns:
+        True if a snapshot was loaded
+    """
+    loaded = _idf_index.load()
+    if loaded:
+        publish_keyword_snapshot()
+    return loaded
+
+
+def get_idf_scores() -> Optional[Mapping[str, float]]:
+    """
+    Get the term -> IDF mapping of the current keyword snapshot.
+
+    Returns:
+        IDF scores, or None if the index is not built
+    """
+    return get_keyword_snapshot().idf_scores
+
+
+def get_tfidf_stats() -> dict:
+    """
+    Return the size of the TF-IDF index, the version and age of its
+    snapshot and the progress of the last streamed upload.
+    """
+    stats = _idf_index.stats()
+    stats["upload"] = dict(_last_upload.progress) if _last_upload is not None else None
+    return stats
 
 
 def get_idf_score(term: str) -> float:
@@ -292,10 +788,240 @@ def get_idf_score(term: str) -> float:
     Returns:
         IDF score (0 if not found or index not built)
     """
-    if _idf_scores is None:
+    idf_scores = get_idf_scores()
+    if idf_scores is None:
         return 0.0
 
-    return _idf_scores.get(term.lower(), 0.0)
+    return idf_scores.get(term.lower(), 0.0)
+
+
+# Candidate keyword tokens, incl. tech terms with special chars (C++, C#, .NET, Node.js)
+TOKEN_BODY = r'[A-Za-z][A-Za-z0-9]*(?:[+#._-][A-Za-z0-9]+)*'
+TOKEN_REGEX = rf'\b({TOKEN_BODY})\b'
+TOKEN_PATTERN = re.compile(TOKEN_REGEX)
+
+# Whitespace-separated words, as str.split finds them
+WORD_PATTERN = re.compile(r'\S+')
+
+# Separators turning a hyphenated vocabulary term into a multi-word phrase
+PHRASE_SEPARATORS = re.compile(r'[-_]')
+
+# Classification of vocabulary terms outside ALWAYS_TECH
+TECH_TERM = (True, 1.5)
+
+# Classification of terms that are neither in the vocabulary nor specific enough by IDF
+UNKNOWN_TERM = (False, 0.3)
+
+
+def _vocabulary_phrases(terms: Iterable[str]) -> dict[str, str]:
+    """
+    Map the space-separated form of hyphenated terms to the term.
+
+    Phrase words must each be a token, e.g. "objective c" but not "c++ cli".
+    """
+    phrases = {}
+    for term in sorted(set(terms)):
+        words = [word for word in PHRASE_SEPARATORS.split(term) if word]
+        if len(words) < 2 or not all(TOKEN_PATTERN.fullmatch(word) for word in words):
+            continue
+        phrases.setdefault(" ".join(words), term)
+    return phrases
+
+
+class TechVocabulary:
+    """
+    Tech terms with their synonyms and the phrases they are written as.
+
+    `synonyms` maps alternative tag names to the term they stand for
+    ("js" -> "javascript"); a synonym must point at a term and never
+    shadows a term or a soft-skill stopword. `phrases` maps the
+    space-separated form of hyphenated terms, stopwords and synonyms to
+    them ("machine learning" -> "machine-learning"), and `prefixes` holds
+    the leading words of every phrase, so a matcher only looks for phrases
+    where one can start.
+
+    All of it is packed (vocabulary.PackedStrings): the full Stack Overflow
+    tag set takes a few MB instead of one Python object per string. A
+    lookup costs about a microsecond rather than a set's tenth of one, so
+    per-token callers memoize. Vocabularies compare equal by `version`, a
+    content hash identical across workers and restarts.
+    """
+
+    __slots__ = ("terms", "synonyms", "phrases", "prefixes", "version")
+
+    def __init__(self, terms: Iterable[str], synonyms: Optional[Mapping[str, str]] = None):
+        terms = PackedStrings(terms)
+        synonyms = PackedMap({
+            source: target for source, target in (synonyms or {}).items()
+            if target in terms and source not in terms and source not in SOFT_SKILLS_STOPWORDS
+        })
+        phrases = _vocabulary_phrases([*terms, *SOFT_SKILLS_STOPWORDS, *synonyms.keys])
+        prefixes = set()
+        for phrase in phrases:
+            words = phrase.split(" ")
+            prefixes.update(" ".join(words[:end]) for end in range(1, len(words)))
+
+        digest = hashlib.sha1(terms.digest().encode("ascii"))
+        digest.update(synonyms.digest().encode("ascii"))
+        for name, value in (
+            ("terms", terms),
+            ("synonyms", synonyms),
+            ("phrases", PackedMap(phrases)),
+            ("prefixes", PackedStrings(prefixes)),
+            ("version", digest.hexdigest()[:8]),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TechVocabulary is immutable")
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def of(cls, terms: Iterable[str]) -> "TechVocabulary":
+        """The vocabulary itself, or one built from plain terms."""
+        return terms if isinstance(terms, TechVocabulary) else cls(terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __contains__(self, term) -> bool:
+        return term in self.terms
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TechVocabulary):
+            return NotImplemented
+        return self.version == other.version
+
+    def __hash__(self) -> int:
+        return hash(self.version)
+
+    def canonical(self, term: str) -> str:
+        """Map a lowercased term to the term it is a synonym of."""
+        return self.synonyms.get(term, term)
+
+    def resolve(self, term: str) -> str:
+        """Map a lowercased, whitespace-normalized term or phrase to its canonical term."""
+        if " " in term:
+            term = self.phrases.get(term, term)
+        return self.synonyms.get(term, term)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the packed terms, synonyms and phrases."""
+        return self.terms.nbytes + self.synonyms.nbytes + self.phrases.nbytes + self.prefixes.nbytes
+
+    def stats(self) -> dict:
+        """Return the sizes and memory use of the vocabulary."""
+        return {
+            "version": self.version,
+            "terms": len(self.terms),
+            "synonyms": len(self.synonyms),
+            "phrases": len(self.phrases),
+            "memory_bytes": self.nbytes,
+        }
+
+
+class TermTable:
+    """
+    Precomputed term -> (is_technical, weight) table.
+
+    Built from the IDF scores and the stopword and ALWAYS_TECH overrides;
+    other vocabulary terms are classified by looking them up in the packed
+    vocabulary, after mapping phrases and synonyms to their term. Results
+    are memoized per input string; the memo is cleared when it reaches
+    memo_size entries.
+    """
+
+    def __init__(self, tech_terms: Iterable[str], idf_scores: Optional[dict], memo_size: int = TERM_MEMO_SIZE):
+        vocabulary = TechVocabulary.of(tech_terms)
+        self.vocabulary = vocabulary
+        self.idf_scores = idf_scores
+        self.memo_size = memo_size
+
+        table = {}
+        # High IDF terms are technical unless the vocabulary says otherwise
+        for term, idf in (idf_scores or {}).items():
+            if term in vocabulary:
+                continue
+            if idf >= 3.0:
+                table[term] = (True, 1.3)
+            elif idf >= 2.0:
+                table[term] = (True, 1.0)
+        # Core tech terms from ALWAYS_TECH weigh more than other SO tags
+        for term in ALWAYS_TECH:
+            if term in vocabulary:
+                table[term] = (True, 2.0)
+        # Soft skills are excluded even if they are also SO tags
+        for term in SOFT_SKILLS_STOPWORDS:
+            table[term] = (False, 0.1)
+
+        self.table = table
+        self._memo: dict[str, tuple[bool, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _remember(self, term: str, result: tuple[bool, float]) -> None:
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[term] = result
+
+    def lookup_many(self, terms: Iterable[str]) -> list[tuple[bool, float]]:
+        """lookup of several terms; memoized terms are read without a method call each."""
+        memo_get = self._memo.get
+        lookup = self.lookup
+        return [memo_get(term) or lookup(term) for term in terms]
+
+    def lookup(self, term: str) -> tuple[bool, float]:
+        """Classify an already lowercased, whitespace-normalized term."""
+        result = self._memo.get(term)
+        if result is None:
+            canonical = self.vocabulary.resolve(term)
+            result = self.table.get(canonical)
+            if result is None:
+                result = TECH_TERM if canonical in self.vocabulary else UNKNOWN_TERM
+            self._remember(term, result)
+        return result
+
+    def classify(self, term: str) -> tuple[bool, float]:
+        """
+        Classify a term as written.
+
+        "Machine Learning" is classified like "machine-learning", and a
+        synonym like the term it stands for.
+
+        Returns:
+            Tuple of (is_technical, weight)
+        """
+        result = self._memo.get(term)
+        if result is None:
+            result = self.lookup(" ".join(term.lower().split()))
+            self._remember(term, result)
+        return result
+
+
+def classify_terms(terms: list[str], snapshot: Optional["KeywordSnapshot"] = None) -> list[tuple[bool, float]]:
+    """
+    Classify several terms at once.
+
+    Args:
+        terms: Terms as written (case and surrounding whitespace are ignored)
+        snapshot: Keyword snapshot to classify with (default: the current one)
+
+    Returns:
+        List of (is_technical, weight) tuples aligned with terms
+    """
+    classify = (snapshot or get_keyword_snapshot()).table.classify
+    return [classify(term) for term in terms]
 
 
 def is_technical_term(term: str, idf_threshold: float = 2.0) -> bool:
@@ -316,24 +1042,17 @@ def is_technical_term(term: str, idf_threshold: float = 2.0) -> bool:
     Returns:
         True if term is technical
     """
-    term_lower = term.lower().strip()
+    snapshot = get_keyword_snapshot()
+    if idf_threshold == 2.0:
+        return snapshot.table.classify(term)[0]
 
-    # Always exclude soft skills
-    if term_lower in SOFT_SKILLS_STOPWORDS:
+    # Custom thresholds are not precomputed
+    canonical = snapshot.tech_terms.resolve(" ".join(term.lower().split()))
+    if canonical in SOFT_SKILLS_STOPWORDS:
         return False
-
-    # Check tech terms (SO tags + ALWAYS_TECH)
-    tech_terms = load_tech_terms()
-    if term_lower in tech_terms:
+    if canonical in snapshot.tech_terms:
         return True
-
-    # Check IDF score (if index is built)
-    if _idf_scores is not None:
-        idf = _idf_scores.get(term_lower, 0.0)
-        if idf >= idf_threshold:
-            return True
-
-    return False
+    return (snapshot.idf_scores or {}).get(canonical, 0.0) >= idf_threshold
 
 
 def classify_keywords(keywords: list[str], idf_threshold: float = 2.0) -> dict:
@@ -369,89 +1088,449 @@ def get_technical_weight(term: str) -> float:
     Returns:
         Weight between 0.1 (non-technical) and 2.0 (highly technical)
     """
-    term_lower = term.lower().strip()
+    return get_keyword_snapshot().table.classify(term)[1]
 
-    # Soft skills get very low weight
-    if term_lower in SOFT_SKILLS_STOPWORDS:
-        return 0.1
 
-    tech_terms = load_tech_terms()
+class TermMatcher:
+    """
+    Matcher of the tech vocabulary and soft-skill stopwords in text.
+
+    Hyphenated terms ("machine-learning", "ruby-on-rails") are indexed as
+    word sequences, so "machine learning" in a description matches as one
+    term. From each token that can start a phrase, the following
+    whitespace-separated words are read while they still form a phrase
+    prefix, and the longest phrase found wins. Matches are mapped to their
+    canonical term (phrases and synonyms resolved) and classified with a
+    TermTable.
+
+    Unlike one regex alternation over every phrase, the cost does not grow
+    with the vocabulary. Vocabulary lookups and the tokens of each
+    whitespace-separated word are memoized; each memo is cleared when it
+    reaches memo_size entries.
+    """
 
-    # Core tech terms from ALWAYS_TECH get highest weight
-    if term_lower in ALWAYS_TECH:
-        return 2.0
+    def __init__(self, tech_terms: Iterable[str], memo_size: int = TERM_MEMO_SIZE):
+        self.vocabulary = TechVocabulary.of(tech_terms)
+        self.memo_size = memo_size
+        # word (as written or lowercased) or lowercased phrase -> (canonical term, whether a longer phrase can start with it)
+        self._memo: dict[str, tuple[Optional[str], bool]] = {}
+        # whitespace-separated word -> its tokens and their lookups (see _word)
+        self._words: dict[str, tuple] = {}
+
+    def _lookup(self, words: str) -> tuple[Optional[str], bool]:
+        result = self._memo.get(words)
+        if result is None:
+            vocabulary = self.vocabulary
+            if " " in words:
+                term = vocabulary.phrases.get(words)
+                term = term and vocabulary.canonical(term)
+            else:
+                term = vocabulary.canonical(words)
+            result = (term, words in vocabulary.prefixes)
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[words] = result
+        return result
+
+    def _token(self, token: str) -> tuple[Optional[str], bool]:
+        """_lookup of a token as written."""
+        result = self._memo.get(token)
+        if result is None:
+            result = self._lookup(token.lower())
+            self._memo[token] = result
+        return result
+
+    def _word(self, word: str) -> tuple:
+        """
+        Tokens of a whitespace-free word with their lookups (memoized).
+
+        Returns:
+            (tokens, lookups, whether a token starts the word, whether one
+            ends it, (token, canonical) pairs, whether a phrase can start
+            at its last token, (start, end) of each token in the word)
+        """
+        entry = self._words.get(word)
+        if entry is None:
+            found = list(TOKEN_PATTERN.finditer(word))
+            tokens = tuple(match.group(1) for match in found)
+            lookups = tuple(self._token(token) for token in tokens)
+            entry = (
+                tokens,
+                lookups,
+                bool(found) and found[0].start() == 0,
+                bool(found) and found[-1].end() == len(word),
+                tuple((token, canonical) for token, (canonical, _) in zip(tokens, lookups)),
+            )
+            # A phrase can start here if the last token is a phrase prefix and ends the word
+            entry += (entry[3] and lookups[-1][1], tuple(match.span(1) for match in found))
+            if len(self._words) >= self.memo_size:
+                self._words.clear()
+            self._words[word] = entry
+        return entry
+
+    def unique_terms(self, text: str) -> list[tuple[str, str]]:
+        """
+        Distinct (term, canonical) pairs in order of first occurrence.
+
+        'term' is the text as written (phrase words joined by one space).
+        Gives the terms of scan without visiting every occurrence: the text
+        is split on whitespace and deduplicated in C, each distinct word is
+        tokenized and looked up once (memoized across texts), and only
+        words ending in a phrase prefix are walked for phrases. No regex
+        runs over the text itself, so long descriptions cost little more
+        than str.split.
+        """
+        words = text.split()
+        words_get = self._words.get
+        word_entry = self._word
+        entries = {word: words_get(word) or word_entry(word) for word in dict.fromkeys(words)}
+
+        starters = {word for word, entry in entries.items() if entry[5]}
+        phrases = self._phrases(words, entries, starters) if starters else []
+        if not phrases:
+            return list(dict.fromkeys(chain.from_iterable(map(itemgetter(4), entries.values()))))
+
+        # Tokens inside a phrase only count where they also occur on their own
+        consumed = set()
+        found = []
+        for position, last, term, canonical in phrases:
+            consumed.add(position)
+            consumed.update((k, 0) for k in range(position[0] + 1, last + 1))
+            found.append((position, term, canonical))
+        first = dict(zip(reversed(words), range(len(words) - 1, -1, -1)))
+        seen = set()
+        for word, (tokens, lookups, *_) in entries.items():
+            for t, (token, (canonical, _)) in enumerate(zip(tokens, lookups)):
+                if token in seen:
+                    continue
+                seen.add(token)
+                position = (first[word], t)
+                if position in consumed:
+                    position = self._free_position(token, position, words, entries, consumed)
+                if position is not None:
+                    found.append((position, token, canonical))
+        found.sort(key=itemgetter(0))
+        return list(dict.fromkeys((term, canonical) for _, term, canonical in found))
+
+    def _phrases(self, words: list[str], entries: dict, starters: set) -> list[tuple]:
+        """
+        Longest phrases starting at the last token of each starter word.
+
+        Returns:
+            (position, last word, phrase as written, canonical term) per
+            phrase in text order; positions are (word index, token index)
+        """
+        memo_get = self._memo.get
+        lookup = self._lookup
+        count = len(words)
+        phrases = []
+        end = (-1, -1)
+        for k in [k for k, word in enumerate(words) if word in starters]:
+            tokens = entries[words[k]][0]
+            position = (k, len(tokens) - 1)
+            if position <= end:
+                continue
+            written = [tokens[-1]]
+            phrase = tokens[-1].lower()
+            last = k
+            term = None
+            j = k
+            # Phrases continue across whitespace into words that start with a token
+            while j + 1 < count:
+                next_tokens, _, starts, ends, *_ = entries[words[j + 1]]
+                if not starts:
+                    break
+                j += 1
+                written.append(next_tokens[0])
+                phrase = f"{phrase} {next_tokens[0].lower()}"
+                phrase_term, is_prefix = memo_get(phrase) or lookup(phrase)
+                if phrase_term is not None:
+                    last, term = j, phrase_term
+                if not is_prefix or len(next_tokens) > 1 or not ends:
+                    break
+            if term is not None:
+                phrases.append((position, last, " ".join(written[:last - k + 1]), term))
+                end = (last, 0)
+        return phrases
+
+    @staticmethod
+    def _free_position(token: str, position: tuple, words: list[str], entries: dict, consumed: set):
+        """First occurrence of a token after position that is not inside a phrase."""
+        start_word, start_token = position
+        for k in range(start_word, len(words)):
+            tokens = entries[words[k]][0]
+            for t in range(start_token + 1 if k == start_word else 0, len(tokens)):
+                if tokens[t] == token and (k, t) not in consumed:
+                    return k, t
+        return None
+
+    def scan(self, text: str, table: TermTable) -> list[dict]:
+        """
+        Find every candidate term in a text.
+
+        Args:
+            text: Text to scan
+            table: Table used to classify the matches
+
+        Returns:
+            List of dicts with 'term', 'canonical', 'start', 'end',
+            'is_technical' and 'weight', in text order
+        """
+        # Same words, tokens and phrases as unique_terms, visiting every occurrence
+        found = list(WORD_PATTERN.finditer(text))
+        words = [match.group() for match in found]
+        entries = {word: self._word(word) for word in dict.fromkeys(words)}
+        starters = {word for word, entry in entries.items() if entry[5]}
+        phrases = {
+            position: (last, term, canonical)
+            for position, last, term, canonical in (self._phrases(words, entries, starters) if starters else [])
+        }
+
+        matches = []
+        inside = (-1, -1)  # positions up to this one belong to the last phrase
+        for k, word in enumerate(words):
+            tokens, lookups, *_, spans = entries[word]
+            offset = found[k].start()
+            for t, (token, (canonical, _)) in enumerate(zip(tokens, lookups)):
+                if (k, t) <= inside:
+                    continue
+                end = offset + spans[t][1]
+                phrase = phrases.get((k, t))
+                if phrase is not None:
+                    last, token, canonical = phrase
+                    # A phrase ends at the first token of its last word
+                    end = found[last].start() + entries[words[last]][6][0][1]
+                    inside = (last, 0)
+                is_tech, weight = table.lookup(canonical)
+                matches.append({
+                    "term": token,
+                    "canonical": canonical,
+                    "start": offset + spans[t][0],
+                    "end": end,
+                    "is_technical": is_tech,
+                    "weight": weight,
+                })
+        return matches
+
+
+class KeywordSnapshot:
+    """
+    Immutable keyword state: the tech vocabulary, the IDF scores, and the
+    classification table and term matcher built from them.
 
-    # Stack Overflow tags get high weight
-    if term_lower in tech_terms:
-        return 1.5
+    A snapshot is never modified once built. Rebuilds publish a new one
+    with a single assignment (publish_keyword_snapshot), so a request that
+    takes one snapshot extracts and classifies every term against the same
+    index `version`, without locks.
+    """
+
+    __slots__ = ("tech_terms", "idf_scores", "idf_version", "vocabulary_version", "version", "table", "matcher")
+
+    def __init__(
+        self,
+        tech_terms: Iterable[str],
+        idf_scores: Optional[Mapping[str, float]] = None,
+        idf_version: int = 0,
+        previous: Optional["KeywordSnapshot"] = None,
+    ):
+        tech_terms = TechVocabulary.of(tech_terms)
+        idf_scores = MappingProxyType(dict(idf_scores)) if idf_scores else None
+
+        # The matcher only depends on the vocabulary, so keep it if that did not change
+        if previous is not None and previous.tech_terms == tech_terms:
+            tech_terms = previous.tech_terms
+            matcher = previous.matcher
+        else:
+            matcher = TermMatcher(tech_terms)
+
+        for name, value in (
+            ("tech_terms", tech_terms),
+            ("idf_scores", idf_scores),
+            ("idf_version", idf_version),
+            ("vocabulary_version", tech_terms.version),
+            ("version", f"{tech_terms.version}-{idf_version}"),
+            ("table", TermTable(tech_terms, idf_scores)),
+            ("matcher", matcher),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("KeywordSnapshot is immutable; publish a new one instead")
+
+    def __reduce__(self):
+        # The table and matcher are rebuilt from the vocabulary and IDF scores on load
+        idf_scores = dict(self.idf_scores) if self.idf_scores else None
+        return KeywordSnapshot, (self.tech_terms, idf_scores, self.idf_version)
+
+    def stats(self) -> dict:
+        """Return the version and sizes of the snapshot."""
+        return {
+            "version": self.version,
+            "vocabulary_version": self.vocabulary_version,
+            "idf_version": self.idf_version,
+            "tech_terms": len(self.tech_terms),
+            "vocabulary_bytes": self.tech_terms.nbytes,
+            "idf_terms": len(self.idf_scores) if self.idf_scores else 0,
+            "table_terms": len(self.table),
+        }
 
-    # High IDF terms get medium-high weight
-    if _idf_scores is not None:
-        idf = _idf_scores.get(term_lower, 0.0)
-        if idf >= 3.0:
-            return 1.3
-        elif idf >= 2.0:
-            return 1.0
 
-    # Default low weight for unrecognized terms
-    return 0.3
+_snapshot: Optional[KeywordSnapshot] = None
+_snapshot_lock = threading.Lock()
 
 
-def extract_technical_keywords(text: str, max_keywords: int = 20) -> list[dict]:
+def get_keyword_snapshot() -> KeywordSnapshot:
+    """
+    Get the current keyword snapshot (lock-free).
+
+    Blocks on the first call until the tech terms are loaded. Callers that
+    classify several terms should take the snapshot once and pass it on.
+    A TF-IDF snapshot saved by another server worker is picked up within
+    TFIDF_RELOAD_INTERVAL seconds.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        load_tech_terms()
+        snapshot = _snapshot or publish_keyword_snapshot()
+    elif 0 <= TFIDF_RELOAD_INTERVAL <= time.monotonic() - _tfidf_checked_at:
+        snapshot = _reload_saved_tfidf_index() or snapshot
+    return snapshot
+
+
+def publish_keyword_snapshot() -> Optional[KeywordSnapshot]:
+    """
+    Build a snapshot from the loaded tech terms and the TF-IDF index and
+    swap it in with a single assignment.
+
+    Publishers are serialized and each reads the sources when it runs, so
+    the last snapshot published always reflects the latest state. Readers
+    holding an older snapshot keep using it.
+
+    Returns:
+        The published snapshot, or None if the tech terms are not loaded yet
+    """
+    global _snapshot
+
+    with _snapshot_lock:
+        tech_terms = _tech_terms
+        if tech_terms is None:
+            return None
+        idf_version = _idf_index.version
+        idf_scores = _idf_index.idf_scores()
+        snapshot = KeywordSnapshot(tech_terms, idf_scores, idf_version, previous=_snapshot)
+        _snapshot = snapshot
+    return snapshot
+
+
+def get_term_table() -> TermTable:
+    """Get the classification table of the current keyword snapshot."""
+    return get_keyword_snapshot().table
+
+
+def get_term_matcher() -> TermMatcher:
+    """Get the term matcher of the current keyword snapshot."""
+    return get_keyword_snapshot().matcher
+
+
+def scan_technical_terms(text: str, snapshot: Optional[KeywordSnapshot] = None) -> list[dict]:
+    """
+    Find all candidate terms in a text with their positions and weights.
+
+    Args:
+        text: Text to scan
+        snapshot: Keyword snapshot to use (default: the current one)
+
+    Returns:
+        List of match dicts (see TermMatcher.scan)
+    """
+    if not text:
+        return []
+    snapshot = snapshot or get_keyword_snapshot()
+    return snapshot.matcher.scan(text, snapshot.table)
+
+
+def extract_technical_keywords(
+    text: str,
+    max_keywords: int = 20,
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> list[dict]:
     """
     Extract keywords from text with their technical classification.
 
+    Spellings of the same term ("JS", "JavaScript", "javascript") are
+    extracted once, as first written.
+
     Args:
         text: Text to extract keywords from
         max_keywords: Maximum keywords to return
+        snapshot: Keyword snapshot to use (default: the current one)
 
     Returns:
-        List of dicts with 'keyword', 'is_technical', 'weight'
+        List of dicts with 'keyword', 'canonical', 'is_technical', 'weight'
     """
     if not text:
         return []
 
-    # Pattern for potential keywords
-    patterns = [
-        # Tech terms with special chars (C++, C#, .NET, Node.js)
-        r'\b([A-Za-z][A-Za-z0-9]*(?:[+#._-][A-Za-z0-9]+)*)\b',
+    snapshot = snapshot or get_keyword_snapshot()
+    terms = []
+    seen = set()
+    for kw, canonical in snapshot.matcher.unique_terms(text):
+        if len(kw) < 2 or canonical in seen:
+            continue
+        seen.add(canonical)
+        terms.append((kw, canonical))
+
+    # Skip very low weight terms
+    classes = snapshot.table.lookup_many(canonical for _, canonical in terms)
+    candidates = [
+        (kw, canonical, is_tech, weight)
+        for (kw, canonical), (is_tech, weight) in zip(terms, classes)
+        if weight >= 0.2
     ]
 
-    found = set()
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if len(match) >= 2:
-                found.add(match)
-
-    # Classify and weight
-    results = []
-    for kw in found:
-        is_tech = is_technical_term(kw)
-        weight = get_technical_weight(kw)
-
-        # Skip very low weight terms
-        if weight < 0.2:
-            continue
+    # Top N by weight descending (ties in text order); only those become dicts
+    return [
+        {"keyword": kw, "canonical": canonical, "is_technical": is_tech, "weight": weight}
+        for kw, canonical, is_tech, weight in heapq.nlargest(max_keywords, candidates, key=itemgetter(3))
+    ]
 
-        results.append({
-            "keyword": kw,
-            "is_technical": is_tech,
-            "weight": weight
-        })
 
-    # Sort by weight descending, then take top N
-    results.sort(key=lambda x: x["weight"], reverse=True)
-    return results[:max_keywords]
+def extract_technical_keywords_batch(
+    texts: list[str],
+    max_keywords: int = 20,
+    snapshot: Optional[KeywordSnapshot] = None,
+) -> list[list[dict]]:
+    """
+    Extract keywords from many texts against one keyword snapshot.
+
+    Batches of at least KEYWORD_PROCESS_MIN_BATCH texts are spread over
+    the keyword process pool (see keyword_pool), which scales with the
+    number of cores; smaller ones run in the calling thread.
 
+    Args:
+        texts: Texts to extract keywords from
+        max_keywords: Maximum keywords per text
+        snapshot: Keyword snapshot to use (default: the current one)
 
-# Initialize tech terms on module load (in background)
-def _init_tech_terms():
+    Returns:
+        One list per text, as returned by extract_technical_keywords
+    """
+    snapshot = snapshot or get_keyword_snapshot()
+    if len(texts) < KEYWORD_PROCESS_MIN_BATCH or keyword_pool.max_workers < 2:
+        return [extract_technical_keywords(text, max_keywords, snapshot) for text in texts]
+    return keyword_pool.extract(texts, max_keywords, snapshot)
+
+
+# Keyword worker processes (keyword_pool) receive a snapshot and skip this
+if os.environ.get("TECH_KEYWORDS_PRELOAD", "1") == "1":
+    # Load the vocabulary on module load: local files only, so readiness does not depend on the network
     try:
         load_tech_terms()
     except Exception as e:
         print(f"Error initializing tech terms: {e}")
 
-# Start loading in background thread
-_init_thread = threading.Thread(target=_init_tech_terms, daemon=True)
-_init_thread.start()
+    # Restore the TF-IDF index of the previous run (no re-tokenizing, fast enough to block)
+    try:
+        load_tfidf_index()
+    except Exception as e:
+        print(f"Error loading TF-IDF index: {e}")
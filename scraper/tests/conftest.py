@@ -7,3 +7,65 @@ from pathlib import Path
 # Add the scraper directory to the path so we can import modules
 scraper_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(scraper_dir))
+
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer with the call signature of a Hugging Face tokenizer."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return {"input_ids": [text.split() for text in texts]}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+class FakeModel:
+    """
+    Deterministic stand-in for the SentenceTransformer.
+    Embeds texts as hashed bag-of-words vectors so that texts sharing words
+    are similar, and records every encode call.
+    """
+
+    dim = 64
+    max_seq_length = 128
+
+    def __init__(self):
+        self.calls = []
+        self.tokenizer = FakeTokenizer()
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                bucket = int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim
+                vectors[i, bucket] += 1.0
+        return vectors
+
+    @property
+    def encoded_texts(self):
+        return [text for call in self.calls for text in call]
+
+
+@pytest.fixture
+def fake_model(monkeypatch, tmp_path):
+    """Replace the scoring model with a FakeModel, with an empty cache and store."""
+    import scoring
+    from embedding_store import EmbeddingStore
+
+    model = FakeModel()
+    monkeypatch.setattr(scoring, "_model", model)
+    monkeypatch.setattr(scoring, "_embedding_store", EmbeddingStore(tmp_path / "embeddings", scoring.encoder_fingerprint()))
+    scoring._embedding_cache.clear()
+    yield model
+    scoring._embedding_cache.clear()
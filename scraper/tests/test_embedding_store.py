@@ -0,0 +1,112 @@
+"""
+Tests for the memory-mapped on-disk embedding store.
+"""
+
+import numpy as np
+
+
+class TestEmbeddingStore:
+    """Tests for EmbeddingStore."""
+
+    def test_append_and_read_back(self, tmp_path):
+        """Appended vectors should be returned by key."""
+        from embedding_store import EmbeddingStore
+
+        store = EmbeddingStore(tmp_path, "model")
+        store.append(["a", "b"], np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+        a, missing, b = store.get_many(["a", "missing", "b"])
+
+        assert a.tolist() == [1.0, 2.0]
+        assert b.tolist() == [3.0, 4.0]
+        assert missing is None
+
+    def test_reads_are_views_into_the_mapped_file(self, tmp_path):
+        """Stored vectors should come from the memory map, not a copy."""
+        from embedding_store import EmbeddingStore
+
+        store = EmbeddingStore(tmp_path, "model")
+        store.append(["a"], np.ones((1, 4)))
+
+        vector = store.get_many(["a"])[0]
+
+        assert isinstance(vector.base, np.memmap) or isinstance(vector, np.memmap)
+        assert not vector.flags.writeable
+
+    def test_growth_keeps_existing_rows(self, tmp_path):
+        """Growing past the initial capacity should preserve all rows."""
+        from embedding_store import EmbeddingStore
+
+        store = EmbeddingStore(tmp_path, "model", initial_capacity=2)
+        for i in range(5):
+            store.append([str(i)], np.full((1, 3), float(i)))
+
+        vectors = store.get_many([str(i) for i in range(5)])
+
+        assert [v[0] for v in vectors] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert store.stats()["capacity"] >= 5
+
+    def test_other_instances_see_appended_rows(self, tmp_path):
+        """A second reader (e.g. another worker) should pick up new rows, even after growth."""
+        from embedding_store import EmbeddingStore
+
+        writer = EmbeddingStore(tmp_path, "model", initial_capacity=1)
+        reader = EmbeddingStore(tmp_path, "model", initial_capacity=1)
+
+        writer.append(["a"], np.array([[1.0, 0.0]]))
+        assert reader.get_many(["a"])[0].tolist() == [1.0, 0.0]
+
+        writer.append(["b", "c"], np.array([[0.0, 1.0], [1.0, 1.0]]))
+        assert reader.get_many(["c"])[0].tolist() == [1.0, 1.0]
+
+    def test_existing_keys_are_not_duplicated(self, tmp_path):
+        """Appending a stored key again should not add a row."""
+        from embedding_store import EmbeddingStore
+
+        store = EmbeddingStore(tmp_path, "model")
+        store.append(["a"], np.ones((1, 2)))
+        store.append(["a", "a"], np.zeros((2, 2)))
+
+        assert store.stats()["rows"] == 1
+        assert store.get_many(["a"])[0].tolist() == [1.0, 1.0]
+
+    def test_store_from_other_model_is_discarded(self, tmp_path):
+        """Embeddings written by another model must not be served."""
+        from embedding_store import EmbeddingStore
+
+        EmbeddingStore(tmp_path, "model-a").append(["a"], np.ones((1, 2)))
+
+        assert EmbeddingStore(tmp_path, "model-b").get_many(["a"]) == [None]
+
+    def test_other_processes_forget_discarded_rows(self, tmp_path):
+        """A store discarded by another process should not serve the rows read before."""
+        from embedding_store import EmbeddingStore
+
+        EmbeddingStore(tmp_path, "model-a").append(["a"], np.ones((1, 2)))
+        reader = EmbeddingStore(tmp_path, "model-a")
+        assert reader.get_many(["a"])[0].tolist() == [1.0, 1.0]
+
+        EmbeddingStore(tmp_path, "model-b").append(["b"], np.zeros((1, 2)))
+        assert reader.get_many(["a"]) == [None]
+
+        EmbeddingStore(tmp_path, "model-a").append(["c"], np.full((1, 2), 2.0))
+        assert reader.get_many(["a", "c"])[0] is None
+        assert reader.get_many(["c"])[0].tolist() == [2.0, 2.0]
+
+
+class TestEmbeddingStoreScoring:
+    """Tests for using the store from batch scoring."""
+
+    def test_stored_job_embeddings_skip_the_model(self, fake_model):
+        """After a restart (empty LRU cache) only missing jobs should be encoded."""
+        import scoring
+
+        jobs = [{"id": "1", "text": "Python developer"}, {"id": "2", "text": "Java developer"}]
+        first = scoring.calculate_batch_scores("Python engineer", jobs)
+
+        scoring._embedding_cache.clear()
+        fake_model.calls.clear()
+        second = scoring.calculate_batch_scores("Python engineer", jobs + [{"id": "3", "text": "Go developer"}])
+
+        assert second[:2] == first
+        assert fake_model.encoded_texts == ["Python engineer", "Go developer"]
@@ -0,0 +1,94 @@
+"""
+Tests for the bounded executors used by the API handlers.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TestBoundedExecutor:
+    """Tests for BoundedExecutor."""
+
+    def test_blocking_work_does_not_block_event_loop(self):
+        """Other coroutines should run while blocking work is in progress."""
+        from executors import BoundedExecutor
+
+        executor = BoundedExecutor("test", max_workers=1)
+        order = []
+
+        async def slow():
+            await executor.run(time.sleep, 0.2)
+            order.append("slow")
+
+        async def fast():
+            await asyncio.sleep(0.01)
+            order.append("fast")
+
+        async def main():
+            await asyncio.gather(slow(), fast())
+
+        asyncio.run(main())
+
+        assert order == ["fast", "slow"]
+
+    def test_concurrency_is_limited_to_max_workers(self):
+        """No more than max_workers calls should run at the same time."""
+        from executors import BoundedExecutor
+
+        executor = BoundedExecutor("test", max_workers=2)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+        asyncio.run(main())
+
+        assert peak[0] == 2
+        assert executor.stats()["completed"] == 6
+        assert executor.stats()["active"] == 0
+
+    def test_exceptions_propagate_to_caller(self):
+        """Errors raised in the worker should be raised by run()."""
+        import pytest
+        from executors import BoundedExecutor
+
+        executor = BoundedExecutor("test", max_workers=1)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(executor.run(fail))
+
+    def test_cancelled_calls_leave_the_queue(self):
+        """A call cancelled before it starts should never run nor stay queued."""
+        from executors import BoundedExecutor
+
+        executor = BoundedExecutor("test", max_workers=1)
+        ran = []
+
+        async def main():
+            blocker = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+            with_timeout = asyncio.wait_for(executor.run(ran.append, "queued"), 0.05)
+            try:
+                await with_timeout
+            except asyncio.TimeoutError:
+                pass
+            await blocker
+
+        asyncio.run(main())
+
+        assert ran == []
+        assert executor.stats()["queued"] == 0
+        assert executor.stats()["active"] == 0
@@ -0,0 +1,360 @@
+"""
+Tests for the incremental TF-IDF document-frequency index.
+"""
+
+import json
+import random
+
+import pytest
+
+WORDS = ["python", "django", "node.js", "c++", "react", "team", "the", "kafka", "go", "a", "rust", "scala"]
+
+
+def random_corpus(rng, size):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) for _ in range(size)]
+
+
+def vectorizer_idf(texts, **kwargs):
+    """IDF scores as fitted by the TfidfVectorizer the index replaces."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(
+        lowercase=True,
+        token_pattern=r'\b[a-zA-Z][a-zA-Z0-9+#._-]*[a-zA-Z0-9]\b|\b[a-zA-Z]\b',
+        min_df=1,
+        max_df=0.95,
+        **kwargs,
+    )
+    vectorizer.fit(texts)
+    return dict(zip(vectorizer.get_feature_names_out(), vectorizer.idf_))
+
+
+class TestIdfIndex:
+    """Tests for IdfIndex."""
+
+    def test_matches_tfidf_vectorizer(self):
+        """IDF scores should equal those of a TfidfVectorizer fitted on the same corpus."""
+        from idf_index import IdfIndex
+
+        rng = random.Random(0)
+        for _ in range(20):
+            texts = random_corpus(rng, rng.randint(2, 30))
+            index = IdfIndex()
+            index.add_documents(texts)
+
+            expected = vectorizer_idf(texts)
+            actual = index.idf_scores()
+            assert actual.keys() == expected.keys()
+            for term, idf in expected.items():
+                assert actual[term] == pytest.approx(idf, rel=1e-12)
+
+    def test_max_features_keeps_most_frequent_terms(self):
+        """Only the most frequent terms should be kept past max_features."""
+        from idf_index import IdfIndex
+
+        texts = ["python python python django", "python react react", "kafka", "rust", "go"]
+        index = IdfIndex(max_features=2)
+        index.add_documents(texts)
+
+        assert index.idf_scores().keys() == vectorizer_idf(texts, max_features=2).keys() == {"python", "react"}
+
+    def test_appending_batches_equals_one_build(self):
+        """Adding a corpus in batches should give the same IDF as adding it at once."""
+        from idf_index import IdfIndex
+
+        texts = random_corpus(random.Random(1), 40)
+        batched = IdfIndex()
+        for start in range(0, len(texts), 7):
+            batched.add_documents(texts[start:start + 7])
+        whole = IdfIndex()
+        whole.add_documents(texts)
+
+        assert batched.idf_scores() == whole.idf_scores()
+
+    def test_remove_documents_equals_rebuild_without_them(self):
+        """Removing documents by id should undo their counts exactly."""
+        from idf_index import IdfIndex
+
+        texts = random_corpus(random.Random(2), 30)
+        ids = [f"job-{i}" for i in range(len(texts))]
+        index = IdfIndex()
+        index.add_documents(texts, ids)
+
+        assert index.remove_documents(ids[:10] + ["unknown"]) == 10
+
+        rebuilt = IdfIndex()
+        rebuilt.add_documents(texts[10:], ids[10:])
+        assert index.idf_scores() == rebuilt.idf_scores()
+        assert index.stats()["terms"] == rebuilt.stats()["terms"]
+
+    def test_adding_existing_id_replaces_document(self):
+        """Re-adding an id should count the new text only."""
+        from idf_index import IdfIndex
+
+        index = IdfIndex()
+        index.add_documents(["python django", "react"], ["a", "b"])
+        index.add_documents(["kafka"], ["a"])
+
+        expected = IdfIndex()
+        expected.add_documents(["react", "kafka"], ["b", "a"])
+        assert len(index) == 2
+        assert index.idf_scores() == expected.idf_scores()
+
+    def test_idf_is_recomputed_lazily(self):
+        """The same dict should be returned until the corpus changes."""
+        from idf_index import IdfIndex
+
+        index = IdfIndex()
+        index.add_documents(["python django", "react", "kafka"], ["a", "b", "c"])
+        first = index.idf_scores()
+
+        assert index.idf_scores() is first
+        index.remove_documents(["c"])
+        assert index.idf_scores() is not first
+
+
+class TestIdfSnapshot:
+    """Tests for saving and loading the index."""
+
+    def test_round_trip(self, tmp_path):
+        """A loaded snapshot should have the same documents, IDF and version."""
+        from idf_index import IdfIndex
+
+        texts = random_corpus(random.Random(3), 25) + ["Zürich café c++"]
+        ids = [f"job-{i}" for i in range(len(texts))]
+        index = IdfIndex(tmp_path / "tfidf.npz")
+        index.add_documents(texts, ids)
+        index.save()
+
+        loaded = IdfIndex(tmp_path / "tfidf.npz")
+        assert loaded.load()
+        assert loaded.idf_scores() == index.idf_scores()
+        assert loaded.version == index.version
+        assert loaded.stats()["documents"] == len(texts)
+        assert loaded.stats()["age_seconds"] is not None
+
+    def test_loaded_documents_can_be_removed_and_resaved(self, tmp_path):
+        """Documents restored from a snapshot should still be removable by id."""
+        from idf_index import IdfIndex
+
+        texts = random_corpus(random.Random(4), 20)
+        ids = [f"job-{i}" for i in range(len(texts))]
+        index = IdfIndex(tmp_path / "tfidf.npz")
+        index.add_documents(texts, ids)
+        index.save()
+
+        loaded = IdfIndex(tmp_path / "tfidf.npz")
+        loaded.load()
+        assert loaded.remove_documents(ids[:5]) == 5
+        loaded.add_documents(["kafka streams"], ["new"])
+        loaded.save()
+        reloaded = IdfIndex(tmp_path / "tfidf.npz")
+        reloaded.load()
+
+        expected = IdfIndex()
+        expected.add_documents(texts[5:] + ["kafka streams"], ids[5:] + ["new"])
+        assert loaded.idf_scores() == reloaded.idf_scores() == expected.idf_scores()
+        assert reloaded.version == index.version + 2
+
+    def test_other_snapshot_format_is_ignored(self, tmp_path, monkeypatch):
+        """A snapshot written with a different layout should not be loaded."""
+        import idf_index
+        from idf_index import IdfIndex
+
+        index = IdfIndex(tmp_path / "tfidf.npz")
+        index.add_documents(["python"])
+        index.save()
+        monkeypatch.setattr(idf_index, "SNAPSHOT_FORMAT", 2)
+
+        assert not IdfIndex(tmp_path / "tfidf.npz").load()
+
+    def test_snapshot_saved_elsewhere_is_stale(self, tmp_path):
+        """An index should notice snapshots saved by another process, but not its own."""
+        from idf_index import IdfIndex
+
+        index = IdfIndex(tmp_path / "tfidf.npz")
+        other = IdfIndex(tmp_path / "tfidf.npz")
+        assert not index.is_stale()
+
+        index.add_documents(["python"])
+        index.save()
+        assert not index.is_stale()
+        assert other.is_stale()
+
+        other.load()
+        other.add_documents(["rust"])
+        other.save()
+        assert index.is_stale()
+        assert not other.is_stale()
+
+
+class TestTfidfWorkers:
+    """Tests for TF-IDF changes made by other server workers."""
+
+    def test_snapshot_saved_by_another_worker_is_published(self, monkeypatch, tmp_path):
+        """Keyword snapshots should pick up a TF-IDF snapshot saved by another worker."""
+        import tech_keywords
+        from idf_index import IdfIndex
+
+        monkeypatch.setattr(tech_keywords, "_idf_index", IdfIndex(tmp_path / "tfidf.npz"))
+        monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords._snapshot)
+        monkeypatch.setattr(tech_keywords, "TFIDF_RELOAD_INTERVAL", 0)
+        tech_keywords.build_tfidf_index([f"generic posting {i}" for i in range(16)])
+
+        other_worker = IdfIndex(tmp_path / "tfidf.npz")
+        other_worker.load()
+        other_worker.add_documents(["zorblax"], ["z"])
+        other_worker.save()
+
+        snapshot = tech_keywords.get_keyword_snapshot()
+        assert snapshot.idf_version == other_worker.version
+        assert tech_keywords.get_idf_score("zorblax") > 0
+
+    def test_changes_start_from_the_latest_saved_snapshot(self, monkeypatch, tmp_path):
+        """A corpus change should not overwrite documents saved by another worker."""
+        import tech_keywords
+        from idf_index import IdfIndex
+
+        monkeypatch.setattr(tech_keywords, "_idf_index", IdfIndex(tmp_path / "tfidf.npz"))
+        monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords._snapshot)
+        monkeypatch.setattr(tech_keywords, "TFIDF_RELOAD_INTERVAL", -1)
+        tech_keywords.build_tfidf_index(["python"], ["a"])
+
+        other_worker = IdfIndex(tmp_path / "tfidf.npz")
+        other_worker.load()
+        other_worker.add_documents(["rust"], ["b"])
+        other_worker.save()
+
+        assert tech_keywords.build_tfidf_index(["go"], ["c"], append=True) == 3
+        restarted = IdfIndex(tmp_path / "tfidf.npz")
+        restarted.load()
+        assert len(restarted) == 3
+        assert restarted.version == other_worker.version + 1
+
+
+class TestTfidfEndpoints:
+    """Tests for /build-tfidf append mode and /remove-tfidf."""
+
+    def test_append_and_remove(self, monkeypatch, tmp_path):
+        """Appending and removing documents should update the term table."""
+        import tech_keywords
+        from fastapi.testclient import TestClient
+        from idf_index import IdfIndex
+        from main import app
+
+        monkeypatch.setattr(tech_keywords, "_idf_index", IdfIndex(tmp_path / "tfidf.npz"))
+        monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords._snapshot)
+        client = TestClient(app)
+        filler = [f"generic posting {i}" for i in range(16)]
+
+        built = client.post("/build-tfidf", json={"job_descriptions": filler + ["zorblax"]})
+        assert built.status_code == 200
+        assert built.json()["total_documents"] == 17
+        assert tech_keywords.get_technical_weight("zorblax") == 1.3
+
+        appended = client.post("/build-tfidf", json={
+            "job_descriptions": ["zorblax quux", "", "zorblax"],
+            "ids": ["z1", "empty", "z2"],
+            "mode": "append",
+        })
+        assert appended.status_code == 200
+        assert appended.json()["total_documents"] == 19
+        assert tech_keywords.get_idf_score("zorblax") == pytest.approx(vectorizer_idf(
+            filler + ["zorblax", "zorblax quux", "zorblax"]
+        )["zorblax"])
+
+        removed = client.post("/remove-tfidf", json={"ids": ["z1", "z2", "missing"]})
+        assert removed.json() == {"success": True, "removed": 2, "total_documents": 17}
+        status = client.get("/tfidf-status").json()
+        assert status["tfidf_documents"] == 17
+        assert status["tfidf_snapshot"]["version"] == tech_keywords._idf_index.version
+        assert tech_keywords.get_idf_score("quux") == 0.0
+
+        # The saved snapshot is what a restarted worker loads
+        restarted = IdfIndex(tmp_path / "tfidf.npz")
+        assert restarted.load()
+        assert restarted.idf_scores() == tech_keywords.get_idf_scores()
+
+    def test_ids_must_align_with_descriptions(self):
+        """Mismatched ids should be rejected."""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        response = TestClient(app).post("/build-tfidf", json={"job_descriptions": ["a", "b"], "ids": ["1"]})
+
+        assert response.status_code == 422
+
+
+class TestTfidfUpload:
+    """Tests for streamed NDJSON / gzip uploads to /build-tfidf."""
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path):
+        import main
+        import tech_keywords
+        from fastapi.testclient import TestClient
+        from idf_index import IdfIndex
+
+        monkeypatch.setattr(tech_keywords, "_idf_index", IdfIndex(tmp_path / "tfidf.npz"))
+        monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords._snapshot)
+        monkeypatch.setattr(tech_keywords, "_last_upload", None)
+        monkeypatch.setattr(main, "TFIDF_UPLOAD_CHUNK_SIZE", 2)
+        return TestClient(main.app)
+
+    CORPUS = [f"generic posting {i}" for i in range(16)] + ["zorblax kafka", "quux"]
+
+    def ndjson(self):
+        lines = [json.dumps({"id": f"job-{i}", "description": text}) for i, text in enumerate(self.CORPUS)]
+        return ("\n".join(lines[:5] + ['""', ""] + lines[5:]) + "\n").encode()
+
+    def test_ndjson_upload_matches_json_build(self, client):
+        """A streamed corpus should give the same index as the JSON body, in chunks."""
+        import tech_keywords
+
+        response = client.post(
+            "/build-tfidf", content=self.ndjson(), headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total_documents"] == len(self.CORPUS)
+        upload = client.get("/tfidf-status").json()["tfidf_upload"]
+        assert upload["state"] == "done"
+        assert upload["documents"] == len(self.CORPUS)
+        assert upload["chunks"] == len(self.CORPUS) // 2
+        streamed = dict(tech_keywords.get_idf_scores())
+
+        client.post("/build-tfidf", json={"job_descriptions": self.CORPUS})
+        assert streamed == dict(tech_keywords.get_idf_scores())
+
+    def test_gzip_upload_in_append_mode(self, client):
+        """gzip uploads should be inflated incrementally and can append by id."""
+        import gzip
+
+        import tech_keywords
+
+        client.post("/build-tfidf", json={"job_descriptions": ["python"], "ids": ["old"]})
+        response = client.post(
+            "/build-tfidf?mode=append",
+            content=gzip.compress(self.ndjson()),
+            headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["mode"] == "append"
+        assert response.json()["total_documents"] == len(self.CORPUS) + 1
+        assert tech_keywords.remove_tfidf_documents(["job-16", "old"]) == 2
+
+    def test_bad_line_keeps_current_index(self, client):
+        """A failed replace upload should leave the current corpus in place."""
+        import tech_keywords
+
+        client.post("/build-tfidf", json={"job_descriptions": self.CORPUS})
+        version = tech_keywords.get_keyword_snapshot().version
+        body = self.ndjson() + b"{not json}\n"
+
+        response = client.post("/build-tfidf", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        assert response.status_code == 400
+        assert "Line 21" in response.json()["detail"]
+        assert tech_keywords.get_keyword_snapshot().version == version
+        assert client.get("/tfidf-status").json()["tfidf_upload"]["state"] == "failed"
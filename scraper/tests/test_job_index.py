@@ -0,0 +1,223 @@
+"""
+Tests for the dense job-embedding index.
+"""
+
+import numpy as np
+import pytest
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+class TestJobIndex:
+    """Tests for JobIndex."""
+
+    def test_exact_search_returns_most_similar_first(self):
+        """Exact search should rank by cosine similarity."""
+        from job_index import JobIndex
+
+        vectors = random_vectors(100)
+        index = JobIndex("model")
+        index.add([str(i) for i in range(100)], vectors)
+
+        results = index.search(vectors[42], top_k=5)
+
+        assert results[0][0] == "42"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+    def test_adding_existing_id_replaces_vector(self):
+        """Re-indexing a job should update it instead of duplicating it."""
+        from job_index import JobIndex
+
+        index = JobIndex("model")
+        index.add(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+        index.add(["a"], np.array([[0.0, 1.0]]))
+
+        assert len(index) == 2
+        assert {job_id for job_id, score in index.search(np.array([0.0, 1.0]), 2) if score > 0.99} == {"a", "b"}
+
+    def test_remove_drops_jobs(self):
+        """Removed jobs should no longer be returned."""
+        from job_index import JobIndex
+
+        index = JobIndex("model")
+        index.add(["a", "b", "c"], random_vectors(3))
+
+        assert index.remove(["b", "missing"]) == 1
+        assert {job_id for job_id, _ in index.search(random_vectors(1)[0], 10)} == {"a", "c"}
+
+    def test_ivf_search_finds_nearest_neighbours(self):
+        """IVF search on clustered data should agree with exact search."""
+        from job_index import JobIndex
+
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(20, 16))
+        vectors = (centers[rng.integers(0, 20, 2000)] + rng.normal(scale=0.05, size=(2000, 16))).astype(np.float32)
+        ids = [str(i) for i in range(2000)]
+
+        exact = JobIndex("model", ivf_threshold=10_000)
+        ivf = JobIndex("model", ivf_threshold=100, nprobe=4)
+        exact.add(ids, vectors)
+        ivf.add(ids, vectors)
+
+        assert ivf.stats()["search"] == "ivf"
+        hits = 0
+        for query in vectors[:20]:
+            expected = {job_id for job_id, _ in exact.search(query, 10)}
+            found = {job_id for job_id, _ in ivf.search(query, 10)}
+            hits += len(expected & found)
+        assert hits / 200 >= 0.9
+
+    def test_ivf_is_updated_without_reclustering(self):
+        """Small changes should extend the IVF lists instead of re-running k-means."""
+        from job_index import JobIndex
+
+        vectors = random_vectors(400)
+        index = JobIndex("model", ivf_threshold=100, nprobe=100)
+        index.add([str(i) for i in range(300)], vectors[:300])
+        index.search(vectors[0], 1)
+        centroids = index._ivf["centroids"]
+
+        index.add([str(i) for i in range(300, 320)], vectors[300:320])
+        index.remove(["0"])
+
+        assert index.search(vectors[310], 1)[0][0] == "310"
+        assert "0" not in {job_id for job_id, _ in index.search(vectors[0], 10)}
+        assert index._ivf["centroids"] is centroids
+
+        index.add([str(i) for i in range(320, 400)], vectors[320:400])
+        assert index.search(vectors[390], 1)[0][0] == "390"
+        assert index._ivf["centroids"] is not centroids
+
+    def test_changes_are_persisted_and_reloaded(self, tmp_path):
+        """Adds and removals should be on disk without an explicit save."""
+        from job_index import JobIndex
+
+        directory = tmp_path / "index"
+        vectors = random_vectors(10)
+        index = JobIndex("model", directory)
+        index.add([f"job-{i}" for i in range(10)], vectors)
+        index.remove(["job-5"])
+
+        reloaded = JobIndex("model", directory)
+        assert reloaded.load()
+        assert len(reloaded) == 9
+        assert reloaded.search(vectors[3], 1)[0][0] == "job-3"
+        assert "job-5" not in {job_id for job_id, _ in reloaded.search(vectors[5], 10)}
+
+    def test_index_from_other_model_is_ignored(self, tmp_path):
+        """Embeddings from another model must not be reused."""
+        from job_index import JobIndex
+
+        directory = tmp_path / "index"
+        index = JobIndex("model-a", directory)
+        index.add(["a"], random_vectors(1))
+
+        other = JobIndex("model-b", directory)
+        assert not other.load()
+        assert len(other) == 0
+        other.add(["b"], random_vectors(1))
+        assert len(JobIndex("model-b", directory)) == 1
+
+    def test_adds_reuse_preallocated_capacity(self, tmp_path):
+        """Small adds should append into spare rows instead of growing the matrix."""
+        from job_index import JobIndex
+
+        index = JobIndex("model", tmp_path / "index", initial_capacity=8)
+        for i in range(6):
+            index.add([f"job-{i}"], random_vectors(1, seed=i))
+        assert index.stats()["capacity"] == 8
+
+        index.add(["job-6", "job-7", "job-8"], random_vectors(3))
+        stats = index.stats()
+        assert stats["capacity"] == 16
+        assert stats["jobs"] == 9
+
+    def test_other_processes_see_changes(self, tmp_path):
+        """Indexes sharing a directory should read each other's changes before searching."""
+        from job_index import JobIndex
+
+        directory = tmp_path / "index"
+        vectors = random_vectors(4)
+        writer = JobIndex("model", directory)
+        reader = JobIndex("model", directory)
+        writer.add(["a", "b"], vectors[:2])
+        assert reader.search(vectors[1], 1)[0][0] == "b"
+
+        writer.add(["c"], vectors[2:3])
+        writer.remove(["b"])
+        assert {job_id for job_id, _ in reader.search(vectors[1], 10)} == {"a", "c"}
+
+    def test_dead_rows_are_compacted(self, tmp_path, monkeypatch):
+        """Replaced and removed rows should be dropped once they outnumber live ones."""
+        import job_index
+        from job_index import JobIndex
+
+        monkeypatch.setattr(job_index, "JOB_INDEX_COMPACT_MIN", 3)
+        directory = tmp_path / "index"
+        vectors = random_vectors(6)
+        index = JobIndex("model", directory)
+        reader = JobIndex("model", directory)
+        index.add(["a", "b", "c"], vectors[:3])
+        reader.search(vectors[0], 1)
+
+        index.add(["a", "b"], vectors[3:5])
+        index.remove(["c"])
+        index.add(["d"], vectors[5:6])
+
+        stats = index.stats()
+        assert stats["jobs"] == 3
+        assert stats["rows"] == 3
+        assert sorted(path.name for path in directory.glob("vectors-*.npy")) == ["vectors-1.npy"]
+        assert reader.search(vectors[3], 1)[0][0] == "a"
+        assert {job_id for job_id, _ in reader.search(vectors[0], 10)} == {"a", "b", "d"}
+
+    def test_concurrent_writers_do_not_lose_jobs(self, tmp_path):
+        """Writers sharing a directory should serialize through the file lock."""
+        from concurrent.futures import ThreadPoolExecutor
+        from job_index import JobIndex
+
+        directory = tmp_path / "index"
+        writers = [JobIndex("model", directory, initial_capacity=4) for _ in range(4)]
+
+        def add(n):
+            writers[n % 4].add([f"job-{n}"], random_vectors(1, seed=n))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(add, range(40)))
+
+        assert len(JobIndex("model", directory)) == 40
+
+
+class TestMatchEndpoint:
+    """Tests for /jobs/index and /match."""
+
+    def test_match_returns_top_jobs(self, fake_model, monkeypatch, tmp_path):
+        """Indexed jobs should be ranked against the CV."""
+        import job_index
+        from fastapi.testclient import TestClient
+        from main import app
+
+        monkeypatch.setattr(job_index, "_job_index", job_index.JobIndex("test", tmp_path / "index"))
+        client = TestClient(app)
+
+        indexed = client.post("/jobs/index", json={"jobs": [
+            {"id": "py", "title": "Python Django developer", "company": "A", "description": "Python Django"},
+            {"id": "chef", "title": "Pastry chef", "company": "B", "description": "Croissants"},
+            {"id": "js", "title": "React developer", "company": "C", "description": "TypeScript"},
+        ]})
+        assert indexed.status_code == 200
+        assert indexed.json()["total"] == 3
+
+        response = client.post("/match", json={
+            "cv_data": {"profile": {"title": "Python Django developer"}, "experiences": [], "skills": []},
+            "top_k": 2,
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_indexed"] == 3
+        assert len(data["results"]) == 2
+        assert data["results"][0]["id"] == "py"
@@ -0,0 +1,51 @@
+"""
+Tests for pre-fork loading and per-worker memory reporting.
+"""
+
+import gc
+
+
+class TestPrefork:
+    """Tests for the prefork module."""
+
+    def test_preload_loads_model_and_freezes_gc(self, fake_model, monkeypatch):
+        """Preloading should load shared state and freeze the collector."""
+        import prefork
+        import scoring
+
+        monkeypatch.setattr(scoring, "INFERENCE_BACKEND", "torch")
+        try:
+            status = prefork.preload_shared_state()
+            assert status["preloaded"] is True
+            assert status["error"] is None
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+    def test_read_memory_usage_parses_smaps_rollup(self, tmp_path):
+        """Rss, Pss, shared and private sizes should be reported in MB."""
+        from prefork import read_memory_usage
+
+        rollup = tmp_path / "smaps_rollup"
+        rollup.write_text(
+            "00400000-7ffc00000000 ---p 00000000 00:00 0    [rollup]\n"
+            "Rss:              204800 kB\n"
+            "Pss:              102400 kB\n"
+            "Shared_Clean:     153600 kB\n"
+            "Shared_Dirty:          0 kB\n"
+            "Private_Clean:     10240 kB\n"
+            "Private_Dirty:     40960 kB\n"
+        )
+
+        assert read_memory_usage(rollup) == {
+            "rss_mb": 200.0,
+            "pss_mb": 100.0,
+            "shared_mb": 150.0,
+            "private_mb": 50.0,
+        }
+
+    def test_read_memory_usage_without_proc(self, tmp_path):
+        """Platforms without /proc should report no usage instead of failing."""
+        from prefork import read_memory_usage
+
+        assert read_memory_usage(tmp_path / "missing") is None
@@ -265,3 +265,652 @@ class TestScoringEndpoints:
         data = response.json()
         assert "results" in data
         assert len(data["results"]) == 2
+
+
+class TestEmbeddingCache:
+    """Tests for the content-addressed embedding cache."""
+
+    def test_repeated_texts_are_encoded_once(self, fake_model):
+        """Only cache misses should reach the model."""
+        from scoring import calculate_batch_scores, calculate_score
+
+        cv_text = "Python developer with Django experience"
+        jobs = [
+            {"id": "1", "text": "Python Django developer needed"},
+            {"id": "2", "text": "React frontend developer position"},
+        ]
+
+        first = calculate_batch_scores(cv_text, jobs)
+        second = calculate_batch_scores(cv_text, jobs)
+        calculate_score(cv_text, "Python Django developer needed")
+
+        assert first == second
+        assert len(fake_model.encoded_texts) == 3
+
+    def test_duplicate_texts_in_one_call_are_encoded_once(self, fake_model):
+        """Identical texts within a request should share one encode."""
+        from scoring import encode_texts
+
+        embeddings = encode_texts(["same text", "same text", "other text"])
+
+        assert embeddings.shape == (3, fake_model.dim)
+        assert fake_model.encoded_texts == ["same text", "other text"]
+
+    def test_lru_eviction_respects_entry_limit(self):
+        """Least recently used entries should be evicted first."""
+        import numpy as np
+        from scoring import EmbeddingCache
+
+        cache = EmbeddingCache(max_entries=2, max_bytes=1024 * 1024)
+        cache.put("a", np.ones(4))
+        cache.put("b", np.ones(4))
+        cache.get_many(["a"])
+        cache.put("c", np.ones(4))
+
+        found = cache.get_many(["a", "b", "c"])
+
+        assert found[0] is not None
+        assert found[1] is None
+        assert found[2] is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_limit_bounds_cache_size(self):
+        """Total stored bytes should never exceed the byte limit."""
+        import numpy as np
+        from scoring import EmbeddingCache
+
+        cache = EmbeddingCache(max_entries=100, max_bytes=40)
+        for i in range(5):
+            cache.put(str(i), np.ones(4))  # 16 bytes as float32
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 40
+        assert stats["entries"] == 2
+
+    def test_key_depends_on_model_name(self):
+        """The same text embedded by another model must not collide."""
+        from scoring import EmbeddingCache
+
+        assert EmbeddingCache.make_key("text", "model-a") != EmbeddingCache.make_key("text", "model-b")
+
+    def test_encoder_fingerprint_covers_backend_and_packing(self, fake_model, monkeypatch):
+        """Vectors from another backend or packing setting must not be reused."""
+        import scoring
+
+        monkeypatch.setattr(scoring, "_active_backend", "torch")
+        torch_fingerprint = scoring.encoder_fingerprint()
+        monkeypatch.setattr(scoring, "_active_backend", "onnx-int8")
+        int8_fingerprint = scoring.encoder_fingerprint()
+        monkeypatch.setattr(scoring, "TEXT_PACKING_ENABLED", False)
+        truncated_fingerprint = scoring.encoder_fingerprint()
+
+        assert len({torch_fingerprint, int8_fingerprint, truncated_fingerprint}) == 3
+        assert scoring.MODEL_NAME in torch_fingerprint
+        assert scoring.ONNX_QUANTIZATION_CONFIG in int8_fingerprint
+
+    def test_model_status_reports_cache_counters(self, fake_model):
+        """Model status should expose hit/miss counters."""
+        from scoring import encode_texts, get_model_status
+
+        encode_texts(["a text"])
+        encode_texts(["a text"])
+
+        cache_stats = get_model_status()["embedding_cache"]
+        assert cache_stats["hits"] == 1
+        assert cache_stats["misses"] == 1
+
+
+class TestCVSessions:
+    """Tests for registered CV sessions."""
+
+    CV_DATA = {
+        "profile": {"title": "Python Developer", "summary": "Backend engineer"},
+        "experiences": [
+            {"title": "Developer", "company": "TechCorp", "description": "Built Django APIs"},
+            {"title": "Intern", "company": "DataCo", "description": "Wrote SQL reports"},
+        ],
+        "skills": [{"name": "Python", "category": "technical"}],
+    }
+
+    JOB = {"id": "1", "title": "Django Developer", "company": "WebCo", "description": "Python and Django APIs"}
+
+    @pytest.fixture
+    def client(self, fake_model):
+        from fastapi.testclient import TestClient
+        from main import app
+        return TestClient(app)
+
+    def test_store_expires_sessions(self, monkeypatch):
+        """Sessions should disappear after their TTL."""
+        import cv_sessions as module
+
+        store = module.CVSessionStore(ttl=10, max_sessions=10)
+        now = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+
+        cv_id = store.register({"cv_text": "x"})
+        now[0] += 5
+        assert store.get(cv_id) is not None
+        now[0] += 11
+        assert store.get(cv_id) is None
+
+    def test_store_evicts_least_recently_used(self):
+        """The oldest unused session should be dropped when the store is full."""
+        from cv_sessions import CVSessionStore
+
+        store = CVSessionStore(ttl=60, max_sessions=2)
+        first = store.register({"cv_text": "a"})
+        second = store.register({"cv_text": "b"})
+        store.get(first)
+        store.register({"cv_text": "c"})
+
+        assert store.get(first) is not None
+        assert store.get(second) is None
+
+    def test_file_store_shares_sessions_between_workers(self, tmp_path):
+        """A cv_id registered by one worker should be usable and removable by another."""
+        from cv_sessions import CVSessionFileStore
+
+        first = CVSessionFileStore(tmp_path, ttl=60, max_sessions=10)
+        second = CVSessionFileStore(tmp_path, ttl=60, max_sessions=10)
+        cv_id = first.register({"cv_text": "x"})
+
+        assert second.get(cv_id) == {"cv_text": "x"}
+        assert second.remove(cv_id)
+        assert first.get(cv_id) is None
+        assert first.get("../../etc/passwd") is None
+
+    def test_file_store_expires_and_evicts_sessions(self, tmp_path):
+        """Expiry and eviction should follow the last use recorded in the files."""
+        import os
+        import time
+        from cv_sessions import CVSessionFileStore
+
+        store = CVSessionFileStore(tmp_path, ttl=60, max_sessions=2)
+        first = store.register({"cv_text": "a"})
+        second = store.register({"cv_text": "b"})
+        now = time.time()
+        os.utime(tmp_path / f"{first}.pkl", (now - 30, now - 30))
+        os.utime(tmp_path / f"{second}.pkl", (now - 20, now - 20))
+        store.get(first)
+        store.register({"cv_text": "c"})
+
+        assert store.get(second) is None
+        assert store.get(first) is not None
+        os.utime(tmp_path / f"{first}.pkl", (now - 61, now - 61))
+        assert store.get(first) is None
+        assert store.stats()["sessions"] == 1
+
+    def test_detailed_score_by_cv_id_matches_cv_data(self, client, fake_model):
+        """Scoring a registered CV should give the same result as sending it."""
+        registered = client.post("/cv", json=self.CV_DATA)
+        assert registered.status_code == 200
+        cv_id = registered.json()["cv_id"]
+
+        by_id = client.post("/score-detailed", json={"cv_id": cv_id, "job": self.JOB})
+        by_data = client.post("/score-detailed", json={"cv_data": self.CV_DATA, "job": self.JOB})
+
+        assert by_id.status_code == 200
+        assert by_id.json() == by_data.json()
+
+    def test_cv_is_not_reencoded_when_scoring_by_id(self, client, fake_model):
+        """Only the job text should be encoded for a registered CV."""
+        cv_id = client.post("/cv", json=self.CV_DATA).json()["cv_id"]
+        fake_model.calls.clear()
+
+        client.post("/score", json={"cv_id": cv_id, "job": self.JOB})
+        client.post("/score-batch", json={"cv_id": cv_id, "jobs": [self.JOB]})
+
+        assert len(fake_model.encoded_texts) == 1
+        assert fake_model.encoded_texts[0].startswith("Position: Django Developer")
+
+    def test_unknown_cv_id_returns_404(self, client):
+        """Scoring with an unknown cv_id should fail clearly."""
+        response = client.post("/score", json={"cv_id": "missing", "job": self.JOB})
+        assert response.status_code == 404
+
+    def test_cv_id_and_cv_data_are_mutually_exclusive(self, client):
+        """Exactly one of cv_id and cv_data must be provided."""
+        both = client.post("/score", json={"cv_id": "x", "cv_data": self.CV_DATA, "job": self.JOB})
+        neither = client.post("/score", json={"job": self.JOB})
+
+        assert both.status_code == 422
+        assert neither.status_code == 422
+
+
+class TestEncodeScheduler:
+    """Tests for the micro-batching encode scheduler."""
+
+    def test_concurrent_calls_share_one_batch(self):
+        """Texts submitted within the window should be encoded together."""
+        import threading
+        import numpy as np
+        from scoring import EncodeScheduler
+
+        calls = []
+
+        def encode(texts):
+            calls.append(list(texts))
+            return np.array([[float(len(t))] for t in texts])
+
+        scheduler = EncodeScheduler(encode, window_ms=200, max_batch_size=64)
+        results = {}
+
+        def worker(text):
+            results[text] = scheduler.encode([text])
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in ["a", "bb", "ccc", "dddd"]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert sorted(calls[0]) == ["a", "bb", "ccc", "dddd"]
+        assert all(results[text][0, 0] == len(text) for text in results)
+        assert scheduler.stats()["max_batch_size_seen"] == 4
+
+    def test_batches_are_capped_at_max_size(self):
+        """No single encode call should exceed max_batch_size texts from separate requests."""
+        import threading
+        import numpy as np
+        from scoring import EncodeScheduler
+
+        calls = []
+
+        def encode(texts):
+            calls.append(list(texts))
+            return np.zeros((len(texts), 2))
+
+        scheduler = EncodeScheduler(encode, window_ms=100, max_batch_size=2)
+        threads = [threading.Thread(target=scheduler.encode, args=([str(i)],)) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(len(c) for c in calls) == 5
+        assert all(len(c) <= 2 for c in calls)
+
+    def test_errors_are_raised_in_every_caller(self):
+        """A failing encode should propagate to the callers of that batch."""
+        from scoring import EncodeScheduler
+
+        def encode(texts):
+            raise RuntimeError("model failure")
+
+        scheduler = EncodeScheduler(encode, window_ms=1, max_batch_size=8)
+
+        with pytest.raises(RuntimeError, match="model failure"):
+            scheduler.encode(["text"])
+
+    def test_model_status_reports_scheduler_stats(self, fake_model):
+        """Scheduler statistics should be exposed with the model status."""
+        from scoring import encode_texts, get_model_status
+
+        encode_texts(["one text", "another text"])
+
+        stats = get_model_status()["encode_scheduler"]
+        assert stats["batches"] >= 1
+        assert stats["queued_texts"] == 0
+
+
+class TestInferenceBackend:
+    """Tests for inference backend selection."""
+
+    def test_unknown_backend_is_rejected(self):
+        """An unsupported backend name should raise a clear error."""
+        from scoring import _load_model
+
+        with pytest.raises(ValueError, match="Unknown inference backend"):
+            _load_model("tensorrt")
+
+    def test_falls_back_to_torch_when_onnx_unavailable(self, monkeypatch):
+        """A failing ONNX load should fall back to torch and be reported."""
+        import scoring
+
+        loaded = []
+
+        def fake_load(backend):
+            loaded.append(backend)
+            if backend != "torch":
+                raise ImportError("optimum is not installed")
+            return MagicMock()
+
+        monkeypatch.setattr(scoring, "_model", None)
+        monkeypatch.setattr(scoring, "_active_backend", None)
+        monkeypatch.setattr(scoring, "_backend_error", None)
+        monkeypatch.setattr(scoring, "INFERENCE_BACKEND", "onnx-int8")
+        monkeypatch.setattr(scoring, "_load_model", fake_load)
+
+        scoring.get_model()
+        status = scoring.get_model_status()
+
+        assert loaded == ["onnx-int8", "torch"]
+        assert status["requested_backend"] == "onnx-int8"
+        assert status["backend"] == "torch"
+        assert "optimum" in status["backend_error"]
+
+
+class TestSimilarityKernel:
+    """Tests for the vectorized similarity kernel."""
+
+    def test_matches_per_row_cosine_similarity(self):
+        """Vectorized scores should equal per-row cosine similarity."""
+        import numpy as np
+        from scoring import similarity_scores
+
+        rng = np.random.default_rng(0)
+        query = rng.random(16, dtype=np.float32)
+        matrix = rng.random((50, 16), dtype=np.float32)
+
+        scores = similarity_scores(query, matrix)
+
+        for row, score in zip(matrix, scores):
+            cosine = float(np.dot(query, row) / (np.linalg.norm(query) * np.linalg.norm(row)))
+            assert score == round(max(0, min(100, cosine * 100)), 1)
+
+    def test_clips_and_masks(self):
+        """Negative similarities clip to 0 and masked rows score 0."""
+        import numpy as np
+        from scoring import similarity_scores
+
+        query = np.array([1.0, 0.0])
+        matrix = np.array([[1.0, 0.0], [-1.0, 0.0], [1.0, 0.0], [0.0, 0.0]])
+        mask = np.array([True, True, False, True])
+
+        scores = similarity_scores(query, matrix, mask)
+
+        assert scores.tolist() == [100.0, 0.0, 0.0, 0.0]
+
+    def test_batch_scores_zero_for_empty_job_text(self, fake_model):
+        """Jobs without text should score 0 in batch scoring."""
+        from scoring import calculate_batch_scores
+
+        results = calculate_batch_scores("Python developer", [
+            {"id": "1", "text": "Python developer"},
+            {"id": "2", "text": ""},
+        ])
+
+        assert results == [{"id": "1", "score": 100.0}, {"id": "2", "score": 0.0}]
+
+
+class TestDetailedBatchScoring:
+    """Tests for batch detailed scoring."""
+
+    CV_DATA = {
+        "profile": {"title": "Python Developer"},
+        "experiences": [
+            {"title": "Backend Developer", "company": "Acme", "description": "Django services on AWS"},
+            {"title": "Data Analyst", "company": "DataCo", "description": "SQL and pandas reports"},
+        ],
+        "skills": [{"name": "Python"}, {"name": "Docker"}],
+    }
+
+    JOBS = [
+        {"id": "a", "title": "Django Engineer", "company": "Web", "description": "Python Django Docker"},
+        {"id": "b", "title": "Data Scientist", "company": "Lab", "description": "pandas numpy SQL"},
+        {"id": "c", "title": "Chef", "company": "Bistro", "description": None},
+    ]
+
+    def test_batch_matches_single_job_results(self, fake_model):
+        """Each batch result should equal the single-job detailed score."""
+        from scoring import calculate_detailed_score, calculate_detailed_scores_batch
+
+        batch = calculate_detailed_scores_batch(self.CV_DATA, self.JOBS)
+        single = [calculate_detailed_score(self.CV_DATA, job) for job in self.JOBS]
+
+        assert batch == single
+
+    def test_every_text_is_encoded_once(self, fake_model):
+        """The CV, each experience and each job should be encoded exactly once."""
+        from scoring import calculate_detailed_scores_batch
+
+        calculate_detailed_scores_batch(self.CV_DATA, self.JOBS)
+
+        encoded = fake_model.encoded_texts
+        assert len(encoded) == 1 + len(self.CV_DATA["experiences"]) + len(self.JOBS)
+        assert len(set(encoded)) == len(encoded)
+
+    def test_endpoint_returns_result_per_job(self, fake_model):
+        """The batch endpoint should return one detailed result per job, with ids."""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        client = TestClient(app)
+        response = client.post("/score-detailed-batch", json={"cv_data": self.CV_DATA, "jobs": self.JOBS})
+        single = client.post("/score-detailed", json={"cv_data": self.CV_DATA, "job": self.JOBS[1]})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["id"] for r in results] == ["a", "b", "c"]
+        assert {k: v for k, v in results[1].items() if k != "id"} == single.json()
+
+    def test_stream_ndjson_matches_batch_results(self, fake_model):
+        """The stream should emit every batch result once, then a done event."""
+        import json
+        from fastapi.testclient import TestClient
+        from main import app
+
+        client = TestClient(app)
+        batch = client.post("/score-detailed-batch", json={"cv_data": self.CV_DATA, "jobs": self.JOBS})
+        response = client.post(
+            "/score-detailed-stream",
+            json={"cv_data": self.CV_DATA, "jobs": self.JOBS, "batch_size": 2},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        index_version = batch.json()["results"][0]["indexVersion"]
+        assert events[-1] == {
+            "type": "done", "total": 3, "completed": 3, "failed": 0, "indexVersion": index_version
+        }
+
+        scores = sorted(events[:-1], key=lambda event: event["index"])
+        assert [event["index"] for event in scores] == [0, 1, 2]
+        for event, expected in zip(scores, batch.json()["results"]):
+            assert event["status"] == "completed"
+            assert {k: v for k, v in event.items() if k not in ("type", "index", "status")} == expected
+
+    def test_stream_sse_format_and_unknown_cv(self, fake_model):
+        """SSE streams should use named events; unknown cv_ids fail before streaming."""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        client = TestClient(app)
+        response = client.post(
+            "/score-detailed-stream",
+            json={"cv_data": self.CV_DATA, "jobs": self.JOBS[:1], "format": "sse"},
+        )
+        missing = client.post("/score-detailed-stream", json={"cv_id": "missing", "jobs": self.JOBS})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.startswith("event: score\ndata: ")
+        assert "event: done\n" in response.text
+        assert missing.status_code == 404
+
+
+def reference_keyword_match(cv_data, job_keywords):
+    """Direct scan of the CV, as find_matching_keywords and skill matching did before indexing."""
+    parts = []
+    profile = cv_data.get("profile") or {}
+    parts += [profile[k] for k in ("title", "summary") if profile.get(k)]
+    for exp in cv_data.get("experiences", []):
+        parts += [exp[k] for k in ("title", "company", "description") if exp.get(k)]
+    for skill in cv_data.get("skills", []):
+        parts += [skill[k] for k in ("name", "category") if skill.get(k)]
+    text = " ".join(parts).lower()
+    words = {w for part in parts for w in part.lower().split()}
+
+    matched, missing = [], []
+    for keyword in job_keywords:
+        kl = keyword.lower()
+        if (kl in text or any(w in text for w in kl.split())
+                or any(kl in w or w in kl for w in words if len(w) > 2)):
+            matched.append(keyword)
+        else:
+            missing.append(keyword)
+
+    skills = []
+    for skill in [s.get("name") for s in cv_data.get("skills", []) if s.get("name")]:
+        sl = skill.lower()
+        for kl in (k.lower() for k in job_keywords):
+            if sl in kl or kl in sl or any(sw in kl for sw in sl.split()) or any(kl in sw for sw in sl.split()):
+                if skill not in skills:
+                    skills.append(skill)
+                break
+    return matched, missing, skills
+
+
+class TestCVKeywordIndex:
+    """Tests for the reusable CV keyword index."""
+
+    def test_matches_direct_scan_on_random_cvs(self):
+        """Matched, missing and matched skills should equal a direct scan of the CV."""
+        import random
+        from scoring import CVKeywordIndex, find_matching_keywords
+
+        rng = random.Random(7)
+        vocab = ["py", "python", "go", "django", "c", "node.js", "react native", "sql", "postgresql",
+                 "aws", "k8s", "data", "science", "ml", "machine learning", "java", "javascript", "ops"]
+
+        def phrase(n):
+            return " ".join(rng.choice(vocab) for _ in range(rng.randint(1, n)))
+
+        for _ in range(200):
+            cv_data = {
+                "profile": {"title": phrase(3), "summary": phrase(8)},
+                "experiences": [{"title": phrase(2), "company": phrase(1), "description": phrase(10)}
+                                for _ in range(rng.randint(0, 3))],
+                "skills": [{"name": phrase(2).title(), "category": rng.choice([None, phrase(1)])}
+                           for _ in range(rng.randint(0, 5))],
+            }
+            index = CVKeywordIndex(cv_data)
+            for _ in range(3):
+                keywords = [phrase(2).upper() if rng.random() < 0.3 else phrase(2) for _ in range(rng.randint(0, 8))]
+                matched, missing, skills = reference_keyword_match(cv_data, keywords)
+
+                assert find_matching_keywords(cv_data, keywords, index) == (matched, missing)
+                assert index.matched_skills(keywords) == skills
+
+    def test_index_is_reused_from_prepared_cv(self, fake_model):
+        """prepare_cv should build the index once for all jobs."""
+        from scoring import CVKeywordIndex, prepare_cv
+
+        prepared = prepare_cv({"profile": {"title": "Python Developer"}, "skills": [{"name": "Docker"}]})
+
+        assert isinstance(prepared["keyword_index"], CVKeywordIndex)
+        assert prepared["keyword_index"].matched_skills(["docker-compose", "java"]) == ["Docker"]
+
+
+class TestKeywordScoresBatch:
+    """Tests for sparse batch keyword scoring."""
+
+    CV_DATA = TestDetailedBatchScoring.CV_DATA
+
+    JOBS = TestDetailedBatchScoring.JOBS + [
+        {"id": "d", "title": "DevOps", "company": "Ops", "description": "Kubernetes, Docker, docker, Terraform and AWS"},
+        {"id": "e", "title": "", "company": "Empty", "description": ""},
+        {"id": "f", "title": "Python Python python", "company": "Dup", "description": "teamwork"},
+    ]
+
+    def test_matches_per_job_keyword_score(self, fake_model):
+        """Every batch score should equal the keywordScore of the detailed score."""
+        from scoring import calculate_detailed_scores_batch, calculate_keyword_scores_batch
+
+        batch = calculate_keyword_scores_batch(self.CV_DATA, self.JOBS)
+        detailed = calculate_detailed_scores_batch(self.CV_DATA, self.JOBS)
+
+        assert [r["keywordScore"] for r in batch] == [d["keywordScore"] for d in detailed]
+        assert [r["totalKeywords"] for r in batch] == [d["totalKeywords"] for d in detailed]
+        assert [r["matchedKeywords"] for r in batch] == [len(d["matchedKeywords"]) for d in detailed]
+
+    def test_score_does_not_depend_on_summation_order(self):
+        """Integer weight units make the score independent of keyword order."""
+        from scoring import calculate_weighted_keyword_score
+
+        matched = ["python", "kafka", "docker", "terraform"]
+        missing = ["zorblax", "rust", "quux"]
+
+        assert calculate_weighted_keyword_score(matched, missing) == calculate_weighted_keyword_score(
+            list(reversed(matched)), list(reversed(missing))
+        )
+
+    def test_scores_use_one_keyword_snapshot(self, fake_model):
+        """Scores should be computed against the given snapshot and report its version."""
+        import tech_keywords
+        from scoring import calculate_detailed_scores_batch, calculate_keyword_scores_batch
+
+        current = tech_keywords.get_keyword_snapshot()
+        snapshot = tech_keywords.KeywordSnapshot(current.tech_terms, {"teamwork": 9.0, "dup": 4.0}, 99, current)
+
+        batch = calculate_keyword_scores_batch(self.CV_DATA, self.JOBS, snapshot=snapshot)
+        detailed = calculate_detailed_scores_batch(self.CV_DATA, self.JOBS, snapshot=snapshot)
+
+        assert {r["indexVersion"] for r in batch + detailed} == {snapshot.version}
+        assert snapshot.version != current.version
+        assert [r["keywordScore"] for r in batch] == [d["keywordScore"] for d in detailed]
+
+    def test_endpoint_accepts_registered_cv(self, fake_model):
+        """The endpoint should score by cv_id and return one result per job."""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        client = TestClient(app)
+        cv_id = client.post("/cv", json=self.CV_DATA).json()["cv_id"]
+        by_id = client.post("/score-keywords-batch", json={"cv_id": cv_id, "jobs": self.JOBS})
+        by_data = client.post("/score-keywords-batch", json={"cv_data": self.CV_DATA, "jobs": self.JOBS})
+
+        assert by_id.status_code == 200
+        assert [r["id"] for r in by_id.json()["results"]] == ["a", "b", "c", "d", "e", "f"]
+        assert by_id.json() == by_data.json()
+
+
+class TestWarmup:
+    """Tests for start-up warm-up and readiness gating."""
+
+    def test_warm_up_encodes_configured_batch_shapes(self, fake_model, monkeypatch):
+        """Warm-up should encode each batch shape and report its duration."""
+        import scoring
+
+        monkeypatch.setattr(scoring, "_warmup_status", {"state": "not_started", "duration_seconds": None, "error": None})
+
+        status = scoring.warm_up(batch_sizes=[1, 8])
+
+        assert [len(call) for call in fake_model.calls] == [1, 8]
+        assert status["state"] == "done"
+        assert status["duration_seconds"] >= 0
+        assert scoring.get_model_status()["warmup"]["state"] == "done"
+
+    def test_ready_is_503_until_warm_up_completes(self, fake_model, monkeypatch):
+        """With warm-up enabled, /ready should only succeed once warm."""
+        import time
+        import main
+        import scoring
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(main, "WARMUP_ON_STARTUP", True)
+        monkeypatch.setattr(scoring, "_warmup_status", {"state": "not_started", "duration_seconds": None, "error": None})
+
+        assert TestClient(main.app).get("/ready").status_code == 503
+
+        with TestClient(main.app) as client:
+            for _ in range(100):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.05)
+
+            assert response.status_code == 200
+            assert response.json()["warmup"]["state"] == "done"
+            assert client.get("/health").status_code == 200
+
+    def test_ready_without_warm_up(self, monkeypatch):
+        """Without warm-up, the service is ready immediately."""
+        import main
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(main, "WARMUP_ON_STARTUP", False)
+
+        assert TestClient(main.app).get("/ready").status_code == 200
@@ -0,0 +1,136 @@
+"""
+Tests for per-site scraping in /scrape.
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+
+class FakeScraper:
+    """Stands in for jobspy.scrape_jobs: one job per site, with per-site delays and failures."""
+
+    def __init__(self, delays=None, failures=()):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = []
+
+    def __call__(self, site_name, **kwargs):
+        (site,) = site_name
+        self.calls.append(site)
+        time.sleep(self.delays.get(site, 0))
+        if site in self.failures:
+            raise RuntimeError(f"{site} blocked the request")
+        return pd.DataFrame([{"title": f"Engineer at {site}", "company": "Acme", "site": site}])
+
+
+@pytest.fixture
+def scrape(monkeypatch):
+    """Post to /scrape with a fake scraper and short timeouts."""
+    import main
+    from executors import BoundedExecutor
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main, "scrape_executor", BoundedExecutor("scrape", 5))
+    monkeypatch.setattr(main, "SCRAPE_SITE_TIMEOUT", 0.5)
+    monkeypatch.setattr(main, "SCRAPE_DEADLINE", 1.0)
+    monkeypatch.setattr(main, "_abandoned_scrapes", {})
+    client = TestClient(main.app)
+
+    def post(scraper, sites=None, workers=5):
+        monkeypatch.setattr(main, "scrape_jobs", scraper)
+        if workers != main.scrape_executor.max_workers:
+            monkeypatch.setattr(main, "scrape_executor", BoundedExecutor("scrape", workers))
+        return client.post("/scrape", json={"search_term": "python", "site_name": sites})
+
+    return post
+
+
+class TestScrape:
+    """Tests for concurrent per-site scraping."""
+
+    def test_sites_are_scraped_separately_and_concurrently(self, scrape):
+        """Each site should get its own call, and the slowest one bounds the latency."""
+        scraper = FakeScraper(delays={site: 0.2 for site in ("indeed", "linkedin", "google")})
+
+        start = time.perf_counter()
+        response = scrape(scraper, ["indeed", "linkedin", "google", "indeed"])
+        elapsed = time.perf_counter() - start
+
+        body = response.json()
+        assert response.status_code == 200
+        assert sorted(scraper.calls) == ["google", "indeed", "linkedin"]
+        assert [job["site"] for job in body["jobs"]] == ["indeed", "linkedin", "google"]
+        assert [site["status"] for site in body["sites"]] == ["ok", "ok", "ok"]
+        assert elapsed < 0.5
+
+    def test_slow_and_failing_sites_return_partial_results(self, scrape):
+        """A hanging or failing site should only lose its own jobs."""
+        scraper = FakeScraper(delays={"linkedin": 2.0}, failures={"glassdoor"})
+
+        response = scrape(scraper)
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["total"] == 3
+        sites = {site["site"]: site for site in body["sites"]}
+        assert sites["linkedin"]["status"] == "timeout"
+        assert sites["linkedin"]["latency_seconds"] == pytest.approx(0.5, abs=0.2)
+        assert sites["glassdoor"]["status"] == "error"
+        assert "blocked" in sites["glassdoor"]["error"]
+        assert sites["indeed"] == {
+            "site": "indeed", "status": "ok", "total": 1,
+            "latency_seconds": sites["indeed"]["latency_seconds"], "queued_seconds": pytest.approx(0, abs=0.1),
+            "error": None,
+        }
+        assert "linkedin: timeout" in body["message"]
+
+    def test_time_in_the_queue_is_not_charged_to_the_site(self, scrape, monkeypatch):
+        """A site waiting for a scrape worker should get its full timeout once it starts."""
+        import main
+
+        monkeypatch.setattr(main, "SCRAPE_SITE_TIMEOUT", 0.4)
+        scraper = FakeScraper(delays={"indeed": 0.3, "google": 0.3})
+
+        response = scrape(scraper, ["indeed", "google"], workers=1)
+
+        sites = {site["site"]: site for site in response.json()["sites"]}
+        assert [sites[site]["status"] for site in ("indeed", "google")] == ["ok", "ok"]
+        assert max(site["queued_seconds"] for site in sites.values()) == pytest.approx(0.3, abs=0.15)
+
+    def test_site_still_queued_at_the_deadline_is_reported_separately(self, scrape):
+        """A site that never got a scrape worker should time out as queued, and never run."""
+        scraper = FakeScraper(delays={"indeed": 0.1, "linkedin": 1.5})
+
+        response = scrape(scraper, ["indeed", "linkedin", "google"], workers=1)
+
+        sites = {site["site"]: site for site in response.json()["sites"]}
+        assert sites["indeed"]["status"] == "ok"
+        assert sites["linkedin"]["status"] == "timeout"
+        assert sites["google"]["status"] == "queued_timeout"
+        assert sites["google"]["queued_seconds"] == pytest.approx(1.0, abs=0.2)
+        time.sleep(0.8)
+        assert scraper.calls == ["indeed", "linkedin"]
+
+    def test_site_with_abandoned_scrapes_is_skipped(self, scrape):
+        """A board whose timed-out scrape is still running should not take another worker."""
+        scraper = FakeScraper(delays={"linkedin": 1.5})
+
+        first = scrape(scraper, ["linkedin", "indeed"])
+        second = scrape(scraper, ["linkedin", "indeed"])
+
+        assert first.json()["sites"][0]["status"] == "timeout"
+        assert second.json()["sites"][0]["status"] == "skipped"
+        assert scraper.calls.count("linkedin") == 1
+        time.sleep(1.2)
+        third = scrape(scraper, ["linkedin", "indeed"])
+        assert third.json()["sites"][0]["status"] == "timeout"
+        assert scraper.calls.count("linkedin") == 2
+
+    def test_all_sites_failing_is_an_error(self, scrape):
+        """The request should fail only when no site succeeded."""
+        response = scrape(FakeScraper(failures={"indeed", "google"}), ["indeed", "google"])
+
+        assert response.status_code == 502
+        assert "indeed: indeed blocked the request" in response.json()["detail"]
@@ -0,0 +1,473 @@
+"""
+Tests for technical keyword detection.
+"""
+
+import pytest
+
+import tech_keywords
+
+
+@pytest.fixture
+def vocabulary(monkeypatch):
+    """Use a fixed tech vocabulary and no TF-IDF index."""
+    terms = frozenset(tech_keywords.ALWAYS_TECH) | {"machine-learning", "node.js"}
+    monkeypatch.setattr(tech_keywords, "_tech_terms", tech_keywords.TechVocabulary(terms))
+    monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords.KeywordSnapshot(tech_keywords._tech_terms))
+    return terms
+
+
+def use_idf_scores(monkeypatch, idf_scores):
+    """Publish a snapshot of the current vocabulary with these IDF scores."""
+    current = tech_keywords.get_keyword_snapshot()
+    snapshot = tech_keywords.KeywordSnapshot(current.tech_terms, idf_scores, current.idf_version + 1, current)
+    monkeypatch.setattr(tech_keywords, "_snapshot", snapshot)
+    return snapshot
+
+
+class TestTermMatcher:
+    """Tests for the trie-based term matcher."""
+
+    def test_multi_word_terms_match_as_one_unit(self, vocabulary):
+        """A hyphenated vocabulary term written with spaces should match as a phrase."""
+        from tech_keywords import scan_technical_terms
+
+        text = "We use Machine Learning and Ruby on Rails daily."
+        matches = {match["term"]: match for match in scan_technical_terms(text)}
+
+        assert matches["Machine Learning"]["canonical"] == "machine-learning"
+        assert matches["Machine Learning"]["weight"] == 1.5
+        assert matches["Ruby on Rails"]["canonical"] == "ruby-on-rails"
+        assert matches["Ruby on Rails"]["weight"] == 2.0
+        start = matches["Ruby on Rails"]["start"]
+        assert text[start:matches["Ruby on Rails"]["end"]] == "Ruby on Rails"
+        assert "Learning" not in matches
+
+    def test_phrases_do_not_span_punctuation(self, vocabulary):
+        """Words separated by punctuation should not form a phrase."""
+        from tech_keywords import scan_technical_terms
+
+        terms = [match["term"] for match in scan_technical_terms("machine, learning")]
+
+        assert terms == ["machine", "learning"]
+
+    def test_single_tokens_match_per_term_classification(self, vocabulary, monkeypatch):
+        """Single-token results should agree with is_technical_term and get_technical_weight."""
+        from tech_keywords import extract_technical_keywords, get_technical_weight, is_technical_term
+
+        use_idf_scores(monkeypatch, {"grafana": 5.0, "zorblax": 3.5, "quux": 2.5})
+        text = "Python, Django and Node.js with Zorblax, quux, Kafka; strong communication skills."
+
+        results = extract_technical_keywords(text, max_keywords=50)
+
+        assert {r["keyword"] for r in results} == {
+            "Python", "Django", "and", "Node.js", "with", "Zorblax", "quux", "Kafka"
+        }
+        for result in results:
+            assert result["weight"] == get_technical_weight(result["keyword"])
+            assert result["is_technical"] == is_technical_term(result["keyword"])
+
+    def test_longest_phrase_wins(self):
+        """A phrase should extend while its words are a prefix of a longer phrase."""
+        from tech_keywords import TermMatcher
+
+        matcher = TermMatcher({"a-b", "a-b-c-d", "b-c"})
+
+        assert matcher.unique_terms("x a b c x a b c d") == [
+            ("x", "x"), ("a b", "a-b"), ("c", "c"), ("a b c d", "a-b-c-d")
+        ]
+
+    def test_unique_terms_agree_with_scan(self):
+        """The per-word fast path should find the same terms, in the same order, as scan."""
+        import random
+
+        from tech_keywords import TermMatcher
+
+        matcher = TermMatcher({"a-b", "a-b-c-d", "b-c", "c++", "node.js"})
+        table = tech_keywords.TermTable(matcher.vocabulary, None)
+        parts = ["a", "b", "c", "d", "A", "x", "c++", "Node.js", "_", ",", "/", "é", "a_b", "(", "\n"]
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = "".join(rng.choice(parts) + rng.choice(["", " ", "  "]) for _ in range(rng.randint(0, 12)))
+            expected = list(dict.fromkeys((match["term"], match["canonical"]) for match in matcher.scan(text, table)))
+
+            assert matcher.unique_terms(text) == expected, text
+
+    def test_matcher_is_rebuilt_only_when_vocabulary_changes(self, vocabulary, monkeypatch):
+        """A new vocabulary should get a new matcher; new IDF scores should not."""
+        from tech_keywords import KeywordSnapshot, get_term_matcher
+
+        first = get_term_matcher()
+        assert get_term_matcher() is first
+        assert use_idf_scores(monkeypatch, {"zorblax": 4.0}).matcher is first
+
+        second = KeywordSnapshot(vocabulary | {"event-sourcing"}, previous=tech_keywords.get_keyword_snapshot())
+
+        assert second.matcher is not first
+        assert [m["canonical"] for m in second.matcher.scan("event sourcing", second.table)] == [
+            "event-sourcing"
+        ]
+
+
+class TestSynonyms:
+    """Tests for tag synonyms."""
+
+    @pytest.fixture
+    def synonyms(self, vocabulary, monkeypatch):
+        tech_terms = tech_keywords.TechVocabulary(
+            vocabulary | {"reactjs"}, {"js": "javascript", "react-js": "reactjs", "py": "missing-tag"}
+        )
+        monkeypatch.setattr(tech_keywords, "_snapshot", tech_keywords.KeywordSnapshot(tech_terms))
+        return tech_terms
+
+    def test_synonyms_must_point_at_terms(self, synonyms):
+        """Synonyms of unknown terms, or of terms themselves, should be dropped."""
+        vocabulary = tech_keywords.TechVocabulary({"python", "py"}, {"py": "python", "snek": "python"})
+
+        assert dict(synonyms.synonyms.items()) == {"js": "javascript", "react-js": "reactjs"}
+        assert dict(vocabulary.synonyms.items()) == {"snek": "python"}
+
+    def test_extraction_canonicalizes_synonyms(self, synonyms):
+        """Spellings of one term should be extracted once, as first written."""
+        from tech_keywords import extract_technical_keywords
+
+        results = extract_technical_keywords("JS, React JS and JavaScript with reactjs", max_keywords=50)
+
+        assert [(r["keyword"], r["canonical"]) for r in results] == [
+            ("JS", "javascript"), ("React JS", "reactjs"), ("and", "and"), ("with", "with")
+        ]
+        assert results[1]["weight"] == 2.0
+
+    def test_synonyms_classify_like_their_term(self, synonyms):
+        """A synonym should get the classification of the term it stands for."""
+        from tech_keywords import classify_terms, is_technical_term
+
+        assert classify_terms(["js", "React  js", "py"]) == [(True, 2.0), (True, 2.0), (False, 0.3)]
+        assert is_technical_term("JS", idf_threshold=3.0)
+
+
+class TestTermTable:
+    """Tests for the precomputed term classification table."""
+
+    def test_classify_terms_matches_vocabulary_and_idf(self, vocabulary, monkeypatch):
+        """Batch classification should follow stopwords, vocabulary, then IDF."""
+        from tech_keywords import classify_terms
+
+        use_idf_scores(monkeypatch, {"zorblax": 3.5, "quux": 2.5, "teamwork": 9.0})
+
+        assert classify_terms(["Python", " Django ", "Node.js", "zorblax", "quux", "teamwork", "unknown"]) == [
+            (True, 2.0),
+            (True, 2.0),
+            (True, 1.5),
+            (True, 1.3),
+            (True, 1.0),
+            (False, 0.1),
+            (False, 0.3),
+        ]
+
+    def test_phrases_classify_like_their_hyphenated_term(self, vocabulary):
+        """'Machine Learning' should be as technical as 'machine-learning'."""
+        from tech_keywords import get_technical_weight, is_technical_term
+
+        assert is_technical_term("Machine  Learning")
+        assert get_technical_weight("Machine Learning") == get_technical_weight("machine-learning") == 1.5
+
+    def test_table_is_rebuilt_when_idf_scores_change(self, vocabulary, monkeypatch):
+        """A new TF-IDF index should swap in a new table."""
+        from tech_keywords import get_term_table, get_technical_weight
+
+        first = get_term_table()
+        assert get_technical_weight("zorblax") == 0.3
+
+        use_idf_scores(monkeypatch, {"zorblax": 4.0})
+
+        assert get_term_table() is not first
+        assert get_technical_weight("zorblax") == 1.3
+
+    def test_memo_is_bounded(self, vocabulary):
+        """The memo of raw terms should never exceed its size."""
+        from tech_keywords import TermTable
+
+        table = TermTable(vocabulary, None, memo_size=3)
+        for i in range(10):
+            table.classify(f"Term{i}")
+
+        assert len(table._memo) <= 3
+
+    def test_custom_idf_threshold(self, vocabulary, monkeypatch):
+        """A non-default threshold should still be honoured."""
+        from tech_keywords import is_technical_term
+
+        use_idf_scores(monkeypatch, {"quux": 2.5})
+
+        assert is_technical_term("quux")
+        assert not is_technical_term("quux", idf_threshold=3.0)
+        assert is_technical_term("python", idf_threshold=3.0)
+
+
+class TestKeywordSnapshot:
+    """Tests for the immutable keyword snapshot."""
+
+    def test_snapshot_is_immutable(self, vocabulary):
+        """Snapshots cannot be modified, only replaced."""
+        snapshot = tech_keywords.KeywordSnapshot(vocabulary, {"zorblax": 3.0})
+
+        with pytest.raises(AttributeError):
+            snapshot.version = "other"
+        with pytest.raises(TypeError):
+            snapshot.idf_scores["zorblax"] = 1.0
+
+    def test_readers_keep_the_snapshot_they_took(self, vocabulary, monkeypatch):
+        """Publishing a new snapshot should not change one already held."""
+        from tech_keywords import classify_terms
+
+        held = tech_keywords.get_keyword_snapshot()
+        use_idf_scores(monkeypatch, {"zorblax": 4.0})
+
+        assert classify_terms(["zorblax"], held) == [(False, 0.3)]
+        assert classify_terms(["zorblax"]) == [(True, 1.3)]
+        assert tech_keywords.get_keyword_snapshot().version != held.version
+
+    def test_publish_reads_vocabulary_and_tfidf_index(self, vocabulary, monkeypatch):
+        """Building the TF-IDF index should publish a snapshot with its version."""
+        from idf_index import IdfIndex
+
+        monkeypatch.setattr(tech_keywords, "_idf_index", IdfIndex())
+        before = tech_keywords.get_keyword_snapshot()
+
+        tech_keywords.build_tfidf_index([f"generic posting {i}" for i in range(16)] + ["zorblax"])
+        after = tech_keywords.get_keyword_snapshot()
+
+        assert after is not before
+        assert after.matcher is before.matcher
+        assert after.version == f"{before.vocabulary_version}-{tech_keywords._idf_index.version}"
+        assert after.table.lookup("zorblax") == (True, 1.3)
+
+
+
+class TestBatchExtraction:
+    """Tests for batch keyword extraction and the keyword process pool."""
+
+    TEXTS = [
+        "Senior Python developer with Django, PostgreSQL and machine learning",
+        "",
+        "Node.js and React engineer, strong communication and teamwork",
+        "zorblax platform team using Kubernetes and Go",
+    ] * 5
+
+    def test_snapshot_pickles_with_its_version(self, vocabulary):
+        """A pickled snapshot should load with the same version and classification."""
+        import pickle
+
+        snapshot = tech_keywords.KeywordSnapshot(
+            tech_keywords.TechVocabulary(vocabulary, {"js": "javascript"}), {"zorblax": 4.0}, 7
+        )
+        loaded = pickle.loads(pickle.dumps(snapshot))
+
+        assert loaded.version == snapshot.version
+        assert loaded.tech_terms.synonyms.get("js") == "javascript"
+        assert loaded.table.lookup("zorblax") == snapshot.table.lookup("zorblax")
+        with pytest.raises(AttributeError):
+            loaded.tech_terms.version = "other"
+
+    def test_worker_count_respects_the_cgroup_quota(self, tmp_path):
+        """The CPU quota should cap the CPUs used for keyword workers."""
+        from keyword_pool import available_cpus
+
+        cpu_max = tmp_path / "cpu.max"
+        missing = tmp_path / "v1"
+        cpu_max.write_text("50000 100000\n")
+        assert available_cpus(cpu_max, missing) == 1
+
+        cpu_max.write_text("max 100000\n")
+        unlimited = available_cpus(cpu_max, missing)
+        cpu_max.write_text(f"{unlimited * 100000 + 1} 100000\n")
+        assert available_cpus(cpu_max, missing) == unlimited
+
+        missing.mkdir()
+        (missing / "cpu.cfs_quota_us").write_text("150000\n")
+        (missing / "cpu.cfs_period_us").write_text("100000\n")
+        assert available_cpus(tmp_path / "absent", missing) == min(2, unlimited)
+
+    def test_small_batch_matches_single_extraction(self, vocabulary):
+        """Each result should equal extracting that text on its own."""
+        from tech_keywords import extract_technical_keywords, extract_technical_keywords_batch
+
+        results = extract_technical_keywords_batch(self.TEXTS, max_keywords=5)
+
+        assert results == [extract_technical_keywords(text, 5) for text in self.TEXTS]
+
+    def test_large_batch_runs_in_worker_processes(self, vocabulary, monkeypatch):
+        """Batches over the threshold should be extracted by the pool, against the given snapshot."""
+        from keyword_pool import KeywordProcessPool
+        from tech_keywords import extract_technical_keywords, extract_technical_keywords_batch
+
+        pool = KeywordProcessPool(max_workers=2, chunk_size=3)
+        monkeypatch.setattr(tech_keywords, "keyword_pool", pool)
+        monkeypatch.setattr(tech_keywords, "KEYWORD_PROCESS_MIN_BATCH", 4)
+        snapshot = use_idf_scores(monkeypatch, {"zorblax": 4.0})
+        try:
+            results = extract_technical_keywords_batch(self.TEXTS, max_keywords=5)
+            again = extract_technical_keywords_batch(self.TEXTS[:4], max_keywords=5)
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+
+        assert results == [extract_technical_keywords(text, 5, snapshot) for text in self.TEXTS]
+        assert again == results[:4]
+        assert {"keyword": "zorblax", "canonical": "zorblax", "is_technical": True, "weight": 1.3} in results[3]
+        assert stats["snapshot_version"] == snapshot.version
+        assert stats["pools_started"] == 1
+        assert stats["batches"] == 2
+
+    def test_batch_endpoint(self, vocabulary):
+        """The endpoint should return one keyword list per text and the snapshot version."""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        response = TestClient(app).post("/extract-keywords-batch", json={"texts": self.TEXTS[:3], "max_keywords": 3})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["indexVersion"] == tech_keywords.get_keyword_snapshot().version
+        assert [len(keywords) for keywords in body["results"]] == [3, 0, 3]
+        assert body["results"][0][0]["is_technical"]
+
+class FakeResponse:
+    def __init__(self, status_code, items=(), headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._items = list(items)
+
+    def json(self):
+        return {"items": self._items, "has_more": bool(self._items)}
+
+
+class FakeSession:
+    """Serves one page of tags and of synonyms, answering 304 when the ETag matches."""
+
+    def __init__(self, tags, synonyms=None, etag='"v1"'):
+        self.items = {
+            tech_keywords.STACKEXCHANGE_TAGS_URL: [{"name": name} for name in tags],
+            tech_keywords.STACKEXCHANGE_SYNONYMS_URL: [
+                {"from_tag": source, "to_tag": target} for source, target in (synonyms or {}).items()
+            ],
+        }
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, params, headers, timeout):
+        self.requests.append((url, params["page"], dict(headers)))
+        if params["page"] > 1:
+            return FakeResponse(200)
+        if headers.get("If-None-Match") == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.items[url], {"ETag": self.etag})
+
+    def close(self):
+        pass
+
+
+class TestVocabulary:
+    """Tests for the bundled vocabulary and its refresh."""
+
+    @pytest.fixture
+    def files(self, monkeypatch, tmp_path):
+        """Point the vocabulary at temporary files and unload it."""
+        import json
+
+        bundled = tmp_path / "tech_vocabulary.json"
+        bundled.write_text(json.dumps({
+            "version": "2026.1.0",
+            "source": "test",
+            "generated_at": "2026-01-01T00:00:00Z",
+            "tags": ["zorblax", "quux"],
+        }))
+        monkeypatch.setattr(tech_keywords, "VOCABULARY_PATH", bundled)
+        monkeypatch.setattr(tech_keywords, "SO_TAGS_CACHE", tmp_path / "stackoverflow_tags.json")
+        monkeypatch.setattr(tech_keywords, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(tech_keywords, "_tech_terms", None)
+        monkeypatch.setattr(tech_keywords, "_snapshot", None)
+        monkeypatch.setattr(tech_keywords, "_vocabulary_info", dict(tech_keywords._vocabulary_info))
+        monkeypatch.setattr(tech_keywords, "_refresh_status", dict(tech_keywords._refresh_status))
+        return tmp_path
+
+    def test_shipped_vocabulary_is_valid(self):
+        """The vocabulary shipped with the service should load on its own."""
+        vocabulary = tech_keywords._read_vocabulary(tech_keywords.VOCABULARY_PATH)
+
+        assert vocabulary["version"] != "unversioned"
+        assert {"python", "javascript", "kubernetes"} <= set(vocabulary["tags"])
+        tech_terms = tech_keywords._build_vocabulary(vocabulary)
+        assert len(tech_terms.synonyms) == len(vocabulary["synonyms"])
+
+    def test_bundled_vocabulary_is_loaded_without_network(self, files, monkeypatch):
+        """Loading should be synchronous and publish the bundled version."""
+        monkeypatch.setattr(tech_keywords, "_fetch_tags_page", None)
+
+        terms = tech_keywords.load_tech_terms()
+
+        assert all(term in terms for term in ("zorblax", "quux", "python"))
+        assert tech_keywords.get_keyword_snapshot().table.lookup("zorblax") == (True, 1.5)
+        status = tech_keywords.get_vocabulary_status()
+        assert (status["version"], status["source"]) == ("2026.1.0", "test")
+        assert status["memory_bytes"] > 0
+        assert status["refresh"]["state"] == "idle"
+
+    def test_newer_refreshed_cache_wins(self, files):
+        """A tag cache refreshed after the bundle was generated should be preferred."""
+        import json
+
+        (files / "stackoverflow_tags.json").write_text(json.dumps({"tags": ["newtag"], "timestamp": 2e9}))
+
+        assert "newtag" in tech_keywords.load_tech_terms()
+        assert "zorblax" not in tech_keywords._tech_terms
+
+    def test_empty_tag_cache_is_ignored(self, files):
+        """A cache left by a failed fetch should not replace the bundled vocabulary."""
+        import json
+
+        (files / "stackoverflow_tags.json").write_text(json.dumps({"tags": [], "timestamp": 2e9}))
+
+        assert "zorblax" in tech_keywords.load_tech_terms()
+        assert tech_keywords.get_vocabulary_status()["version"] == "2026.1.0"
+
+    def test_refresh_is_conditional(self, files, monkeypatch):
+        """A second refresh should send the ETag and keep the tags on 304."""
+        session = FakeSession(["zorblax", "event-sourcing"], {"es": "event-sourcing"})
+        monkeypatch.setattr(tech_keywords, "_tags_session", lambda workers: session)
+        monkeypatch.setattr(tech_keywords, "VOCABULARY_REFRESH_PAGES", 3)
+        tech_keywords.load_tech_terms()
+        before = tech_keywords.get_keyword_snapshot()
+
+        first = tech_keywords.refresh_vocabulary()
+
+        assert first["state"] == "done" and first["changed"]
+        after = tech_keywords.get_keyword_snapshot()
+        assert after.vocabulary_version != before.vocabulary_version
+        assert "event-sourcing" in after.tech_terms and "quux" not in after.tech_terms
+        assert after.tech_terms.canonical("es") == "event-sourcing"
+        assert tech_keywords.get_vocabulary_status()["source"] == "stackexchange-api"
+
+        session.requests.clear()
+        second = tech_keywords.refresh_vocabulary()
+
+        assert second["state"] == "done" and not second["changed"]
+        assert second["pages_not_modified"] == 2
+        assert all(headers["If-None-Match"] == '"v1"' for _, page, headers in session.requests if page == 1)
+        assert tech_keywords.get_keyword_snapshot() is after
+
+    def test_failed_refresh_keeps_vocabulary(self, files, monkeypatch):
+        """When no page can be fetched the loaded vocabulary should stay."""
+        import requests
+
+        class DownSession(FakeSession):
+            def get(self, *args, **kwargs):
+                raise requests.ConnectionError("offline")
+
+        monkeypatch.setattr(tech_keywords, "_tags_session", lambda workers: DownSession([]))
+        terms = tech_keywords.load_tech_terms()
+
+        status = tech_keywords.refresh_vocabulary()
+
+        assert status["state"] == "failed"
+        assert tech_keywords._tech_terms is terms
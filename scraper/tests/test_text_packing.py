@@ -0,0 +1,116 @@
+"""
+Tests for token-budget text packing and length-bucketed encoding.
+"""
+
+
+def count_words(segments):
+    return [len(segment.split()) for segment in segments]
+
+
+class TestPackText:
+    """Tests for pack_text."""
+
+    def test_keeps_header_and_requirements_and_drops_boilerplate(self):
+        """Title and requirement sentences should be kept before other text."""
+        from text_packing import pack_text
+
+        text = (
+            "Position: Backend Engineer Company: Acme "
+            "Description: We are a fast growing startup in Paris. "
+            "Our office has a great view of the river. "
+            "You must have 5 years of experience with Python and Django. "
+            "We offer great benefits and free lunch. "
+            "Acme is an equal opportunity employer."
+        )
+
+        packed, tokens, dropped = pack_text(text, 20, count_words)
+
+        assert packed.startswith("Position: Backend Engineer")
+        assert "experience with Python and Django" in packed
+        assert "benefits" not in packed
+        assert "equal opportunity" not in packed
+        assert dropped == 2
+        assert tokens <= 20
+
+    def test_segments_keep_original_order(self):
+        """Chosen segments should be written back in document order."""
+        from text_packing import pack_text
+
+        text = "Position: Dev. Nice office. Skills required: Go and Rust. Team lunches every Friday."
+
+        packed, _, _ = pack_text(text, 100, count_words)
+
+        assert packed == text
+
+    def test_fills_leftover_budget_with_first_segment_that_did_not_fit(self):
+        """A long unpunctuated description should still fill the window."""
+        from text_packing import pack_text
+
+        description = " ".join(["word"] * 50)
+        packed, tokens, _ = pack_text(f"Position: Dev Description: {description}", 10, count_words)
+
+        assert packed.startswith("Position: Dev Description: word")
+        assert tokens == 10
+
+
+class TestLengthBuckets:
+    """Tests for length_buckets."""
+
+    def test_groups_similar_lengths(self):
+        """Indices should be sorted by length and split into buckets."""
+        from text_packing import length_buckets
+
+        assert length_buckets([5, 1, 9, 2, 7], 2) == [[1, 3], [0, 4], [2]]
+
+
+class TestTokenBudgetEncoding:
+    """Tests for packing and bucketing in the model encode path."""
+
+    def test_long_text_is_packed_and_tokens_reported(self, fake_model):
+        """Texts over the budget should be packed, and discarded tokens counted."""
+        import scoring
+
+        before = scoring.get_token_stats()
+        boilerplate = " ".join(["We offer great benefits and a gym."] * 30)
+        long_text = f"Position: Django Developer Description: Experience with Django required. {boilerplate}"
+
+        scoring.encode_texts([long_text, "short text"])
+
+        after = scoring.get_token_stats()
+        encoded = dict(zip(["long", "short"], sorted(fake_model.encoded_texts, key=len, reverse=True)))
+        assert encoded["long"] == "Position: Django Developer Description: Experience with Django required."
+        assert encoded["short"] == "short text"
+        assert after["texts_packed"] - before["texts_packed"] == 1
+        assert after["boilerplate_segments_dropped"] - before["boilerplate_segments_dropped"] == 30
+        assert after["tokens_discarded"] - before["tokens_discarded"] == 210
+        assert after["tokens_processed"] - before["tokens_processed"] == 10
+
+    def test_long_texts_are_tokenized_once(self, fake_model):
+        """Long texts should only be counted on a prefix, and packed text not recounted."""
+        import scoring
+
+        sentences = " ".join(f"Sentence {i} about Python services." for i in range(200))
+        long_text = f"Position: Python Developer Description: {sentences}"
+        boilerplate = " ".join(["We offer great benefits and a gym."] * 30)
+        packed_text = f"Position: Django Developer Description: Experience with Django required. {boilerplate}"
+
+        scoring._model_encode([long_text, packed_text, "short text"])
+
+        tokenized = [text for call in fake_model.tokenizer.calls for text in call]
+        assert long_text not in tokenized
+        assert packed_text not in tokenized
+        assert "short text" in tokenized
+        assert "Position: Django Developer Description: Experience with Django required." not in tokenized
+        assert max(len(text) for text in tokenized) < len(long_text) // 2
+
+    def test_batches_are_bucketed_by_length(self, fake_model, monkeypatch):
+        """Each model call should get texts of similar length, in input order on return."""
+        import scoring
+
+        monkeypatch.setattr(scoring, "ENCODE_BUCKET_SIZE", 2)
+        texts = ["a b c d e f", "a", "a b c d e", "a b"]
+
+        vectors = scoring._model_encode(texts)
+
+        assert fake_model.calls == [["a", "a b"], ["a b c d e", "a b c d e f"]]
+        assert vectors.tolist() == fake_model.encode(texts).tolist()
@@ -0,0 +1,67 @@
+"""
+Tests for the packed string set and map.
+"""
+
+import pickle
+
+TERMS = ["python", "c++", "node.js", "zürich", "machine-learning", "go"]
+
+
+class TestPackedStrings:
+    """Tests for PackedStrings."""
+
+    def test_membership_and_order(self):
+        """Stored strings should be found, sorted by their UTF-8 bytes."""
+        from vocabulary import PackedStrings
+
+        packed = PackedStrings(TERMS + ["python"])
+
+        assert len(packed) == len(TERMS)
+        assert list(packed) == sorted(TERMS, key=lambda term: term.encode("utf-8"))
+        assert all(term in packed for term in TERMS)
+        assert "pytho" not in packed and "pythonn" not in packed and "" not in packed
+        assert 42 not in packed
+        assert packed[packed.index("zürich")] == "zürich"
+        assert packed.index("java") == -1
+
+    def test_pickle_rebuilds_the_hash_index(self):
+        """A pickled set should work in a process with another hash seed."""
+        from vocabulary import PackedStrings
+
+        packed = PackedStrings(TERMS)
+        state = packed.__getstate__()
+        restored = pickle.loads(pickle.dumps(packed))
+
+        assert all(isinstance(part, (bytes, type(packed._offsets))) for part in state)
+        assert restored == packed
+        assert all(term in restored for term in TERMS)
+        assert restored.digest() == packed.digest()
+
+    def test_smaller_than_a_set(self):
+        """The packed buffers should take less memory than the same set of str objects."""
+        import sys
+
+        from vocabulary import PackedStrings
+
+        terms = [f"tag-{i}" for i in range(10000)]
+        as_set = sys.getsizeof(set(terms)) + sum(sys.getsizeof(term) for term in terms)
+
+        assert PackedStrings(terms).nbytes < as_set / 2
+
+
+class TestPackedMap:
+    """Tests for PackedMap."""
+
+    def test_get_and_items(self):
+        """Keys should map to their values; values are stored once."""
+        from vocabulary import PackedMap
+
+        mapping = {"js": "javascript", "ecmascript": "javascript", "k8s": "kubernetes"}
+        packed = PackedMap(mapping)
+
+        assert len(packed) == 3
+        assert dict(packed.items()) == mapping
+        assert packed.get("js") == "javascript"
+        assert packed.get("java") is None
+        assert packed.get("java", "java") == "java"
+        assert "k8s" in packed and "kubernetes" not in packed
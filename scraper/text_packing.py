@@ -0,0 +1,142 @@
+"""
+Token-budget-aware text packing for the embedding model.
+The model only reads its first max_seq_length tokens, so long job and CV
+texts are packed before encoding: the title and requirement-like sentences
+go first, boilerplate (benefits, EEO statements) is dropped, and the rest
+fills whatever budget is left.
+"""
+
+import os
+import re
+from typing import Callable
+
+# Packing configuration
+TEXT_PACKING_ENABLED = os.environ.get("TEXT_PACKING_ENABLED", "1") == "1"
+ENCODE_BUCKET_SIZE = int(os.environ.get("ENCODE_BUCKET_SIZE", "32"))  # texts per length bucket
+TOKEN_PREFIX_CHARS = int(os.environ.get("TOKEN_PREFIX_CHARS", "8"))  # characters tokenized per budget token
+
+# Segment boundaries: sentence ends, line breaks, bullets and the field
+# labels written by prepare_job_text / prepare_cv_text
+SEGMENT_SPLIT = re.compile(
+    r"(?<=[.!?;])\s+"
+    r"|\s*\n+\s*"
+    r"|\s+[•·▪●]\s*"
+    r"|\s+(?=(?:Position|Company|Description|Title|Summary|Skills):\s)"
+)
+
+# Labels of short segments that identify the job or CV
+HEADER_LABELS = ("Position:", "Company:", "Title:", "Skills:")
+
+# Sentences describing what the role needs (English and French postings)
+REQUIREMENT_PATTERN = re.compile(
+    r"\b(?:requir\w*|must|should have|experience (?:with|in)|years? of|proficien\w*|knowledge of|"
+    r"familiar\w*|skills?|qualifications?|you have|you will|responsibilit\w*|stack|"
+    r"expérience|compétences?|maîtrise\w*|connaissances?|profil|exigences|requis\w*|vous (?:avez|maîtrisez)|missions?)\b",
+    re.IGNORECASE,
+)
+
+# Sentences that say nothing about the role itself
+BOILERPLATE_PATTERN = re.compile(
+    r"\b(?:benefits?|we offer|perks|paid time off|pto|health insurance|dental|401\(?k\)?|"
+    r"equal opportunit\w*|eeo|affirmative action|regardless of|veterans?|disabilit\w*|"
+    r"diversity|inclusive|inclusion|accommodations?|"
+    r"avantages|nous offrons|mutuelle|tickets? restaurants?|égalité des chances|handicap|diversité)\b",
+    re.IGNORECASE,
+)
+
+
+def split_segments(text: str) -> list[str]:
+    """Split text into sentence-like segments."""
+    return [segment.strip() for segment in SEGMENT_SPLIT.split(text) if segment and segment.strip()]
+
+
+def pack_text(
+    text: str,
+    budget: int,
+    count_tokens: Callable[[list[str]], list[int]],
+) -> tuple[str, int, int]:
+    """
+    Pack a text into at most `budget` tokens.
+
+    Segments are chosen in priority order (header, then requirement-like
+    sentences, then everything else) and written back in their original
+    order. Boilerplate segments are never kept. If budget is left over, the
+    first segment that did not fit is appended last so the model fills its
+    window with it.
+
+    Args:
+        text: Text to pack
+        budget: Number of tokens the model reads (special tokens excluded)
+        count_tokens: Function returning the token count of each string
+
+    Returns:
+        Tuple of (packed_text, token_count, boilerplate_segments_dropped)
+    """
+    segments = split_segments(text)
+    if not segments:
+        return text, 0, 0
+
+    counts = count_tokens(segments)
+
+    groups: tuple[list[int], list[int], list[int]] = ([], [], [])
+    dropped = 0
+    for i, segment in enumerate(segments):
+        if i == 0 or segment.startswith(HEADER_LABELS):
+            groups[0].append(i)
+        elif BOILERPLATE_PATTERN.search(segment):
+            dropped += 1
+        elif REQUIREMENT_PATTERN.search(segment):
+            groups[1].append(i)
+        else:
+            groups[2].append(i)
+
+    remaining = budget
+    chosen = []
+    filler = None
+    for group in groups:
+        for i in group:
+            if counts[i] <= remaining:
+                chosen.append(i)
+                remaining -= counts[i]
+            elif filler is None:
+                filler = i
+
+    chosen.sort()
+    parts = [segments[i] for i in chosen]
+    tokens = budget - remaining
+    if filler is not None and remaining > 0:
+        parts.append(segments[filler])
+        tokens = budget
+
+    return " ".join(parts), tokens, dropped
+
+
+def budget_prefix(text: str, budget: int) -> str:
+    """
+    Return the start of a text that is enough to tell whether it fits the budget.
+
+    Texts of up to TOKEN_PREFIX_CHARS characters per budget token are
+    returned whole; longer ones are cut at the last space before that limit.
+    If the prefix already holds more than `budget` tokens, so does the text.
+    """
+    limit = (budget + 1) * TOKEN_PREFIX_CHARS
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit]
+
+
+def length_buckets(lengths: list[int], bucket_size: int) -> list[list[int]]:
+    """
+    Group indices into batches of similar length.
+
+    Args:
+        lengths: Token length of each text
+        bucket_size: Maximum number of texts per bucket
+
+    Returns:
+        Lists of indices into lengths, shortest texts first
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    bucket_size = max(1, bucket_size)
+    return [order[start:start + bucket_size] for start in range(0, len(order), bucket_size)]
@@ -0,0 +1,148 @@
+"""
+Compact static string sets and maps for large vocabularies.
+
+The full Stack Overflow tag set has 60k+ tags. As Python sets and dicts
+they would cost every worker tens of MB of small objects; packed here they
+take a few bytes per string beyond the UTF-8 text, in flat buffers that
+the garbage collector never scans and that forked workers share.
+"""
+
+import hashlib
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+
+
+class PackedStrings:
+    """
+    Immutable set of strings packed into one sorted UTF-8 buffer.
+
+    Strings are stored in sorted order as one bytes object plus offsets.
+    Lookups bisect a sorted array of the strings' hashes and compare the
+    candidate's bytes, so membership costs one hash, a C-level binary search
+    and one comparison, without a Python object per stored string.
+
+    Hashes use the interpreter's (per-process salted) string hash. They are
+    left out when pickling and rebuilt on load.
+    """
+
+    __slots__ = ("_blob", "_offsets", "_hashes", "_order")
+
+    def __init__(self, strings: Iterable[str] = ()):
+        encoded = sorted({string.encode("utf-8") for string in strings})
+        offsets = array("I", [0])
+        position = 0
+        for data in encoded:
+            position += len(data)
+            offsets.append(position)
+        self._blob = b"".join(encoded)
+        self._offsets = offsets
+        self._index()
+
+    def _index(self) -> None:
+        hashes = [hash(string) for string in self]
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        self._hashes = array("q", [hashes[i] for i in order])
+        self._order = array("I", order)
+
+    def __getstate__(self):
+        return self._blob, self._offsets
+
+    def __setstate__(self, state):
+        self._blob, self._offsets = state
+        self._index()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        blob, offsets = self._blob, self._offsets
+        for i in range(len(offsets) - 1):
+            yield blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+    def __contains__(self, string) -> bool:
+        return isinstance(string, str) and self.index(string) >= 0
+
+    def index(self, string: str) -> int:
+        """Position of a string in sorted order, or -1 if absent."""
+        h = hash(string)
+        hashes = self._hashes
+        i = bisect_left(hashes, h)
+        if i == len(hashes) or hashes[i] != h:
+            return -1
+        data = string.encode("utf-8")
+        blob, offsets, order = self._blob, self._offsets, self._order
+        while i < len(hashes) and hashes[i] == h:
+            j = order[i]
+            start = offsets[j]
+            if offsets[j + 1] - start == len(data) and blob.startswith(data, start):
+                return j
+            i += 1
+        return -1
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedStrings):
+            return NotImplemented
+        return self._blob == other._blob and self._offsets == other._offsets
+
+    def __hash__(self) -> int:
+        return hash(self._blob)
+
+    def digest(self) -> str:
+        """Content hash, identical across processes and restarts."""
+        digest = hashlib.sha1(self._blob)
+        digest.update(self._offsets.tobytes())
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the packed buffers."""
+        return sum(sys.getsizeof(buffer) for buffer in (self._blob, self._offsets, self._hashes, self._order))
+
+
+class PackedMap:
+    """
+    Immutable str -> str mapping over two packed string arrays.
+
+    Keys are a PackedStrings; values are interned once in a second
+    PackedStrings and referenced by position.
+    """
+
+    __slots__ = ("keys", "_values", "_targets")
+
+    def __init__(self, mapping: Optional[dict] = None):
+        mapping = mapping or {}
+        self.keys = PackedStrings(mapping)
+        self._values = PackedStrings(mapping.values())
+        self._targets = array("I", [self._values.index(mapping[key]) for key in self.keys])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        i = self.keys.index(key)
+        return default if i < 0 else self._values[self._targets[i]]
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        values, targets = self._values, self._targets
+        for i, key in enumerate(self.keys):
+            yield key, values[targets[i]]
+
+    def digest(self) -> str:
+        """Content hash, identical across processes and restarts."""
+        digest = hashlib.sha1(self.keys.digest().encode("ascii"))
+        digest.update(self._values.digest().encode("ascii"))
+        digest.update(self._targets.tobytes())
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the packed buffers."""
+        return self.keys.nbytes + self._values.nbytes + sys.getsizeof(self._targets)
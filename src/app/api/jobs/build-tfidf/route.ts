@@ -16,42 +16,54 @@ export async function POST() {
 
     await connectToDatabase();
 
-    // Get all job descriptions from the database
-    const jobs = await ScrapedJob.find(
-      {
-        description: { $exists: true },
-        $and: [
-          { description: { $ne: null } },
-          { description: { $ne: "" } }
-        ]
-      },
-      { description: 1 }
-    ).lean();
+    const filter = {
+      description: { $exists: true },
+      $and: [
+        { description: { $ne: null } },
+        { description: { $ne: "" } }
+      ]
+    };
 
-    if (!jobs || jobs.length === 0) {
+    const jobCount = await ScrapedJob.countDocuments(filter);
+    if (jobCount === 0) {
       return NextResponse.json(
         { error: "No jobs with descriptions found" },
         { status: 400 }
       );
     }
 
-    const descriptions = jobs
-      .map((j) => j.description)
-      .filter((d): d is string => typeof d === "string" && d.length > 0);
-
-    if (descriptions.length === 0) {
-      return NextResponse.json(
-        { error: "No valid job descriptions found" },
-        { status: 400 }
-      );
-    }
+    // Stream the corpus from a cursor as NDJSON instead of loading it all;
+    // job ids let the scraper drop expired postings from the index later
+    const cursor = ScrapedJob.find(filter, { description: 1 }).lean().cursor();
+    const encoder = new TextEncoder();
+    let descriptionsSent = 0;
+    const body = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        for (let job = await cursor.next(); job; job = await cursor.next()) {
+          if (typeof job.description === "string" && job.description.length > 0) {
+            descriptionsSent++;
+            controller.enqueue(
+              encoder.encode(
+                JSON.stringify({ id: String(job._id), description: job.description }) + "\n"
+              )
+            );
+            return;
+          }
+        }
+        controller.close();
+      },
+      async cancel() {
+        await cursor.close();
+      },
+    });
 
     // Call scraper to build TF-IDF index
-    const response = await fetch(`${SCRAPER_URL}/build-tfidf`, {
+    const response = await fetch(`${SCRAPER_URL}/build-tfidf?mode=replace`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ job_descriptions: descriptions }),
-    });
+      headers: { "Content-Type": "application/x-ndjson" },
+      body,
+      duplex: "half",
+    } as RequestInit & { duplex: "half" });
 
     if (!response.ok) {
       const error = await response.text();
@@ -65,7 +77,7 @@ export async function POST() {
 
     return NextResponse.json({
       success: true,
-      jobsProcessed: descriptions.length,
+      jobsProcessed: descriptionsSent,
       ...result,
     });
   } catch (error) {
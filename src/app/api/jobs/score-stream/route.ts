@@ -43,6 +43,22 @@ async function getUserCVData(userId: string): Promise<CVDataForScoring> {
   }
 }
 
+// Register the CV once so per-job requests only send its id
+async function registerCV(cvData: CVDataForScoring): Promise<string | null> {
+  try {
+    const response = await fetch(`${SCRAPER_URL}/cv`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(cvData),
+    })
+    if (!response.ok) return null
+    const data = await response.json()
+    return data.cv_id ?? null
+  } catch {
+    return null
+  }
+}
+
 function isCVEmpty(cvData: CVDataForScoring): boolean {
   const hasProfile = cvData.profile && (cvData.profile.title || cvData.profile.summary)
   const hasExperiences = cvData.experiences.length > 0
@@ -94,83 +110,120 @@ export async function POST(request: NextRequest) {
         }
 
         try {
-          // Score each job individually with detailed analysis and stream results
-          for (const job of jobs) {
-            try {
-              const scoreResponse = await fetch(`${SCRAPER_URL}/score-detailed`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                  cv_data: cvData,
-                  job: {
-                    id: String(job.index),
-                    title: job.title,
-                    company: job.company,
-                    description: job.description,
-                  },
-                }),
+          // Fall back to sending the full CV if registration is unavailable
+          const cvId = await registerCV(cvData)
+          const cvSource = cvId ? { cv_id: cvId } : { cv_data: cvData }
+
+          const reported = new Set<number>()
+
+          const markError = async (job: JobForScoring, errorMsg: string) => {
+            // Update error status in database
+            if (job.id) {
+              await ScrapedJob.findByIdAndUpdate(job.id, {
+                scoreStatus: 'error',
+                scoreError: errorMsg,
               })
+            }
 
-              if (scoreResponse.ok) {
-                const scoreData = await scoreResponse.json()
-
-                // Update score in database if job has an ID
-                if (job.id) {
-                  await ScrapedJob.findByIdAndUpdate(job.id, {
-                    compatibilityScore: scoreData.globalScore,
-                    scoreStatus: 'completed',
-                    scoreCalculatedAt: new Date(),
-                  })
-                }
-
-                sendEvent('score', {
-                  index: job.index,
-                  score: scoreData.globalScore,
-                  status: 'completed',
-                  details: {
-                    globalScore: scoreData.globalScore,
-                    experienceMatches: scoreData.experienceMatches,
-                    matchedKeywords: scoreData.matchedKeywords,
-                    missingKeywords: scoreData.missingKeywords,
-                    matchedSkills: scoreData.matchedSkills,
-                    totalKeywords: scoreData.totalKeywords,
-                  },
-                })
-              } else {
-                // Update error status in database
-                if (job.id) {
-                  await ScrapedJob.findByIdAndUpdate(job.id, {
-                    scoreStatus: 'error',
-                    scoreError: 'Scoring service error',
-                  })
-                }
-
-                sendEvent('score', {
-                  index: job.index,
-                  score: undefined,
-                  status: 'error',
-                  error: 'Scoring service error',
-                })
+            sendEvent('score', {
+              index: job.index,
+              score: undefined,
+              status: 'error',
+              error: errorMsg,
+            })
+          }
+
+          // Score all jobs in one streamed request; the scraper batches the
+          // model work and sends each result as soon as its batch is done
+          try {
+            const scoreResponse = await fetch(`${SCRAPER_URL}/score-detailed-stream`, {
+              method: 'POST',
+              headers: { 'Content-Type': 'application/json' },
+              body: JSON.stringify({
+                ...cvSource,
+                format: 'ndjson',
+                jobs: jobs.map((job) => ({
+                  id: String(job.index),
+                  title: job.title,
+                  company: job.company,
+                  description: job.description,
+                })),
+              }),
+            })
+
+            if (!scoreResponse.ok || !scoreResponse.body) {
+              throw new Error('Scoring service error')
+            }
+
+            const reader = scoreResponse.body.getReader()
+            const decoder = new TextDecoder()
+            let buffered = ''
+
+            const handleLine = async (line: string) => {
+              if (!line.trim()) return
+              const scoreData = JSON.parse(line)
+              if (scoreData.type !== 'score') return
+
+              const job = jobs[scoreData.index]
+              if (!job) return
+              reported.add(scoreData.index)
+
+              if (scoreData.status !== 'completed') {
+                await markError(job, scoreData.error || 'Scoring service error')
+                return
               }
-            } catch (err) {
-              const errorMsg = err instanceof Error ? err.message : 'Unknown error'
 
-              // Update error status in database
+              // Update score in database if job has an ID
               if (job.id) {
                 await ScrapedJob.findByIdAndUpdate(job.id, {
-                  scoreStatus: 'error',
-                  scoreError: errorMsg,
+                  compatibilityScore: scoreData.globalScore,
+                  scoreStatus: 'completed',
+                  scoreCalculatedAt: new Date(),
                 })
               }
 
-              // Send error for this specific job
               sendEvent('score', {
                 index: job.index,
-                score: undefined,
-                status: 'error',
-                error: errorMsg,
+                score: scoreData.globalScore,
+                status: 'completed',
+                details: {
+                  globalScore: scoreData.globalScore,
+                  experienceMatches: scoreData.experienceMatches,
+                  matchedKeywords: scoreData.matchedKeywords,
+                  missingKeywords: scoreData.missingKeywords,
+                  matchedSkills: scoreData.matchedSkills,
+                  totalKeywords: scoreData.totalKeywords,
+                },
               })
             }
+
+            while (true) {
+              const { done, value } = await reader.read()
+              if (done) break
+              buffered += decoder.decode(value, { stream: true })
+
+              const lines = buffered.split('\n')
+              buffered = lines.pop() ?? ''
+              for (const line of lines) {
+                await handleLine(line)
+              }
+            }
+            await handleLine(buffered + decoder.decode())
+          } catch (err) {
+            const errorMsg = err instanceof Error ? err.message : 'Unknown error'
+            for (let i = 0; i < jobs.length; i++) {
+              if (!reported.has(i)) {
+                reported.add(i)
+                await markError(jobs[i], errorMsg)
+              }
+            }
+          }
+
+          // Jobs the stream never reported on (e.g. connection dropped)
+          for (let i = 0; i < jobs.length; i++) {
+            if (!reported.has(i)) {
+              await markError(jobs[i], 'Scoring service error')
+            }
           }
 
           // Send completion event